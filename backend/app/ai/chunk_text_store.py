@@ -0,0 +1,281 @@
+"""
+청크 본문 저장소 (벡터 ID -> 압축된 텍스트)
+"""
+import glob
+import mmap
+import os
+import struct
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # zstandard 미설치 시 zlib 사용
+    zstandard = None
+
+
+# 레코드 앞 1바이트: 압축 방식
+_CODEC_RAW = 0
+_CODEC_ZLIB = 1
+_CODEC_ZSTD = 2
+
+# 색인 파일 구성: 매직 + 데이터 파일 세대 + 항목 수, 이후 64바이트 정렬된 항목 배열
+_MAGIC = b"CTXT0001"
+_HEADER = struct.Struct("<8sQQ")
+_ALIGN = 64
+_ENTRY = np.dtype([("id", "<i8"), ("offset", "<i8"), ("length", "<i8")])
+
+INDEX_FILE = "chunk_text.idx"
+FILE_PATTERN = "chunk_text.*"
+
+
+def _data_file(generation: int) -> str:
+    """세대별 데이터 파일명"""
+    return f"chunk_text.{generation}.dat"
+
+
+class ChunkTextStore:
+    """벡터 인덱스 옆에 두는 청크 본문 저장소
+    
+    본문은 청크마다 따로 압축해 데이터 파일 끝에 덧붙이고, 체크포인트 때
+    (ID, 오프셋, 길이) 색인을 ID 순으로 저장해 메모리 매핑으로 연다. 검색 결과의
+    본문은 색인에서 위치를 찾아 pread로 읽으므로 DB 조회 없이 한 번에 가져온다.
+    삭제/교체로 쌓인 빈 공간이 절반을 넘으면 체크포인트 때 새 세대 파일로 옮긴다.
+    
+    read_only=True면 데이터 파일에 쓰지 않고(다른 프로세스가 기록 중) 체크포인트 이후
+    추가된 본문은 메모리에만 둔다.
+    """
+    
+    def __init__(self, directory: str, read_only: bool = False):
+        """저장소 열기"""
+        self.directory = directory
+        self.read_only = read_only
+        os.makedirs(directory, exist_ok=True)
+        self._compressor = (
+            zstandard.ZstdCompressor(level=settings.CHUNK_TEXT_COMPRESSION_LEVEL)
+            if zstandard is not None else None
+        )
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard is not None else None
+        self._open()
+    
+    def _open(self):
+        """마지막 체크포인트 색인과 데이터 파일 열기"""
+        self._mmap = None
+        self._entries = np.empty(0, dtype=_ENTRY)
+        self._generation = 0
+        
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        if os.path.exists(index_path) and os.path.getsize(index_path) >= _HEADER.size:
+            with open(index_path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self._generation, count = _HEADER.unpack_from(self._mmap, 0)
+            if magic != _MAGIC:
+                raise ValueError(f"청크 본문 색인 형식이 올바르지 않습니다: {index_path}")
+            if count:
+                self._entries = np.frombuffer(
+                    self._mmap, dtype=_ENTRY, count=count, offset=_align(_HEADER.size)
+                )
+        
+        # 체크포인트 이후 추가/교체된 항목과 삭제된 체크포인트 항목
+        # (읽기 전용이면 추가된 레코드는 _memory에 두고 오프셋을 -1로 표시)
+        self._overlay: Dict[int, Tuple[int, int]] = {}
+        self._memory: Dict[int, bytes] = {}
+        self._removed = set()
+        self._live_bytes = int(self._entries["length"].sum())
+        
+        self._data_path = os.path.join(self.directory, _data_file(self._generation))
+        self._file = open(self._data_path, "ab")
+        self._fd = os.open(self._data_path, os.O_RDONLY)
+    
+    def __len__(self) -> int:
+        return len(self._entries) - len(self._removed) + sum(
+            1 for vector_id in self._overlay if not self._in_base(vector_id)
+        )
+    
+    def _in_base(self, vector_id: int) -> bool:
+        """체크포인트 색인에 살아 있는 ID인지 여부"""
+        return vector_id not in self._removed and self._base_location(vector_id) is not None
+    
+    def _base_location(self, vector_id: int) -> Optional[Tuple[int, int]]:
+        """체크포인트 색인에서 (오프셋, 길이)"""
+        ids = self._entries["id"]
+        pos = int(np.searchsorted(ids, vector_id))
+        if pos < len(ids) and ids[pos] == vector_id:
+            entry = self._entries[pos]
+            return int(entry["offset"]), int(entry["length"])
+        return None
+    
+    def _locate(self, vector_id: int) -> Optional[Tuple[int, int]]:
+        """ID의 데이터 파일 내 (오프셋, 길이)"""
+        if vector_id in self._overlay:
+            return self._overlay[vector_id]
+        if vector_id in self._removed:
+            return None
+        return self._base_location(vector_id)
+    
+    def _compress(self, text: str) -> bytes:
+        """본문 압축 (압축 효과가 없으면 그대로 저장)"""
+        raw = text.encode("utf-8")
+        if self._compressor is not None:
+            packed, codec = self._compressor.compress(raw), _CODEC_ZSTD
+        else:
+            packed, codec = zlib.compress(raw), _CODEC_ZLIB
+        if len(packed) >= len(raw):
+            packed, codec = raw, _CODEC_RAW
+        return bytes([codec]) + packed
+    
+    def _decompress(self, record: bytes) -> str:
+        """압축 해제"""
+        codec, payload = record[0], record[1:]
+        if codec == _CODEC_ZSTD:
+            if self._decompressor is None:
+                raise RuntimeError("zstd로 압축된 청크 본문을 읽으려면 zstandard 패키지가 필요합니다.")
+            payload = self._decompressor.decompress(payload)
+        elif codec == _CODEC_ZLIB:
+            payload = zlib.decompress(payload)
+        return payload.decode("utf-8")
+    
+    def put(self, ids: Iterable[int], texts: Iterable[str]):
+        """본문 추가 (이미 있는 ID는 교체)"""
+        ids = [int(vector_id) for vector_id in ids]
+        records = [self._compress(text or "") for text in texts]
+        if not ids:
+            return
+        
+        self.remove(ids)
+        if self.read_only:
+            for vector_id, record in zip(ids, records):
+                self._memory[vector_id] = record
+                self._overlay[vector_id] = (-1, len(record))
+                self._live_bytes += len(record)
+            return
+        
+        offset = self._file.tell()
+        self._file.write(b"".join(records))
+        self._file.flush()
+        for vector_id, record in zip(ids, records):
+            self._overlay[vector_id] = (offset, len(record))
+            offset += len(record)
+            self._live_bytes += len(record)
+    
+    def remove(self, ids: Iterable[int]):
+        """본문 삭제 (없는 ID는 무시)"""
+        for vector_id in ids:
+            vector_id = int(vector_id)
+            location = self._overlay.pop(vector_id, None)
+            self._memory.pop(vector_id, None)
+            if location is None and vector_id not in self._removed:
+                location = self._base_location(vector_id)
+                if location is not None:
+                    self._removed.add(vector_id)
+            if location is not None:
+                self._live_bytes -= location[1]
+    
+    def get_many(self, ids: Iterable[int]) -> List[Optional[str]]:
+        """여러 ID의 본문 (없는 ID는 None)"""
+        results = []
+        for vector_id in ids:
+            location = self._locate(int(vector_id))
+            if location is None:
+                results.append(None)
+                continue
+            offset, length = location
+            record = self._memory[int(vector_id)] if offset < 0 else os.pread(self._fd, length, offset)
+            results.append(self._decompress(record))
+        return results
+    
+    def ids(self) -> np.ndarray:
+        """저장된 모든 벡터 ID (ID 순)"""
+        return self._live_entries()["id"].copy()
+    
+    def _live_entries(self) -> np.ndarray:
+        """살아 있는 모든 항목 (ID 순)"""
+        base = self._entries
+        if self._removed or self._overlay:
+            dropped = np.fromiter(self._removed | self._overlay.keys(), dtype="int64")
+            base = base[~np.isin(base["id"], dropped)]
+        overlay = np.array(
+            [(vector_id, offset, length) for vector_id, (offset, length) in self._overlay.items()],
+            dtype=_ENTRY
+        )
+        entries = np.concatenate([base, overlay])
+        return entries[np.argsort(entries["id"], kind="stable")]
+    
+    def checkpoint(self):
+        """현재 항목 색인을 저장하고 다시 매핑 (빈 공간이 많으면 새 세대 파일로 압축)"""
+        if self.read_only:
+            raise RuntimeError("읽기 전용 청크 본문 저장소는 체크포인트할 수 없습니다.")
+        entries = self._live_entries()
+        generation = self._generation
+        self._file.flush()
+        data_size = self._file.tell()
+        
+        if data_size and self._live_bytes < data_size * settings.CHUNK_TEXT_COMPACTION_RATIO:
+            generation += 1
+            entries = self._copy_live(entries, _data_file(generation))
+        else:
+            os.fsync(self._file.fileno())
+        
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        with open(index_path + ".tmp", "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, generation, len(entries)))
+            f.write(b"\0" * (_align(f.tell()) - f.tell()))
+            f.write(entries.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(index_path + ".tmp", index_path)
+        
+        old_path = self._data_path
+        self.close()
+        self._open()
+        if self._data_path != old_path:
+            os.remove(old_path)
+    
+    def _copy_live(self, entries: np.ndarray, filename: str) -> np.ndarray:
+        """살아 있는 레코드만 압축 상태 그대로 새 데이터 파일에 복사"""
+        copied = entries.copy()
+        offset = 0
+        with open(os.path.join(self.directory, filename), "wb") as f:
+            for i, (_, old_offset, length) in enumerate(entries.tolist()):
+                f.write(os.pread(self._fd, length, old_offset))
+                copied["offset"][i] = offset
+                offset += length
+            f.flush()
+            os.fsync(f.fileno())
+        return copied
+    
+    def clear(self):
+        """모든 본문 삭제"""
+        if self.read_only:
+            raise RuntimeError("읽기 전용 청크 본문 저장소는 비울 수 없습니다.")
+        self.close()
+        for path in glob.glob(os.path.join(self.directory, FILE_PATTERN)):
+            os.remove(path)
+        self._open()
+    
+    def close(self):
+        """파일 닫기"""
+        if not self._file.closed:
+            self._file.close()
+            os.close(self._fd)
+        # 매핑은 검색 중인 배열 뷰가 남아 있을 수 있으므로 참조만 해제
+        self._entries = np.empty(0, dtype=_ENTRY)
+        self._mmap = None
+    
+    def get_stats(self) -> Dict[str, int]:
+        """저장소 통계"""
+        return {
+            "entries": len(self),
+            "live_bytes": self._live_bytes,
+            "data_bytes": self._file.tell() if not self._file.closed else 0,
+            "compression": "zstd" if self._compressor is not None else "zlib"
+        }
+
+
+def _align(offset: int) -> int:
+    """다음 정렬 경계"""
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
@@ -1,22 +1,24 @@
 """
 임베딩 생성 모듈
 """
-from typing import List
+from typing import List, Optional
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import os
 
 from app.core.config import settings
+from app.ai.embedding_cache import QueryEmbeddingCache, EmbeddingDiskStore, model_store_name
 
 
 class EmbeddingGenerator:
     """임베딩 생성기"""
     
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, query_cache: Optional[QueryEmbeddingCache] = None):
         """임베딩 모델 초기화"""
         self.model_name = model_name or settings.EMBEDDING_MODEL
         self.model = None
         self._load_model()
+        self.query_cache = query_cache or self._create_query_cache()
     
     def _load_model(self):
         """모델 로드 (지연 로딩)"""
@@ -25,13 +27,48 @@ class EmbeddingGenerator:
             self.model = SentenceTransformer(self.model_name)
             print("임베딩 모델 로딩 완료")
     
+    def _create_query_cache(self) -> Optional[QueryEmbeddingCache]:
+        """설정에 따른 쿼리 임베딩 캐시 생성"""
+        if settings.QUERY_EMBEDDING_CACHE_SIZE <= 0:
+            return None
+        
+        disk_store = None
+        if settings.QUERY_EMBEDDING_CACHE_PERSIST:
+            disk_store = EmbeddingDiskStore(
+                settings.EMBEDDING_CACHE_DIR,
+                model_store_name("query", self.model_name),
+                self.get_embedding_dimension(),
+                ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL,
+                max_entries=settings.QUERY_EMBEDDING_CACHE_DISK_MAX_ENTRIES
+            )
+        
+        return QueryEmbeddingCache(
+            self.model_name,
+            max_size=settings.QUERY_EMBEDDING_CACHE_SIZE,
+            ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL,
+            disk_store=disk_store
+        )
+    
     def generate_embedding(self, text: str) -> np.ndarray:
-        """단일 텍스트 임베딩 생성"""
+        """단일 텍스트 임베딩 생성 (쿼리 캐시 우선 조회)"""
+        if self.query_cache is not None:
+            cached = self.query_cache.get(text)
+            if cached is not None:
+                return cached
+        
         self._load_model()
         embedding = self.model.encode(text, convert_to_numpy=True)
+        
+        if self.query_cache is not None:
+            self.query_cache.put(text, embedding)
         return embedding
     
-    def generate_embeddings(self, texts: List[str], batch_size: int = None) -> np.ndarray:
+    def generate_embeddings(
+        self,
+        texts: List[str],
+        batch_size: int = None,
+        show_progress_bar: bool = True
+    ) -> np.ndarray:
         """여러 텍스트 임베딩 생성 (배치 처리)"""
         self._load_model()
         batch_size = batch_size or settings.BATCH_SIZE
@@ -40,7 +77,7 @@ class EmbeddingGenerator:
             texts,
             batch_size=batch_size,
             convert_to_numpy=True,
-            show_progress_bar=True
+            show_progress_bar=show_progress_bar
         )
         
         return embeddings
@@ -0,0 +1,140 @@
+"""
+쿼리 임베딩 마이크로 배치 처리
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.ai.embedding import EmbeddingGenerator
+from app.ai.embedding_cache import QueryEmbeddingCache
+
+
+class EmbeddingBatcher:
+    """동시 쿼리 임베딩 요청을 모아 한 번에 인코딩하는 비동기 큐
+    
+    요청마다 작은 forward pass를 실행하는 대신, 최대 배치 크기 또는 최대 대기
+    시간에 도달할 때까지 요청을 모은 뒤 작업 스레드에서 한 번에 인코딩한다.
+    같은 배치 안의 동일한 텍스트는 한 번만 인코딩하고, 쿼리 캐시가 있으면
+    캐시에 없는 텍스트만 큐에 넣는다.
+    """
+    
+    def __init__(
+        self,
+        embedding_generator: EmbeddingGenerator,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        query_cache: Optional[QueryEmbeddingCache] = None
+    ):
+        """배치 처리기 초기화"""
+        self.embedding_generator = embedding_generator
+        self.query_cache = query_cache
+        self.max_batch_size = max_batch_size or settings.EMBEDDING_BATCH_MAX_SIZE
+        if max_wait_ms is None:
+            max_wait_ms = settings.EMBEDDING_BATCH_MAX_WAIT_MS
+        self.max_wait = max_wait_ms / 1000.0
+        # 인코딩은 단일 작업 스레드에서 수행 (CPU 코어 과점유 방지)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._requests = 0
+        self._batches = 0
+        self._encoded = 0
+    
+    async def embed(self, text: str) -> np.ndarray:
+        """쿼리 임베딩 (동시 요청과 함께 배치 처리)"""
+        if self.query_cache is not None:
+            cached = self.query_cache.get(text)
+            if cached is not None:
+                return cached
+        
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._requests += 1
+        await self._queue.put((text, future))
+        return await future
+    
+    def _ensure_worker(self):
+        """현재 이벤트 루프에 작업 태스크가 없으면 시작"""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+    
+    async def _run(self):
+        """큐에서 요청을 모아 배치 인코딩"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            await self._process_batch(loop, batch)
+    
+    async def _process_batch(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        batch: List[Tuple[str, asyncio.Future]]
+    ):
+        """배치 인코딩 후 각 요청에 결과 전달"""
+        # 동일 텍스트 병합
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        
+        try:
+            embeddings = await loop.run_in_executor(
+                self._executor, self._encode, unique_texts
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        self._batches += 1
+        self._encoded += len(unique_texts)
+        by_text = dict(zip(unique_texts, embeddings))
+        for text, future in batch:
+            if not future.done():  # 취소된 요청은 건너뜀
+                future.set_result(by_text[text])
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """작업 스레드에서 실행되는 인코딩 (디스크 캐시 쓰기 포함)"""
+        embeddings = self.embedding_generator.generate_embeddings(
+            texts,
+            batch_size=self.max_batch_size,
+            show_progress_bar=False
+        )
+        if self.query_cache is not None:
+            for text, embedding in zip(texts, embeddings):
+                self.query_cache.put(text, embedding)
+        return embeddings
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """배치 처리 통계"""
+        return {
+            "requests": self._requests,
+            "batches": self._batches,
+            "encoded_texts": self._encoded,
+            "avg_batch_size": round(self._requests / self._batches, 2) if self._batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000
+        }
+    
+    def close(self):
+        """작업 태스크와 스레드 정리"""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+        self._worker = None
+        self._executor.shutdown(wait=False)
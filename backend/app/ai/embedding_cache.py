@@ -0,0 +1,422 @@
+"""
+임베딩 캐시
+"""
+import hashlib
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple, List, Callable
+
+import numpy as np
+
+try:
+    import fcntl  # 여러 워커 프로세스가 같은 캐시 파일에 추가할 때 사용
+except ImportError:  # Windows
+    fcntl = None
+
+
+def make_cache_key(model_name: str, text: str) -> str:
+    """모델명과 텍스트로 캐시 키 생성 (SHA-256)"""
+    return hashlib.sha256(f"{model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def model_store_name(prefix: str, model_name: str) -> str:
+    """모델별 저장소 파일명 (모델마다 차원이 다르므로 파일을 분리)"""
+    return f"{prefix}_{hashlib.sha256(model_name.encode('utf-8')).hexdigest()[:12]}"
+
+
+class EmbeddingDiskStore:
+    """float32 배열 파일 기반 임베딩 저장소
+    
+    `{name}.f32`에 벡터를 행 단위로 추가하고 `{name}.idx`에 "키<TAB>행<TAB>저장 시각" 줄을
+    추가한다. 읽기는 메모리 맵으로 수행하므로 재시작 후에도 파일 전체를 메모리에
+    올리지 않고 바로 사용할 수 있다.
+    
+    ttl_seconds가 지난 항목은 로드/조회 시 제외하고, 항목 수가 max_entries를 넘거나
+    버려진 행이 살아 있는 행보다 많아지면 최근 항목만 새 파일로 옮겨 압축한다.
+    """
+    
+    # 압축 시 max_entries 대비 남기는 비율 (추가할 때마다 압축하지 않도록 여유를 둠)
+    COMPACT_KEEP_RATIO = 0.9
+    
+    def __init__(
+        self,
+        cache_dir: str,
+        name: str,
+        dimension: int,
+        ttl_seconds: float = 0,
+        max_entries: int = 0
+    ):
+        """디스크 저장소 초기화 (ttl_seconds=0이면 만료 없음, max_entries=0이면 크기 제한 없음)"""
+        self.dimension = dimension
+        self.row_bytes = dimension * 4
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.data_path = os.path.join(cache_dir, f"{name}.f32")
+        self.index_path = os.path.join(cache_dir, f"{name}.idx")
+        self.lock_path = os.path.join(cache_dir, f"{name}.lock")
+        self._rows: Dict[str, Tuple[int, float]] = {}  # 키 -> (행, 저장 시각)
+        self._mmap: Optional[np.memmap] = None
+        self._data_inode: Optional[int] = None  # 다른 프로세스의 압축(파일 교체) 감지용
+        self._lock = threading.Lock()
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        with self._lock, self._file_lock():
+            self._load_index()
+            if self._needs_compaction():
+                self._compact()
+    
+    @contextmanager
+    def _file_lock(self):
+        """여러 워커 프로세스의 추가/압축/로드를 직렬화하는 파일 잠금"""
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    def _load_index(self):
+        """인덱스 파일 로드 (데이터 파일보다 앞선 행과 만료된 항목은 무시, 파일 잠금 안에서 호출)"""
+        self._rows = {}
+        self._mmap = None
+        self._data_inode = self._inode()
+        if not os.path.exists(self.index_path):
+            return
+        
+        total_rows = self._data_rows()
+        now = time.time()
+        legacy_stored_at = os.path.getmtime(self.index_path)  # 저장 시각이 없는 이전 형식 항목
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if parts[0] == "#data":
+                    # 압축 중 중단되어 인덱스와 데이터 파일이 짝이 맞지 않으면 전부 버림
+                    if parts[1:] != [str(self._data_inode)]:
+                        return
+                    continue
+                if not line.endswith("\n") or len(parts) not in (2, 3) or not parts[1].isdigit():
+                    continue  # 중단된 쓰기
+                try:
+                    stored_at = float(parts[2]) if len(parts) == 3 else legacy_stored_at
+                except ValueError:
+                    continue
+                row = int(parts[1])
+                if row < total_rows and not self._expired(stored_at, now):
+                    self._rows[parts[0]] = (row, stored_at)
+    
+    def _inode(self) -> Optional[int]:
+        """데이터 파일 inode (압축으로 파일이 바뀌면 달라짐)"""
+        try:
+            return os.stat(self.data_path).st_ino
+        except FileNotFoundError:
+            return None
+    
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and stored_at + self.ttl_seconds <= now
+    
+    def _sync_with_disk(self):
+        """다른 프로세스가 압축해 파일을 바꿨으면 인덱스를 다시 로드 (잠금 안에서 호출)"""
+        if self._inode() != self._data_inode:
+            with self._file_lock():
+                self._load_index()
+    
+    def _data_rows(self) -> int:
+        """데이터 파일의 완전한 행 수"""
+        if not os.path.exists(self.data_path):
+            return 0
+        return os.path.getsize(self.data_path) // self.row_bytes
+    
+    def _remap(self):
+        """데이터 파일 메모리 맵 갱신"""
+        rows = self._data_rows()
+        self._mmap = np.memmap(
+            self.data_path, dtype="float32", mode="r", shape=(rows, self.dimension)
+        ) if rows else None
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    def _live_rows(self, keys: List[str]) -> List[Tuple[str, int]]:
+        """만료되지 않은 키의 행 (만료된 키는 제거, 잠금 안에서 호출)"""
+        now = time.time()
+        found = []
+        for key in keys:
+            entry = self._rows.get(key)
+            if entry is None:
+                continue
+            if self._expired(entry[1], now):
+                del self._rows[key]
+                continue
+            found.append((key, entry[0]))
+        return found
+    
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """임베딩 조회"""
+        with self._lock:
+            self._sync_with_disk()
+            found = self._live_rows([key])
+            if not found:
+                return None
+            row = found[0][1]
+            if self._mmap is None or row >= self._mmap.shape[0]:
+                self._remap()
+            return np.array(self._mmap[row])
+    
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """여러 임베딩 조회 (있는 키만 반환)"""
+        with self._lock:
+            self._sync_with_disk()
+            found = self._live_rows(keys)
+            if not found:
+                return {}
+            if self._mmap is None or max(row for _, row in found) >= self._mmap.shape[0]:
+                self._remap()
+            vectors = np.array(self._mmap[[row for _, row in found]])
+        return {key: vector for (key, _), vector in zip(found, vectors)}
+    
+    def put(self, key: str, embedding: np.ndarray):
+        """임베딩 추가"""
+        self.put_many([key], np.asarray(embedding).reshape(1, -1))
+    
+    def put_many(self, keys, embeddings: np.ndarray):
+        """여러 임베딩 추가 (이미 있는 키는 건너뜀, 크기 제한을 넘으면 압축)"""
+        embeddings = np.asarray(embeddings, dtype="float32").reshape(-1, self.dimension)
+        keys = list(keys)
+        with self._lock:
+            if len(self._live_rows(keys)) == len(keys):
+                return
+            
+            with self._file_lock():
+                if self._inode() != self._data_inode:
+                    self._load_index()
+                self._live_rows(keys)  # 만료된 키는 다시 저장
+                new = [(k, e) for k, e in zip(keys, embeddings) if k not in self._rows]
+                if not new:
+                    return
+                
+                stored_at = time.time()
+                with open(self.data_path, "ab") as data_file, \
+                        open(self.index_path, "a", encoding="utf-8") as index_file:
+                    data_file.seek(0, os.SEEK_END)
+                    start_row = data_file.tell() // self.row_bytes
+                    data_file.write(np.stack([e for _, e in new]).tobytes())
+                    data_file.flush()
+                    index_file.write("".join(
+                        f"{key}\t{start_row + i}\t{stored_at:.0f}\n" for i, (key, _) in enumerate(new)
+                    ))
+                    index_file.flush()
+                if self._data_inode is None:
+                    self._data_inode = self._inode()
+                
+                for i, (key, _) in enumerate(new):
+                    self._rows[key] = (start_row + i, stored_at)
+                if self._needs_compaction():
+                    self._compact()
+    
+    def _needs_compaction(self) -> bool:
+        """크기 제한 초과 또는 버려진 행(만료/중단된 쓰기)이 살아 있는 행보다 많은지"""
+        if self.max_entries and len(self._rows) > self.max_entries:
+            return True
+        return self._data_rows() - len(self._rows) > max(len(self._rows), 1024)
+    
+    def _compact(self):
+        """만료되지 않은 최근 항목만 새 파일로 옮김 (잠금과 파일 잠금 안에서 호출)
+        
+        인덱스 첫 줄에 새 데이터 파일의 inode를 기록하고 인덱스를 먼저 교체하므로,
+        두 파일 교체 사이에 중단되면 다음 로드에서 짝이 맞지 않는 인덱스를 버린다.
+        """
+        now = time.time()
+        live = sorted(
+            ((key, row, stored_at) for key, (row, stored_at) in self._rows.items()
+             if not self._expired(stored_at, now)),
+            key=lambda item: item[2]
+        )
+        if self.max_entries and len(live) > self.max_entries:
+            live = live[len(live) - int(self.max_entries * self.COMPACT_KEEP_RATIO):]
+        
+        self._remap()
+        data_tmp = self.data_path + ".tmp"
+        index_tmp = self.index_path + ".tmp"
+        with open(data_tmp, "wb") as f:
+            if live:
+                f.write(np.ascontiguousarray(self._mmap[[row for _, row, _ in live]]).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        data_inode = os.stat(data_tmp).st_ino
+        with open(index_tmp, "w", encoding="utf-8") as f:
+            f.write(f"#data\t{data_inode}\n")
+            f.write("".join(
+                f"{key}\t{i}\t{stored_at:.0f}\n" for i, (key, _, stored_at) in enumerate(live)
+            ))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(index_tmp, self.index_path)
+        os.replace(data_tmp, self.data_path)
+        
+        self._mmap = None
+        self._data_inode = data_inode
+        self._rows = {key: (i, stored_at) for i, (key, _, stored_at) in enumerate(live)}
+    
+    def size_bytes(self) -> int:
+        """디스크 사용량"""
+        return sum(
+            os.path.getsize(p) for p in (self.data_path, self.index_path) if os.path.exists(p)
+        )
+
+
+class QueryEmbeddingCache:
+    """쿼리 임베딩 캐시
+    
+    모델명 + 정규화된 쿼리 텍스트를 키로 하는 메모리 LRU(크기/TTL 제거)와
+    재시작 후에도 유지되는 선택적 디스크 계층으로 구성된다.
+    """
+    
+    def __init__(
+        self,
+        model_name: str,
+        max_size: int = 1024,
+        ttl_seconds: float = 0,
+        disk_store: Optional[EmbeddingDiskStore] = None
+    ):
+        """쿼리 캐시 초기화 (ttl_seconds=0이면 만료 없음)"""
+        self.model_name = model_name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.disk_store = disk_store
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def normalize_query(text: str) -> str:
+        """쿼리 정규화 (유니코드 NFC, 공백 정리)
+        
+        대소문자는 그대로 둔다. 대소문자를 구분하는 임베딩 모델은 "PUMP"와 "pump"에
+        다른 벡터를 내므로, 소문자로 합치면 다른 쿼리의 임베딩을 돌려주게 된다.
+        """
+        text = unicodedata.normalize("NFC", text)
+        return " ".join(text.split())
+    
+    def _key(self, text: str) -> str:
+        return make_cache_key(self.model_name, self.normalize_query(text))
+    
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """캐시 조회"""
+        key = self._key(text)
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                embedding, expires_at = entry
+                if not expires_at or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return embedding
+                del self._entries[key]
+        
+        if self.disk_store is not None:
+            embedding = self.disk_store.get(key)
+            if embedding is not None:
+                self._put_memory(key, embedding)
+                with self._lock:
+                    self.disk_hits += 1
+                return embedding
+        
+        with self._lock:
+            self.misses += 1
+        return None
+    
+    def put(self, text: str, embedding: np.ndarray):
+        """캐시 저장"""
+        key = self._key(text)
+        self._put_memory(key, embedding)
+        if self.disk_store is not None:
+            self.disk_store.put(key, embedding)
+    
+    def _put_memory(self, key: str, embedding: np.ndarray):
+        """메모리 LRU에 저장"""
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else 0
+        with self._lock:
+            self._entries[key] = (embedding, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """메모리 캐시 비우기"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "disk_entries": len(self.disk_store) if self.disk_store is not None else 0
+        }
+
+
+class ChunkEmbeddingCache:
+    """청크 임베딩 캐시
+    
+    청크 텍스트와 모델명의 SHA-256을 키로 디스크 저장소에 임베딩을 보관하여,
+    문서를 다시 인덱싱할 때 바뀐 청크만 인코딩한다.
+    """
+    
+    def __init__(self, model_name: str, disk_store: EmbeddingDiskStore):
+        """청크 캐시 초기화"""
+        self.model_name = model_name
+        self.disk_store = disk_store
+        self.hits = 0
+        self.misses = 0
+    
+    def encode(
+        self,
+        texts: List[str],
+        encoder: Callable[[List[str]], np.ndarray]
+    ) -> np.ndarray:
+        """캐시에 없는 텍스트만 encoder로 인코딩하여 전체 임베딩 반환"""
+        keys = [make_cache_key(self.model_name, text) for text in texts]
+        cached = self.disk_store.get_many(keys)
+        
+        # 캐시에 없는 텍스트 (중복 제거)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        
+        if missing:
+            new_embeddings = np.asarray(encoder(list(missing.values())), dtype="float32")
+            self.disk_store.put_many(list(missing.keys()), new_embeddings)
+            cached.update(zip(missing.keys(), new_embeddings))
+        
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        return np.stack([cached[key] for key in keys]).astype("float32")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        return {
+            "entries": len(self.disk_store),
+            "hits": self.hits,
+            "misses": self.misses,
+            "size_bytes": self.disk_store.size_bytes()
+        }
@@ -0,0 +1,304 @@
+"""
+FAISS 인덱스 팩토리
+"""
+from typing import Dict, Any, Optional
+
+import faiss
+import numpy as np
+
+from app.core.config import settings
+
+
+# 지원 인덱스 타입
+INDEX_FLAT = "flat"
+INDEX_IVF_FLAT = "ivf_flat"
+INDEX_HNSW_FLAT = "hnsw_flat"
+INDEX_IVF_PQ = "ivf_pq"
+INDEX_TYPES = (INDEX_FLAT, INDEX_IVF_FLAT, INDEX_HNSW_FLAT, INDEX_IVF_PQ)
+
+# 거리 척도
+METRIC_L2 = "l2"
+METRIC_COSINE = "cosine"  # 정규화된 벡터의 내적
+METRICS = (METRIC_L2, METRIC_COSINE)
+
+# IVF 클러스터당 최소 학습 벡터 수 (FAISS 권장값)
+MIN_POINTS_PER_CENTROID = 39
+
+
+def min_training_points(index_type: str) -> int:
+    """인덱스 타입별 최소 학습 벡터 수 (학습이 필요 없으면 0)"""
+    if index_type == INDEX_IVF_FLAT:
+        return MIN_POINTS_PER_CENTROID
+    if index_type == INDEX_IVF_PQ:
+        # PQ 코드북(2^nbits 중심점) 학습에 필요한 최소 벡터 수
+        return 2 ** settings.VECTOR_INDEX_PQ_NBITS
+    return 0
+
+
+def _nlist_for(n_train: int) -> int:
+    """학습 벡터 수에 맞는 IVF 리스트 수"""
+    return max(1, min(settings.VECTOR_INDEX_NLIST, n_train // MIN_POINTS_PER_CENTROID))
+
+
+def _pq_m_for(dimension: int) -> int:
+    """차원을 나누어 떨어지게 하는 PQ 서브 양자화기 수"""
+    m = min(settings.VECTOR_INDEX_PQ_M, dimension)
+    while dimension % m:
+        m -= 1
+    return m
+
+
+def _faiss_metric(metric: str) -> int:
+    """거리 척도명을 FAISS 상수로 변환"""
+    if metric not in METRICS:
+        raise ValueError(f"지원하지 않는 거리 척도입니다: {metric}")
+    return faiss.METRIC_INNER_PRODUCT if metric == METRIC_COSINE else faiss.METRIC_L2
+
+
+def metric_of(index: faiss.Index) -> str:
+    """인덱스 객체의 거리 척도명"""
+    return METRIC_COSINE if index.metric_type == faiss.METRIC_INNER_PRODUCT else METRIC_L2
+
+
+def create_index(
+    index_type: str,
+    dimension: int,
+    n_train: int = 0,
+    metric: str = METRIC_L2
+) -> faiss.Index:
+    """인덱스 생성 (IVF 계열은 n_train에 맞춰 리스트 수 결정)"""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 인덱스 타입입니다: {index_type}")
+    faiss_metric = _faiss_metric(metric)
+    
+    if index_type == INDEX_FLAT:
+        if metric == METRIC_COSINE:
+            return faiss.IndexFlatIP(dimension)
+        return faiss.IndexFlatL2(dimension)
+    
+    if index_type == INDEX_HNSW_FLAT:
+        index = faiss.IndexHNSWFlat(dimension, settings.VECTOR_INDEX_HNSW_M, faiss_metric)
+        index.hnsw.efConstruction = settings.VECTOR_INDEX_EF_CONSTRUCTION
+        index.hnsw.efSearch = settings.VECTOR_INDEX_EF_SEARCH
+        return index
+    
+    if metric == METRIC_COSINE:
+        quantizer = faiss.IndexFlatIP(dimension)
+    else:
+        quantizer = faiss.IndexFlatL2(dimension)
+    nlist = _nlist_for(n_train)
+    if index_type == INDEX_IVF_FLAT:
+        index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss_metric)
+    else:
+        index = faiss.IndexIVFPQ(
+            quantizer, dimension, nlist,
+            _pq_m_for(dimension), settings.VECTOR_INDEX_PQ_NBITS, faiss_metric
+        )
+    index.nprobe = min(settings.VECTOR_INDEX_NPROBE, nlist)
+    return index
+
+
+def wrap_with_ids(index: faiss.Index) -> faiss.Index:
+    """외부 벡터 ID를 지정할 수 있는 인덱스로 감싸기
+    
+    IVF 계열은 자체적으로 ID를 저장하고 remove_ids 후 내부 번호를 바꾸지 않으므로
+    IndexIDMap2로 감싸지 않는다.
+    """
+    if isinstance(index, (faiss.IndexIVF, faiss.IndexIDMap)):
+        return index
+    return faiss.IndexIDMap2(index)
+
+
+def unwrap(index: faiss.Index) -> faiss.Index:
+    """IndexIDMap 안쪽의 실제 인덱스"""
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+def has_ids(index: faiss.Index) -> bool:
+    """외부 벡터 ID를 저장하는 인덱스인지 여부 (이전 버전 인덱스는 위치가 ID)"""
+    return isinstance(index, (faiss.IndexIVF, faiss.IndexIDMap))
+
+
+def supports_remove(index: faiss.Index) -> bool:
+    """remove_ids로 벡터를 실제 삭제할 수 있는지 여부 (HNSW는 불가)"""
+    return not isinstance(unwrap(index), faiss.IndexHNSW)
+
+
+def build_index(
+    index_type: str,
+    dimension: int,
+    vectors: np.ndarray,
+    metric: str = METRIC_L2,
+    ids: Optional[np.ndarray] = None
+) -> faiss.Index:
+    """벡터로 인덱스를 생성하고 학습(샘플) 및 추가까지 수행 (ids가 없으면 0부터 부여)"""
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    if ids is None:
+        ids = np.arange(len(vectors), dtype="int64")
+    index = wrap_with_ids(
+        create_index(index_type, dimension, n_train=len(vectors), metric=metric)
+    )
+    
+    if not index.is_trained:
+        sample_size = settings.VECTOR_INDEX_TRAIN_SAMPLE_SIZE
+        if len(vectors) > sample_size:
+            rng = np.random.default_rng(0)
+            sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        else:
+            sample = vectors
+        index.train(sample)
+    
+    if len(vectors):
+        index.add_with_ids(vectors, np.ascontiguousarray(ids, dtype="int64"))
+    return index
+
+
+def index_type_of(index: faiss.Index) -> str:
+    """인덱스 객체의 타입명"""
+    index = unwrap(index)
+    if isinstance(index, faiss.IndexHNSWFlat):
+        return INDEX_HNSW_FLAT
+    if isinstance(index, faiss.IndexIVFPQ):
+        return INDEX_IVF_PQ
+    if isinstance(index, faiss.IndexIVFFlat):
+        return INDEX_IVF_FLAT
+    return INDEX_FLAT
+
+
+def stored_ids(index: faiss.Index) -> np.ndarray:
+    """인덱스에 저장된 모든 벡터 ID (삭제 표시된 벡터 포함)"""
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.vector_to_array(index.id_map).astype("int64")
+    if isinstance(index, faiss.IndexIVF):
+        invlists = index.invlists
+        parts = [
+            faiss.rev_swig_ptr(invlists.get_ids(list_no), invlists.list_size(list_no)).copy()
+            for list_no in range(index.nlist)
+            if invlists.list_size(list_no)
+        ]
+        return np.concatenate(parts).astype("int64") if parts else np.empty(0, dtype="int64")
+    return np.arange(index.ntotal, dtype="int64")
+
+
+def reconstruct_ids(index: faiss.Index, ids: np.ndarray) -> np.ndarray:
+    """지정한 ID의 벡터 복원 (IVF-PQ는 근사값)"""
+    ids = np.ascontiguousarray(ids, dtype="int64")
+    if len(ids) == 0:
+        return np.empty((0, index.d), dtype="float32")
+    if isinstance(index, faiss.IndexIVF):
+        # 임의의 ID로 복원하려면 해시 테이블 형태의 direct map 필요
+        if index.direct_map.type != faiss.DirectMap.Hashtable:
+            index.set_direct_map_type(faiss.DirectMap.Hashtable)
+    elif not has_ids(index):
+        return index.reconstruct_n(0, index.ntotal)[ids]
+    return index.reconstruct_batch(ids)
+
+
+def ensure_ids(index: faiss.Index) -> faiss.Index:
+    """이전 버전(위치 기반 ID) 인덱스를 같은 ID를 갖는 ID 인덱스로 변환"""
+    if has_ids(index):
+        return index
+    vectors = reconstruct_ids(index, np.arange(index.ntotal, dtype="int64"))
+    return build_index(index_type_of(index), index.d, vectors, metric_of(index))
+
+
+def read_index(path: str, mmap: bool = False) -> faiss.Index:
+    """인덱스 파일 로드 (mmap=True면 벡터/코드 영역을 복사하지 않고 메모리 매핑)
+    
+    IO_FLAG_MMAP_IFC는 flat/HNSW/IVF 모두 매핑하고, 이를 지원하지 않는 이전 FAISS의
+    IO_FLAG_MMAP은 IVF 역리스트만 매핑한다. 매핑된 인덱스는 읽기 전용이므로
+    변경 전에 materialize로 메모리에 복사해야 한다.
+    """
+    if not mmap:
+        return faiss.read_index(path)
+    flag = getattr(faiss, "IO_FLAG_MMAP_IFC", None) or faiss.IO_FLAG_MMAP
+    return faiss.read_index(path, flag | faiss.IO_FLAG_READ_ONLY)
+
+
+def materialize(index: faiss.Index, path: str) -> faiss.Index:
+    """매핑된 인덱스를 변경 가능한 메모리 인덱스로 복사"""
+    try:
+        return faiss.deserialize_index(faiss.serialize_index(index))
+    except RuntimeError:
+        # 디스크 기반 역리스트(IO_FLAG_MMAP)는 직렬화할 수 없으므로 파일을 다시 읽음
+        return faiss.read_index(path)
+
+
+def bytes_per_vector(index: faiss.Index) -> int:
+    """벡터 하나가 차지하는 대략적인 메모리 (코드 + ID + 그래프 링크)"""
+    inner = unwrap(index)
+    if isinstance(inner, faiss.IndexIVF):
+        size = inner.code_size + 8
+    elif isinstance(inner, faiss.IndexHNSW):
+        # 0레벨 이웃 링크 + 저장 벡터
+        size = inner.d * 4 + inner.hnsw.nb_neighbors(0) * 4
+    else:
+        size = inner.d * 4
+    if isinstance(index, faiss.IndexIDMap2):
+        size += 8 + 16  # id_map + rev_map
+    elif isinstance(index, faiss.IndexIDMap):
+        size += 8
+    return size
+
+
+def make_search_params(
+    index: faiss.Index,
+    nprobe: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    selected_ids: Optional[np.ndarray] = None,
+    excluded_ids: Optional[np.ndarray] = None
+) -> Optional[faiss.SearchParameters]:
+    """쿼리별 검색 파라미터 (인덱스에 저장된 기본값을 바꾸지 않음)
+    
+    selected_ids를 주면 IDSelectorBatch로 해당 ID만 검색 대상으로 삼고,
+    excluded_ids를 주면 해당 ID(삭제 표시된 벡터)를 검색에서 제외한다.
+    """
+    if excluded_ids is not None and len(excluded_ids) == 0:
+        excluded_ids = None
+    if not nprobe and not ef_search and selected_ids is None and excluded_ids is None:
+        return None
+    
+    index = unwrap(index)
+    if isinstance(index, faiss.IndexIVF):
+        params = faiss.SearchParametersIVF()
+        params.nprobe = min(nprobe or index.nprobe, index.nlist)
+    elif isinstance(index, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW()
+        params.efSearch = ef_search or index.hnsw.efSearch
+    else:
+        params = faiss.SearchParameters()
+    
+    if selected_ids is not None:
+        selector = faiss.IDSelectorBatch(np.ascontiguousarray(selected_ids, dtype="int64"))
+        params.sel = selector
+        # params보다 selector가 먼저 해제되지 않도록 참조 유지
+        params.selector_ref = selector
+    elif excluded_ids is not None:
+        excluded = faiss.IDSelectorBatch(np.ascontiguousarray(excluded_ids, dtype="int64"))
+        selector = faiss.IDSelectorNot(excluded)
+        params.sel = selector
+        params.selector_ref = (selector, excluded)
+    return params
+
+
+def describe_index(index: faiss.Index) -> Dict[str, Any]:
+    """인덱스 타입과 파라미터"""
+    info: Dict[str, Any] = {
+        "type": index_type_of(index),
+        "metric": metric_of(index),
+        "is_trained": index.is_trained
+    }
+    index = unwrap(index)
+    if isinstance(index, faiss.IndexIVF):
+        info["nlist"] = index.nlist
+        info["nprobe"] = index.nprobe
+    if isinstance(index, faiss.IndexIVFPQ):
+        info["pq_m"] = index.pq.M
+        info["pq_nbits"] = index.pq.nbits
+    if isinstance(index, faiss.IndexHNSW):
+        info["hnsw_m"] = index.hnsw.nb_neighbors(1)
+        info["ef_construction"] = index.hnsw.efConstruction
+        info["ef_search"] = index.hnsw.efSearch
+    return info
@@ -0,0 +1,115 @@
+"""
+BM25 어휘 색인
+"""
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+
+# 영문/숫자 토큰 (부품 번호, 알람 코드처럼 -_./로 이어진 코드 포함)과 한글 연속 구간
+_TOKEN_RE = re.compile(r"[0-9a-z]+(?:[-_./][0-9a-z]+)*|[가-힣]+")
+_CODE_SEPARATORS = re.compile(r"[-_./]")
+
+
+def tokenize(text: str) -> List[str]:
+    """한국어 기술 문서용 토큰화
+    
+    한글은 조사/어미가 붙어도 어간이 일치하도록 음절 2-gram으로 나누고,
+    영문/숫자 코드는 전체("me-1234")와 구성 요소("me", "1234")를 모두 토큰으로 쓴다.
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    tokens = []
+    for match in _TOKEN_RE.finditer(text):
+        word = match.group()
+        if "가" <= word[0] <= "힣":
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+            if _CODE_SEPARATORS.search(word):
+                tokens.extend(part for part in _CODE_SEPARATORS.split(word) if part)
+    return tokens
+
+
+class BM25Index:
+    """벡터 ID 단위 BM25 역색인 (청크 추가/삭제 시 증분 갱신)"""
+    
+    def __init__(self, k1: float = None, b: float = None):
+        """색인 초기화"""
+        self.k1 = settings.BM25_K1 if k1 is None else k1
+        self.b = settings.BM25_B if b is None else b
+        self._postings: Dict[str, Dict[int, int]] = {}  # 토큰 -> {벡터 ID: 빈도}
+        self._lengths: Dict[int, int] = {}  # 벡터 ID -> 토큰 수
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}  # 삭제용 벡터별 고유 토큰
+        self._total_length = 0
+    
+    def __len__(self) -> int:
+        return len(self._lengths)
+    
+    def add(self, ids: Iterable[int], texts: Iterable[str]):
+        """청크 색인 (이미 있는 ID는 교체)"""
+        for vector_id, text in zip(ids, texts):
+            vector_id = int(vector_id)
+            self.remove([vector_id])
+            tokens = tokenize(text)
+            counts = Counter(tokens)
+            for term, count in counts.items():
+                self._postings.setdefault(term, {})[vector_id] = count
+            self._lengths[vector_id] = len(tokens)
+            self._doc_terms[vector_id] = tuple(counts)
+            self._total_length += len(tokens)
+    
+    def remove(self, ids: Iterable[int]):
+        """청크 색인 제거 (없는 ID는 무시)"""
+        for vector_id in ids:
+            vector_id = int(vector_id)
+            terms = self._doc_terms.pop(vector_id, None)
+            if terms is None:
+                continue
+            for term in terms:
+                postings = self._postings[term]
+                del postings[vector_id]
+                if not postings:
+                    del self._postings[term]
+            self._total_length -= self._lengths.pop(vector_id)
+    
+    def clear(self):
+        """색인 비우기"""
+        self.__init__(self.k1, self.b)
+    
+    def scores(
+        self,
+        query: str,
+        candidate_ids: Optional[np.ndarray] = None
+    ) -> Dict[int, float]:
+        """쿼리 토큰을 하나 이상 포함하는 청크의 BM25 점수 (candidate_ids로 범위 제한)"""
+        if not self._lengths:
+            return {}
+        candidates = set(candidate_ids.tolist()) if candidate_ids is not None else None
+        count = len(self._lengths)
+        avg_length = self._total_length / count or 1.0
+        
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for vector_id, tf in postings.items():
+                if candidates is not None and vector_id not in candidates:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[vector_id] / avg_length)
+                scores[vector_id] = scores.get(vector_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return scores
+    
+    def get_stats(self) -> Dict[str, int]:
+        """색인 통계"""
+        return {"chunks": len(self._lengths), "terms": len(self._postings)}
@@ -2,21 +2,70 @@
 LLM 프로바이더 추상화 레이어
 """
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, List, AsyncIterator
 import httpx
+import json
 import os
+import weakref
 from cryptography.fernet import Fernet
 import base64
 
 
+# 공유 클라이언트별 진행 중인 요청 수 (레지스트리가 교체한 클라이언트를 닫아도 되는지 판단)
+_in_flight: "weakref.WeakKeyDictionary[httpx.AsyncClient, int]" = weakref.WeakKeyDictionary()
+
+
+def in_flight_requests(client: httpx.AsyncClient) -> int:
+    """공유 클라이언트로 진행 중인 요청 수"""
+    return _in_flight.get(client, 0)
+
+
+async def _iter_sse_data(response: httpx.Response) -> AsyncIterator[Any]:
+    """SSE 응답의 data 필드를 JSON으로 순회 ([DONE]에서 종료)"""
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if not data:
+            continue
+        if data == "[DONE]":
+            return
+        yield json.loads(data)
+
+
 class LLMProvider(ABC):
-    """LLM 프로바이더 기본 클래스"""
+    """LLM 프로바이더 기본 클래스
+    
+    client를 지정하면 요청마다 연결을 새로 맺지 않고 공유 커넥션 풀을 사용한다.
+    """
+    
+    client: Optional[httpx.AsyncClient] = None
+    timeout: float = 60.0  # 공유 클라이언트가 없을 때 일회용 클라이언트 타임아웃
+    
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[httpx.AsyncClient]:
+        """요청에 사용할 HTTP 클라이언트 (공유 클라이언트가 없으면 일회용 생성)"""
+        if self.client is not None:
+            client = self.client
+            _in_flight[client] = _in_flight.get(client, 0) + 1
+            try:
+                yield client
+            finally:
+                _in_flight[client] -= 1
+            return
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            yield client
     
     @abstractmethod
     async def generate(self, prompt: str, **kwargs) -> str:
         """텍스트 생성"""
         pass
     
+    async def stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """텍스트를 생성되는 대로 조각 단위로 반환 (미지원 프로바이더는 한 번에 반환)"""
+        yield await self.generate(prompt, **kwargs)
+    
     @abstractmethod
     def is_available(self) -> bool:
         """프로바이더 사용 가능 여부"""
@@ -26,14 +75,20 @@ class LLMProvider(ABC):
 class OpenAIProvider(LLMProvider):
     """OpenAI 프로바이더"""
     
-    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-3.5-turbo",
+        client: Optional[httpx.AsyncClient] = None
+    ):
         self.api_key = api_key
         self.model = model
+        self.client = client
         self.base_url = "https://api.openai.com/v1"
     
     async def generate(self, prompt: str, **kwargs) -> str:
         """OpenAI API를 통한 텍스트 생성"""
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with self._session() as client:
             response = await client.post(
                 f"{self.base_url}/chat/completions",
                 headers={
@@ -50,6 +105,30 @@ class OpenAIProvider(LLMProvider):
             result = response.json()
             return result["choices"][0]["message"]["content"]
     
+    async def stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """OpenAI API 스트리밍 생성"""
+        async with self._session() as client:
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": self.model,
+                    "messages": [{"role": "user", "content": prompt}],
+                    **kwargs,
+                    "stream": True
+                }
+            ) as response:
+                response.raise_for_status()
+                async for event in _iter_sse_data(response):
+                    choices = event.get("choices") or [{}]
+                    text = (choices[0].get("delta") or {}).get("content")
+                    if text:
+                        yield text
+    
     def is_available(self) -> bool:
         return bool(self.api_key)
 
@@ -57,14 +136,20 @@ class OpenAIProvider(LLMProvider):
 class ClaudeProvider(LLMProvider):
     """Anthropic Claude 프로바이더"""
     
-    def __init__(self, api_key: str, model: str = "claude-3-sonnet-20240229"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "claude-3-sonnet-20240229",
+        client: Optional[httpx.AsyncClient] = None
+    ):
         self.api_key = api_key
         self.model = model
+        self.client = client
         self.base_url = "https://api.anthropic.com/v1"
     
     async def generate(self, prompt: str, **kwargs) -> str:
         """Claude API를 통한 텍스트 생성"""
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with self._session() as client:
             response = await client.post(
                 f"{self.base_url}/messages",
                 headers={
@@ -82,6 +167,33 @@ class ClaudeProvider(LLMProvider):
             result = response.json()
             return result["content"][0]["text"]
     
+    async def stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Claude API 스트리밍 생성"""
+        async with self._session() as client:
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/messages",
+                headers={
+                    "x-api-key": self.api_key,
+                    "anthropic-version": "2023-06-01",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": self.model,
+                    "max_tokens": kwargs.get("max_tokens", 1024),
+                    "messages": [{"role": "user", "content": prompt}],
+                    "stream": True
+                }
+            ) as response:
+                response.raise_for_status()
+                async for event in _iter_sse_data(response):
+                    if event.get("type") == "content_block_delta":
+                        text = event.get("delta", {}).get("text")
+                        if text:
+                            yield text
+                    elif event.get("type") == "message_stop":
+                        return
+    
     def is_available(self) -> bool:
         return bool(self.api_key)
 
@@ -89,14 +201,20 @@ class ClaudeProvider(LLMProvider):
 class GeminiProvider(LLMProvider):
     """Google Gemini 프로바이더"""
     
-    def __init__(self, api_key: str, model: str = "gemini-pro"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gemini-pro",
+        client: Optional[httpx.AsyncClient] = None
+    ):
         self.api_key = api_key
         self.model = model
+        self.client = client
         self.base_url = "https://generativelanguage.googleapis.com/v1beta"
     
     async def generate(self, prompt: str, **kwargs) -> str:
         """Gemini API를 통한 텍스트 생성"""
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with self._session() as client:
             response = await client.post(
                 f"{self.base_url}/models/{self.model}:generateContent",
                 params={"key": self.api_key},
@@ -110,6 +228,26 @@ class GeminiProvider(LLMProvider):
             result = response.json()
             return result["candidates"][0]["content"]["parts"][0]["text"]
     
+    async def stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Gemini API 스트리밍 생성"""
+        async with self._session() as client:
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/models/{self.model}:streamGenerateContent",
+                params={"key": self.api_key, "alt": "sse"},
+                json={
+                    "contents": [{
+                        "parts": [{"text": prompt}]
+                    }]
+                }
+            ) as response:
+                response.raise_for_status()
+                async for event in _iter_sse_data(response):
+                    for candidate in event.get("candidates", [])[:1]:
+                        for part in candidate.get("content", {}).get("parts", []):
+                            if part.get("text"):
+                                yield part["text"]
+    
     def is_available(self) -> bool:
         return bool(self.api_key)
 
@@ -117,14 +255,20 @@ class GeminiProvider(LLMProvider):
 class PerplexityProvider(LLMProvider):
     """Perplexity 프로바이더"""
     
-    def __init__(self, api_key: str, model: str = "llama-3-sonar-large-32k-online"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "llama-3-sonar-large-32k-online",
+        client: Optional[httpx.AsyncClient] = None
+    ):
         self.api_key = api_key
         self.model = model
+        self.client = client
         self.base_url = "https://api.perplexity.ai"
     
     async def generate(self, prompt: str, **kwargs) -> str:
         """Perplexity API를 통한 텍스트 생성"""
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with self._session() as client:
             response = await client.post(
                 f"{self.base_url}/chat/completions",
                 headers={
@@ -141,6 +285,30 @@ class PerplexityProvider(LLMProvider):
             result = response.json()
             return result["choices"][0]["message"]["content"]
     
+    async def stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Perplexity API 스트리밍 생성 (OpenAI 호환 형식)"""
+        async with self._session() as client:
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": self.model,
+                    "messages": [{"role": "user", "content": prompt}],
+                    **kwargs,
+                    "stream": True
+                }
+            ) as response:
+                response.raise_for_status()
+                async for event in _iter_sse_data(response):
+                    choices = event.get("choices") or [{}]
+                    text = (choices[0].get("delta") or {}).get("content")
+                    if text:
+                        yield text
+    
     def is_available(self) -> bool:
         return bool(self.api_key)
 
@@ -148,13 +316,21 @@ class PerplexityProvider(LLMProvider):
 class OllamaProvider(LLMProvider):
     """Ollama 프로바이더 (로컬)"""
     
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama2:7b"):
+    timeout = 120.0
+    
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        model: str = "llama2:7b",
+        client: Optional[httpx.AsyncClient] = None
+    ):
         self.base_url = base_url
         self.model = model
+        self.client = client
     
     async def generate(self, prompt: str, **kwargs) -> str:
         """Ollama를 통한 텍스트 생성"""
-        async with httpx.AsyncClient(timeout=120.0) as client:
+        async with self._session() as client:
             response = await client.post(
                 f"{self.base_url}/api/generate",
                 json={
@@ -168,6 +344,31 @@ class OllamaProvider(LLMProvider):
             result = response.json()
             return result.get("response", "")
     
+    async def stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Ollama 스트리밍 생성 (줄 단위 JSON)"""
+        async with self._session() as client:
+            async with client.stream(
+                "POST",
+                f"{self.base_url}/api/generate",
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    **kwargs,
+                    "stream": True
+                }
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    event = json.loads(line)
+                    if event.get("error"):
+                        raise RuntimeError(event["error"])
+                    if event.get("response"):
+                        yield event["response"]
+                    if event.get("done"):
+                        return
+    
     def is_available(self) -> bool:
         """Ollama 서버 연결 확인"""
         try:
@@ -212,9 +413,10 @@ class LLMProviderFactory:
         api_key: Optional[str] = None,
         base_url: Optional[str] = None,
         model: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
         **kwargs
     ) -> Optional[LLMProvider]:
-        """프로바이더 생성"""
+        """프로바이더 생성 (client: 재사용할 공유 HTTP 클라이언트)"""
         provider_class = cls._providers.get(provider_name.lower())
         if not provider_class:
             return None
@@ -222,12 +424,17 @@ class LLMProviderFactory:
         if provider_name.lower() == "ollama":
             return provider_class(
                 base_url=base_url or "http://localhost:11434",
-                model=model or "llama2:7b"
+                model=model or "llama2:7b",
+                client=client
             )
         else:
             if not api_key:
                 return None
-            return provider_class(api_key=api_key, model=model or cls._get_default_model(provider_name))
+            return provider_class(
+                api_key=api_key,
+                model=model or cls._get_default_model(provider_name),
+                client=client
+            )
     
     @classmethod
     def _get_default_model(cls, provider_name: str) -> str:
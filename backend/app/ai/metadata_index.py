@@ -0,0 +1,119 @@
+"""
+메타데이터 역색인
+"""
+from typing import Dict, Any, Optional, Set, Iterable, Sequence, Tuple
+
+import numpy as np
+
+
+class MetadataIndex:
+    """메타데이터 값 -> 벡터 ID 역색인
+    
+    필터 조건을 FAISS 검색 전에 후보 ID 집합으로 바꿔, 필터링된 검색도
+    한 번에 top_k개를 채울 수 있게 한다.
+    """
+    
+    INDEXED_KEYS = ("document_id", "file_type", "page_number", "section_title")
+    
+    def __init__(self, indexed_keys: Iterable[str] = None):
+        """역색인 초기화"""
+        self.indexed_keys = tuple(indexed_keys or self.INDEXED_KEYS)
+        self._postings: Dict[str, Dict[Any, Set[int]]] = {key: {} for key in self.indexed_keys}
+    
+    def add(self, vector_id: int, metadata: Dict[str, Any]):
+        """벡터 메타데이터 색인"""
+        for key in self.indexed_keys:
+            value = metadata.get(key)
+            if value is None or not _is_hashable(value):
+                continue
+            self._postings[key].setdefault(value, set()).add(vector_id)
+    
+    def remove(self, vector_id: int, metadata: Dict[str, Any]):
+        """벡터 메타데이터 색인 제거"""
+        for key in self.indexed_keys:
+            value = metadata.get(key)
+            if value is None or not _is_hashable(value):
+                continue
+            ids = self._postings[key].get(value)
+            if ids is None:
+                continue
+            ids.discard(vector_id)
+            if not ids:
+                del self._postings[key][value]
+    
+    def add_column(self, key: str, ids: np.ndarray, codes: np.ndarray, values: Sequence[Any]):
+        """열 단위 메타데이터 일괄 색인 (codes: 값 사전 번호, -1은 값 없음)
+        
+        행마다 딕셔너리를 만들지 않고 코드별로 묶어 넣으므로 로드 시 재구성이 빠르다.
+        """
+        if key not in self._postings or len(ids) == 0:
+            return
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        ends = np.r_[starts[1:], len(sorted_codes)]
+        postings = self._postings[key]
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            code = int(sorted_codes[start])
+            if code < 0:
+                continue
+            value = values[code]
+            if value is None or not _is_hashable(value):
+                continue
+            postings.setdefault(value, set()).update(ids[order[start:end]].tolist())
+    
+    def clear(self):
+        """역색인 비우기"""
+        self._postings = {key: {} for key in self.indexed_keys}
+    
+    def split_filter(
+        self,
+        filter_dict: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """필터를 (색인된 키, 색인되지 않은 키) 조건으로 분리"""
+        indexed = {k: v for k, v in filter_dict.items() if k in self._postings}
+        others = {k: v for k, v in filter_dict.items() if k not in self._postings}
+        return indexed, others
+    
+    def lookup(self, filter_dict: Dict[str, Any]) -> Optional[np.ndarray]:
+        """필터 조건을 모두 만족하는 벡터 ID (색인된 키가 없으면 None)
+        
+        값으로 리스트를 주면 그중 하나와 일치하는 벡터를 찾는다.
+        """
+        indexed, _ = self.split_filter(filter_dict or {})
+        if not indexed:
+            return None
+        
+        result: Optional[Set[int]] = None
+        # 후보가 적은 조건부터 교집합
+        for ids in sorted((self._match(k, v) for k, v in indexed.items()), key=len):
+            result = ids if result is None else result & ids
+            if not result:
+                return np.empty(0, dtype="int64")
+        return np.fromiter(result, dtype="int64", count=len(result))
+    
+    def _match(self, key: str, value: Any) -> Set[int]:
+        """단일 조건에 해당하는 벡터 ID"""
+        postings = self._postings[key]
+        if isinstance(value, (list, tuple, set)):
+            matched: Set[int] = set()
+            for v in value:
+                if _is_hashable(v):
+                    matched |= postings.get(v, set())
+            return matched
+        if not _is_hashable(value):
+            return set()
+        return postings.get(value, set())
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """색인 통계 (키별 고유 값 수)"""
+        return {key: len(values) for key, values in self._postings.items()}
+
+
+def _is_hashable(value: Any) -> bool:
+    """딕셔너리 키로 사용할 수 있는 값인지 여부"""
+    try:
+        hash(value)
+        return True
+    except TypeError:
+        return False
@@ -0,0 +1,204 @@
+"""
+LLM 프로바이더 레지스트리 (프로바이더 인스턴스와 공유 HTTP 커넥션 풀)
+"""
+import asyncio
+import importlib.util
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.ai.llm_providers import LLMProvider, LLMProviderFactory, in_flight_requests
+
+
+# HTTP/2는 h2 패키지가 있을 때만 사용 (httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+DEFAULT_PROVIDER_KEY = "default:ollama"
+
+
+class LLMProviderRegistry:
+    """프로바이더 설정별로 인스턴스를 재사용하는 레지스트리
+    
+    요청마다 API 키를 복호화하고 새 클라이언트로 TCP/TLS 연결을 맺는 대신,
+    (프로바이더, 접속 주소)마다 keep-alive 커넥션 풀을 가진 AsyncClient 하나를
+    두고 프로바이더 인스턴스를 캐시한다. 인스턴스는 설정 값(주소, 모델, 암호화된
+    API 키)이 바뀌었을 때만 다시 만들고, 접속 주소가 같으면 클라이언트는 그대로 쓴다.
+    """
+    
+    def __init__(self, client_factory: Optional[Callable[..., httpx.AsyncClient]] = None):
+        """레지스트리 초기화 (client_factory: 테스트용 클라이언트 생성 함수)"""
+        self._client_factory = client_factory or httpx.AsyncClient
+        self._lock = threading.Lock()
+        self._providers: Dict[Hashable, Tuple[Hashable, LLMProvider]] = {}
+        self._clients: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+        self._retired: List[httpx.AsyncClient] = []
+        self._closing: set = set()  # 닫는 중인 교체된 클라이언트의 작업 (GC 방지)
+        self.created = 0
+        self.hits = 0
+    
+    def _client_options(self, provider_name: str) -> Dict[str, Any]:
+        """프로바이더별 커넥션 풀/타임아웃 설정"""
+        local = provider_name == "ollama"
+        read_timeout = settings.OLLAMA_HTTP_TIMEOUT if local else settings.LLM_HTTP_TIMEOUT
+        return {
+            "timeout": httpx.Timeout(read_timeout, connect=settings.LLM_HTTP_CONNECT_TIMEOUT),
+            "limits": httpx.Limits(
+                max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY
+            ),
+            # 로컬 Ollama는 평문 HTTP/1.1만 지원
+            "http2": settings.LLM_HTTP2 and HTTP2_AVAILABLE and not local
+        }
+    
+    def _client_for(self, provider_name: str, base_url: Optional[str]) -> httpx.AsyncClient:
+        """(프로바이더, 접속 주소)별 공유 클라이언트 (잠금을 잡은 상태에서 호출)"""
+        key = (provider_name, base_url or "")
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = self._client_factory(**self._client_options(provider_name))
+            self._clients[key] = client
+        return client
+    
+    def get(
+        self,
+        key: Hashable,
+        version: Hashable,
+        provider_name: str,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        api_key_loader: Optional[Callable[[], Optional[str]]] = None
+    ) -> Optional[LLMProvider]:
+        """캐시된 프로바이더 반환 (version이 바뀌었으면 다시 생성)
+        
+        key는 프로바이더 설정 행 ID처럼 안정적인 식별자, version은 인스턴스에 영향을 주는
+        설정 값 묶음이다. api_key_loader는 인스턴스를 새로 만들 때만 호출된다.
+        """
+        provider_name = provider_name.lower()
+        with self._lock:
+            self._close_idle_retired()
+            cached = self._providers.get(key)
+            if cached is not None and cached[0] == version:
+                self.hits += 1
+                return cached[1]
+            
+            provider = LLMProviderFactory.create_provider(
+                provider_name,
+                api_key=api_key_loader() if api_key_loader else None,
+                base_url=base_url,
+                model=model,
+                client=self._client_for(provider_name, base_url)
+            )
+            if provider is None:
+                self._providers.pop(key, None)
+            else:
+                self._providers[key] = (version, provider)
+                self.created += 1
+            self._retire_unused_clients()
+            return provider
+    
+    def default_provider(self) -> LLMProvider:
+        """설정된 프로바이더가 없을 때 쓰는 기본 Ollama 프로바이더"""
+        return self.get(
+            DEFAULT_PROVIDER_KEY,
+            (settings.OLLAMA_BASE_URL, settings.OLLAMA_MODEL),
+            "ollama",
+            base_url=settings.OLLAMA_BASE_URL,
+            model=settings.OLLAMA_MODEL
+        )
+    
+    def invalidate(self, key: Optional[Hashable] = None):
+        """프로바이더 캐시 무효화 (key가 없으면 전체)
+        
+        클라이언트는 남겨 두어 같은 주소로 다시 만들어지는 프로바이더가 연결을 이어 쓴다.
+        """
+        with self._lock:
+            if key is None:
+                self._providers.clear()
+            else:
+                self._providers.pop(key, None)
+    
+    def _retire_unused_clients(self):
+        """어떤 프로바이더도 쓰지 않는 클라이언트를 목록에서 제외 (잠금을 잡은 상태에서 호출)
+        
+        진행 중인 요청이 아직 사용하고 있을 수 있으므로 바로 닫지 않고, 이후 get()에서
+        진행 중인 요청이 없을 때 닫는다 (남은 클라이언트는 close() 때 닫음).
+        """
+        in_use = {id(provider.client) for _, provider in self._providers.values()}
+        for key, client in list(self._clients.items()):
+            if id(client) not in in_use:
+                self._retired.append(self._clients.pop(key))
+    
+    def _close_idle_retired(self):
+        """진행 중인 요청이 없는 교체된 클라이언트 닫기 (잠금을 잡은 상태에서 호출)
+        
+        닫기는 비동기이므로 이벤트 루프 안에서 호출됐을 때만 작업으로 예약하고,
+        작업 스레드에서 호출되면 다음 기회로 미룬다.
+        """
+        if not self._retired:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        
+        remaining = []
+        for client in self._retired:
+            if client.is_closed:
+                continue
+            if in_flight_requests(client):
+                remaining.append(client)
+                continue
+            task = loop.create_task(client.aclose())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        self._retired = remaining
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """레지스트리 통계"""
+        with self._lock:
+            return {
+                "providers": len(self._providers),
+                "clients": len(self._clients),
+                "retired_clients": len(self._retired),
+                "created": self.created,
+                "hits": self.hits,
+                "http2": settings.LLM_HTTP2 and HTTP2_AVAILABLE
+            }
+    
+    async def close(self):
+        """모든 클라이언트 연결 종료"""
+        with self._lock:
+            clients = list(self._clients.values()) + self._retired
+            self._providers.clear()
+            self._clients.clear()
+            self._retired = []
+        await asyncio.gather(
+            *(client.aclose() for client in clients if not client.is_closed),
+            return_exceptions=True
+        )
+
+
+_registry: Optional[LLMProviderRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_provider_registry() -> LLMProviderRegistry:
+    """프로세스 공용 프로바이더 레지스트리"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LLMProviderRegistry()
+    return _registry
+
+
+async def close_provider_registry():
+    """공용 레지스트리의 HTTP 연결 정리"""
+    global _registry
+    with _registry_lock:
+        registry, _registry = _registry, None
+    if registry is not None:
+        await registry.close()
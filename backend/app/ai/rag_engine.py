@@ -1,13 +1,19 @@
 """
 RAG 검색 엔진
 """
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Sequence, AsyncIterator
 from dataclasses import dataclass
+import asyncio
+import threading
 
 from app.core.config import settings
 from app.ai.vector_store import VectorStore
+from app.ai.vector_metadata import vector_id_for
 from app.ai.embedding import EmbeddingGenerator
+from app.ai.embedding_batcher import EmbeddingBatcher
 from app.ai.llm_providers import LLMProvider
+from app.ai.reranker import CrossEncoderReranker
+from app.ai.response_cache import LLMResponseCache, get_response_cache
 
 
 @dataclass
@@ -20,6 +26,21 @@ class SearchResult:
     metadata: Dict[str, Any]
 
 
+# 검색 방식
+SEARCH_MODE_HYBRID = "hybrid"
+SEARCH_MODE_SEMANTIC = "semantic"
+SEARCH_MODE_LEXICAL = "lexical"
+SEARCH_MODES = (SEARCH_MODE_HYBRID, SEARCH_MODE_SEMANTIC, SEARCH_MODE_LEXICAL)
+
+
+# 답변 생성 안내 문구
+NO_CONTEXT_ANSWER = "관련 문서를 찾을 수 없습니다."
+ANSWER_ERROR_MESSAGE = "답변 생성 중 오류가 발생했습니다."
+
+# 응답 캐시 키에 들어가는 답변 프롬프트 템플릿 이름 (프롬프트를 바꾸면 버전 변경)
+ANSWER_TEMPLATE = "rag_answer:v1"
+
+
 @dataclass
 class AnswerWithSources:
     """출처가 포함된 답변"""
@@ -31,20 +52,51 @@ class AnswerWithSources:
 class RAGSearchEngine:
     """RAG 기반 검색 엔진"""
     
-    def __init__(self, vector_db_path: str = None, llm_provider: Optional[LLMProvider] = None):
-        """RAG 검색 엔진 초기화"""
-        self.vector_store = VectorStore(vector_db_path)
+    def __init__(
+        self,
+        vector_db_path: str = None,
+        llm_provider: Optional[LLMProvider] = None,
+        embedding_generator: Optional[EmbeddingGenerator] = None,
+        reranker: Optional[CrossEncoderReranker] = None,
+        response_cache: Optional[LLMResponseCache] = None
+    ):
+        """RAG 검색 엔진 초기화 (response_cache 미지정 시 공유 응답 캐시 사용)"""
+        self.vector_store = VectorStore(vector_db_path, embedding_generator)
+        generator = self.vector_store.embedding_generator
+        self.embedding_batcher = EmbeddingBatcher(generator, query_cache=generator.query_cache)
         self.llm_provider = llm_provider
+        if reranker is None and settings.RERANK_ENABLED:
+            reranker = CrossEncoderReranker()
+        self.reranker = reranker
+        self.response_cache = response_cache if response_cache is not None else get_response_cache()
+    
+    @property
+    def read_only(self) -> bool:
+        """다른 프로세스가 벡터 저장소에 기록 중이어서 검색만 가능한지 여부"""
+        return self.vector_store.read_only
     
     def index_document(
         self,
         document_id: str,
-        chunks: List[Dict[str, Any]]
-    ) -> List[str]:
-        """문서 인덱싱"""
+        chunks: List[Dict[str, Any]],
+        document_metadata: Optional[Dict[str, Any]] = None
+    ) -> List[int]:
+        """문서 인덱싱 (document_metadata는 모든 청크 메타데이터에 포함)
+        
+        벡터 ID는 청크 ID(없으면 문서 ID와 청크 순번)에서 만들어 재인덱싱해도 유지되고,
+        새 청크 목록에 없는 이전 벡터는 삭제한다.
+        """
+        vector_ids = [
+            vector_id_for(chunk.get("id") or f"{document_id}:{chunk['chunk_index']}")
+            for chunk in chunks
+        ]
+        stale_ids = set(self.vector_store.document_vector_ids(document_id).tolist()) - set(vector_ids)
+        self.vector_store.delete_documents(stale_ids)
+        
         texts = [chunk["content"] for chunk in chunks]
         metadatas = [
             {
+                **(document_metadata or {}),
                 "document_id": document_id,
                 "chunk_index": chunk["chunk_index"],
                 **chunk.get("metadata", {})
@@ -52,22 +104,141 @@ class RAGSearchEngine:
             for chunk in chunks
         ]
         
-        vector_ids = self.vector_store.add_documents(texts, metadatas)
-        return vector_ids
+        self._invalidate_responses([document_id])
+        return self.vector_store.add_documents(texts, metadatas, ids=vector_ids)
     
     def semantic_search(
         self,
         query: str,
         top_k: int = 5,
-        filter_dict: Dict[str, Any] = None
+        filter_dict: Dict[str, Any] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        min_score: Optional[float] = None
     ) -> List[SearchResult]:
-        """의미 기반 검색"""
-        results = self.vector_store.search(query, top_k, filter_dict)
+        """의미 기반 검색 (min_score 미만 결과 제외)"""
+        results = self.vector_store.search(
+            query, self._candidate_count(top_k), filter_dict, nprobe, ef_search
+        )
+        results = self._to_search_results(results, min_score)
+        if self.reranker is None:
+            return results[:top_k]
+        return self.reranker.rerank(query, results, top_k)
+    
+    async def semantic_search_async(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter_dict: Dict[str, Any] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        min_score: Optional[float] = None
+    ) -> List[SearchResult]:
+        """의미 기반 검색 (동시 요청의 쿼리 임베딩을 배치 처리)"""
+        if self.vector_store.is_empty():
+            return []
+        
+        query_embedding = await self.embedding_batcher.embed(query)
+        # FAISS 검색은 동기 호출이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+        results = await asyncio.get_running_loop().run_in_executor(
+            None, self.vector_store.search_by_vector,
+            query_embedding, self._candidate_count(top_k), filter_dict, nprobe, ef_search
+        )
+        return await self._rerank_async(query, self._to_search_results(results, min_score), top_k)
+    
+    async def hybrid_search_async(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter_dict: Dict[str, Any] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        min_score: Optional[float] = None,
+        mode: Optional[str] = None
+    ) -> List[SearchResult]:
+        """의미 검색과 BM25 검색을 RRF로 결합한 검색 (mode 미지정 시 SEARCH_MODE)
+        
+        부품 번호, 알람 코드처럼 임베딩이 놓치기 쉬운 정확한 표현은 BM25가 찾는다.
+        min_score는 의미 검색 결과에만 적용하고, 결합 점수는 0~1로 정규화한다.
+        """
+        mode = mode or settings.SEARCH_MODE
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"지원하지 않는 검색 방식입니다: {mode}")
+        if mode == SEARCH_MODE_SEMANTIC:
+            return await self.semantic_search_async(
+                query, top_k, filter_dict, nprobe, ef_search, min_score
+            )
+        
+        loop = asyncio.get_running_loop()
+        candidates = self._candidate_count(top_k)
+        if mode == SEARCH_MODE_LEXICAL:
+            fetch_k = candidates
+        else:
+            fetch_k = candidates * settings.SEARCH_HYBRID_FETCH_MULTIPLIER
+        # 하이브리드 검색은 BM25 색인 구성을 기다리지 않고 그동안 의미 검색 결과만 사용
+        lexical_task = loop.run_in_executor(
+            None, self.vector_store.lexical_search, query, fetch_k, filter_dict,
+            mode == SEARCH_MODE_LEXICAL
+        )
+        if mode == SEARCH_MODE_LEXICAL:
+            lexical = self._to_search_results(await lexical_task, float("-inf"))
+            return await self._rerank_async(query, lexical, top_k)
+        
+        semantic = []
+        if not self.vector_store.is_empty():
+            query_embedding = await self.embedding_batcher.embed(query)
+            semantic = await loop.run_in_executor(
+                None, self.vector_store.search_by_vector,
+                query_embedding, fetch_k, filter_dict, nprobe, ef_search
+            )
+            if min_score is None:
+                min_score = settings.SEARCH_MIN_SCORE
+            semantic = [result for result in semantic if result[1] >= min_score]
+        
+        fused = reciprocal_rank_fusion(
+            {"vector": semantic, "lexical": await lexical_task},
+            {"vector": settings.SEARCH_VECTOR_WEIGHT, "lexical": settings.SEARCH_LEXICAL_WEIGHT},
+            settings.SEARCH_RRF_K
+        )
+        return await self._rerank_async(
+            query, self._to_search_results(fused[:candidates], float("-inf")), top_k
+        )
+    
+    def _candidate_count(self, top_k: int) -> int:
+        """검색 단계에서 가져올 후보 수 (재순위화 시 RERANK_CANDIDATES까지 확대)"""
+        if self.reranker is None:
+            return top_k
+        return max(top_k, settings.RERANK_CANDIDATES)
+    
+    async def _rerank_async(
+        self,
+        query: str,
+        results: List[SearchResult],
+        top_k: int
+    ) -> List[SearchResult]:
+        """재순위화 사용 시 후보를 다시 정렬해 top_k개 반환"""
+        if self.reranker is None:
+            return results[:top_k]
+        return await self.reranker.rerank_async(query, results, top_k)
+    
+    def _to_search_results(
+        self,
+        results: List[Tuple[int, float, Dict[str, Any]]],
+        min_score: Optional[float] = None
+    ) -> List[SearchResult]:
+        """벡터 검색 결과를 SearchResult로 변환"""
+        if min_score is None:
+            min_score = settings.SEARCH_MIN_SCORE
         
         search_results = []
         for vector_id, score, metadata in results:
+            # 관련성이 낮은 청크는 LLM 컨텍스트에서 제외
+            if score < min_score:
+                continue
+            # 벡터 저장소가 결과마다 새로 만든 딕셔너리이므로 본문을 꺼내도 됨
+            content = metadata.pop("content", "")
             search_results.append(SearchResult(
-                content=metadata.get("content", ""),
+                content=content,
                 score=score,
                 document_id=metadata.get("document_id", ""),
                 chunk_index=metadata.get("chunk_index", 0),
@@ -85,11 +256,99 @@ class RAGSearchEngine:
         """검색 결과 기반 답변 생성"""
         if not context_results:
             return AnswerWithSources(
-                answer="관련 문서를 찾을 수 없습니다.",
+                answer=NO_CONTEXT_ANSWER,
                 sources=[],
                 confidence=0.0
             )
         
+        # 같은 컨텍스트의 같은(또는 유사한) 질문이면 캐시된 답변 사용
+        provider = self._answer_provider(llm_provider)
+        scope, query_embedding, answer = await self._cached_answer(query, context_results, provider)
+        if answer is None:
+            # LLM 프로바이더를 통한 답변 생성
+            try:
+                answer = await provider.generate(self.build_answer_prompt(query, context_results))
+                self._store_answer(scope, query, answer, context_results, query_embedding)
+            except Exception as e:
+                print(f"LLM 답변 생성 오류: {e}")
+                answer = ANSWER_ERROR_MESSAGE
+        
+        return AnswerWithSources(
+            answer=answer,
+            sources=context_results,
+            confidence=self.answer_confidence(context_results)
+        )
+    
+    async def stream_answer(
+        self,
+        query: str,
+        context_results: List[SearchResult],
+        llm_provider: Optional[LLMProvider] = None
+    ) -> AsyncIterator[str]:
+        """검색 결과 기반 답변을 생성되는 대로 조각 단위로 반환"""
+        if not context_results:
+            yield NO_CONTEXT_ANSWER
+            return
+        
+        provider = self._answer_provider(llm_provider)
+        scope, query_embedding, answer = await self._cached_answer(query, context_results, provider)
+        if answer is not None:
+            yield answer
+            return
+        
+        parts = []
+        async for text in provider.stream(self.build_answer_prompt(query, context_results)):
+            parts.append(text)
+            yield text
+        # 끝까지 생성된 답변만 캐시
+        self._store_answer(scope, query, "".join(parts), context_results, query_embedding)
+    
+    async def _cached_answer(
+        self,
+        query: str,
+        context_results: List[SearchResult],
+        provider: LLMProvider
+    ) -> Tuple[Optional[str], Optional[Any], Optional[str]]:
+        """응답 캐시 조회 결과 (캐시 범위, 의미 일치용 쿼리 임베딩, 캐시된 답변)"""
+        if self.response_cache is None:
+            return None, None, None
+        scope = LLMResponseCache.make_scope(
+            provider,
+            ANSWER_TEMPLATE,
+            [f"{result.document_id}:{result.chunk_index}" for result in context_results],
+            [result.content for result in context_results]
+        )
+        query_embedding = None
+        if self.response_cache.semantic:
+            # 검색 단계에서 계산되어 쿼리 임베딩 캐시에 있는 경우가 대부분
+            query_embedding = await self.embedding_batcher.embed(query)
+        return scope, query_embedding, self.response_cache.get(scope, query, query_embedding)
+    
+    def _store_answer(
+        self,
+        scope: Optional[str],
+        query: str,
+        answer: str,
+        context_results: List[SearchResult],
+        query_embedding: Optional[Any] = None
+    ):
+        """생성된 답변을 응답 캐시에 저장"""
+        if self.response_cache is None or scope is None or not answer:
+            return
+        self.response_cache.put(
+            scope, query, answer,
+            {result.document_id for result in context_results},
+            query_embedding
+        )
+    
+    def _invalidate_responses(self, document_ids: List[str]):
+        """문서가 바뀌거나 삭제되면 그 문서를 근거로 한 캐시된 응답 제거"""
+        if self.response_cache is not None:
+            self.response_cache.invalidate_documents(document_ids)
+    
+    @staticmethod
+    def build_answer_prompt(query: str, context_results: List[SearchResult]) -> str:
+        """검색 결과를 컨텍스트로 하는 답변 프롬프트"""
         # 컨텍스트 구성
         context_text = "\n\n".join([
             f"[문서 {i+1}]\n{result.content}"
@@ -97,7 +356,7 @@ class RAGSearchEngine:
         ])
         
         # 프롬프트 구성
-        prompt = f"""다음 문서들을 참고하여 질문에 답변해주세요.
+        return f"""다음 문서들을 참고하여 질문에 답변해주세요.
 
 문서 내용:
 {context_text}
@@ -105,33 +364,122 @@ class RAGSearchEngine:
 질문: {query}
 
 답변:"""
-        
-        # LLM 프로바이더를 통한 답변 생성
+
+    @staticmethod
+    def answer_confidence(context_results: List[SearchResult]) -> float:
+        """답변 신뢰도 (검색 결과 점수의 평균)"""
+        if not context_results:
+            return 0.0
+        return sum(r.score for r in context_results) / len(context_results)
+    
+    def _answer_provider(self, llm_provider: Optional[LLMProvider] = None) -> LLMProvider:
+        """답변에 사용할 프로바이더 (지정되지 않으면 기본 Ollama)"""
         provider = llm_provider or self.llm_provider
         if not provider:
-            # 기본 Ollama 사용
-            from app.ai.llm_providers import OllamaProvider
-            provider = OllamaProvider(
-                base_url=settings.OLLAMA_BASE_URL,
-                model=settings.OLLAMA_MODEL
-            )
-        
-        try:
-            answer = await provider.generate(prompt)
-        except Exception as e:
-            print(f"LLM 답변 생성 오류: {e}")
-            answer = "답변 생성 중 오류가 발생했습니다."
-        
-        # 신뢰도 계산 (검색 결과 점수의 평균)
-        confidence = sum(r.score for r in context_results) / len(context_results) if context_results else 0.0
-        
-        return AnswerWithSources(
-            answer=answer,
-            sources=context_results,
-            confidence=confidence
-        )
+            from app.ai.provider_registry import get_provider_registry
+            provider = get_provider_registry().default_provider()
+        return provider
+    
+    def delete_document(self, document_id: str) -> int:
+        """문서의 벡터 삭제 (삭제된 벡터 수 반환)"""
+        self._invalidate_responses([document_id])
+        return self.vector_store.delete_by_document(document_id)
+    
+    def compact(self) -> Optional[Dict[str, Any]]:
+        """벡터 인덱스 압축 (삭제 표시된 벡터 정리)"""
+        return self.vector_store.compact()
+    
+    def checkpoint(self):
+        """벡터 인덱스를 디스크에 체크포인트"""
+        self.vector_store.checkpoint()
+    
+    def reload(self, discard_log: bool = False):
+        """벡터 인덱스 다시 로드 (임베딩 모델은 유지, 인덱스가 바뀌었으므로 응답 캐시는 비움)"""
+        self.vector_store.reload(discard_log=discard_log)
+        if self.response_cache is not None:
+            self.response_cache.clear()
     
     def get_stats(self) -> Dict[str, Any]:
         """검색 엔진 통계"""
-        return self.vector_store.get_stats()
+        stats = self.vector_store.get_stats()
+        stats["embedding_batcher"] = self.embedding_batcher.get_stats()
+        if self.embedding_batcher.query_cache is not None:
+            stats["query_cache"] = self.embedding_batcher.query_cache.get_stats()
+        if self.reranker is not None:
+            stats["reranker"] = self.reranker.get_stats()
+        if self.response_cache is not None:
+            stats["response_cache"] = self.response_cache.get_stats()
+        return stats
+    
+    def close(self):
+        """백그라운드 리소스 정리"""
+        self.embedding_batcher.close()
+        if self.reranker is not None:
+            self.reranker.close()
+        self.vector_store.close()
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Dict[str, Sequence[Tuple[int, float, Dict[str, Any]]]],
+    weights: Dict[str, float],
+    k: int = 60
+) -> List[Tuple[int, float, Dict[str, Any]]]:
+    """여러 순위 목록을 가중 RRF로 결합
+    
+    점수는 모든 목록에서 1위일 때 1이 되도록 정규화하고, 각 목록의 원래 점수는
+    메타데이터의 "<이름>_score"에 남긴다.
+    """
+    fused: Dict[int, float] = {}
+    metadatas: Dict[int, Dict[str, Any]] = {}
+    for name, results in ranked_lists.items():
+        weight = weights.get(name, 1.0)
+        for rank, (vector_id, score, metadata) in enumerate(results, start=1):
+            fused[vector_id] = fused.get(vector_id, 0.0) + weight / (k + rank)
+            metadatas.setdefault(vector_id, metadata)[f"{name}_score"] = score
+    
+    max_score = sum(weights.get(name, 1.0) for name in ranked_lists) / (k + 1) or 1.0
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)
+    return [(vector_id, score / max_score, metadatas[vector_id]) for vector_id, score in ranked]
+
+
+# 프로세스 공유 RAG 엔진
+# 임베딩 모델 로딩과 인덱스 읽기는 수 초가 걸리므로 요청마다 만들지 않고
+# 애플리케이션 시작 시 한 번 생성하여 의존성으로 주입한다.
+_rag_engine: Optional[RAGSearchEngine] = None
+_rag_engine_lock = threading.Lock()
+
+
+def init_rag_engine(vector_db_path: str = None) -> RAGSearchEngine:
+    """공유 RAG 엔진 초기화 (이미 있으면 기존 인스턴스 반환)"""
+    global _rag_engine
+    with _rag_engine_lock:
+        if _rag_engine is None:
+            _rag_engine = RAGSearchEngine(vector_db_path)
+        return _rag_engine
+
+
+def get_rag_engine() -> RAGSearchEngine:
+    """공유 RAG 엔진 의존성"""
+    if _rag_engine is None:
+        return init_rag_engine()
+    return _rag_engine
+
+
+def shutdown_rag_engine():
+    """공유 RAG 엔진 정리 (애플리케이션 종료 시 호출)"""
+    global _rag_engine
+    with _rag_engine_lock:
+        if _rag_engine is not None:
+            _rag_engine.close()
+            _rag_engine = None
+
+
+def reload_rag_engine(discard_log: bool = False) -> RAGSearchEngine:
+    """공유 RAG 엔진의 인덱스를 디스크에서 다시 로드
+    
+    인덱스 파일을 외부에서 교체했으면 discard_log=True로 기존 변경 로그를 버린다.
+    """
+    engine = get_rag_engine()
+    engine.reload(discard_log=discard_log)
+    return engine
 
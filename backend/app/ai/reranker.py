@@ -0,0 +1,212 @@
+"""
+크로스 인코더 재순위화
+"""
+import asyncio
+import inspect
+import math
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Callable, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from app.core.config import settings
+from app.ai.embedding_cache import QueryEmbeddingCache, make_cache_key
+
+if TYPE_CHECKING:
+    from app.ai.rag_engine import SearchResult
+
+
+# (쿼리, 본문) 쌍 목록 -> 관련성 점수(logit) 목록
+PairScorer = Callable[[List[Tuple[str, str]]], Sequence[float]]
+
+
+class CrossEncoderReranker:
+    """검색 후보를 로컬 크로스 인코더로 다시 정렬
+    
+    후보는 작은 배치로 나누어 점수를 매긴다. 배치마다 측정한 쌍당 계산 시간으로
+    남은 후보를 예산 안에 끝낼 수 있는지 미리 확인하고, 넘길 것으로 보이면 원래
+    (ANN/RRF) 순서로 돌아간다. 쌍당 시간을 아직 모르면 작은 배치로 먼저 측정한다.
+    그때까지 계산한 점수는 캐시에 남아 같은 쿼리가 다시 오면 재사용된다. 점수 계산은
+    단일 작업 스레드에서 수행해 동시 요청이 CPU 코어를 모두 점유하지 않게 한다.
+    """
+    
+    PROBE_PAIRS = 2  # 쌍당 계산 시간을 모를 때 먼저 계산할 쌍 수
+    COST_SMOOTHING = 0.3  # 쌍당 계산 시간 이동 평균에서 새 측정값의 비중
+    
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        scorer: Optional[PairScorer] = None,
+        batch_size: Optional[int] = None,
+        budget_ms: Optional[float] = None,
+        cache_size: Optional[int] = None
+    ):
+        """재순위화기 초기화 (scorer를 주면 모델을 로드하지 않음)"""
+        self.model_name = model_name or settings.RERANK_MODEL
+        self.batch_size = batch_size or settings.RERANK_BATCH_SIZE
+        self.budget_ms = settings.RERANK_BUDGET_MS if budget_ms is None else budget_ms
+        self.cache_size = settings.RERANK_CACHE_SIZE if cache_size is None else cache_size
+        self._scorer = scorer
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._cache: "OrderedDict[str, float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+        self._pair_seconds: Optional[float] = None  # 측정한 쌍당 계산 시간 (이동 평균)
+        self.reranked = 0
+        self.fallbacks = 0
+        self.cache_hits = 0
+    
+    def _score_pairs(self, pairs: List[Tuple[str, str]]) -> Sequence[float]:
+        """(쿼리, 본문) 쌍 점수 계산"""
+        if self._scorer is not None:
+            return self._scorer(pairs)
+        self._ensure_model()
+        return self._model.predict(
+            pairs, batch_size=self.batch_size, show_progress_bar=False, **self._predict_kwargs
+        )
+    
+    def _ensure_model(self):
+        """모델을 처음 사용할 때 로드 (로딩 시간이 쌍당 계산 시간 측정에 섞이지 않도록 분리)"""
+        if self._scorer is not None:
+            return
+        with self._model_lock:
+            if self._model is None:
+                import torch
+                from sentence_transformers import CrossEncoder
+                
+                print(f"재순위화 모델 로딩: {self.model_name}")
+                self._model = CrossEncoder(self.model_name, max_length=settings.RERANK_MAX_LENGTH)
+                print("재순위화 모델 로딩 완료")
+                # sigmoid를 적용하지 않은 logit을 받아 캐시/정렬에 사용
+                # (sentence-transformers 버전에 따라 인자명이 activation_fct/activation_fn)
+                parameters = inspect.signature(self._model.predict).parameters
+                name = "activation_fn" if "activation_fn" in parameters else "activation_fct"
+                self._predict_kwargs = {name: torch.nn.Identity()}
+    
+    def _key(self, query: str, content: str) -> str:
+        return make_cache_key(
+            self.model_name, f"{QueryEmbeddingCache.normalize_query(query)}\x00{content}"
+        )
+    
+    def _cache_get(self, key: str) -> Optional[float]:
+        with self._cache_lock:
+            score = self._cache.get(key)
+            if score is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+            return score
+    
+    def _cache_put(self, key: str, score: float):
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = score
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def rerank(
+        self,
+        query: str,
+        results: List["SearchResult"],
+        top_k: int,
+        started_at: Optional[float] = None
+    ) -> List["SearchResult"]:
+        """후보를 크로스 인코더 점수순으로 정렬해 top_k개 반환 (started_at: 예산 시작 시각)
+        
+        시간 예산 안에 모든 후보의 점수를 구하지 못할 것으로 보이면(쌍당 계산 시간 기준)
+        원래 순서의 top_k개를 반환한다.
+        재순위화된 결과의 score는 관련성 확률(sigmoid)이고 원래 점수는
+        metadata["retrieval_score"]에 남긴다.
+        """
+        if len(results) <= 1:
+            return results[:top_k]
+        started_at = time.monotonic() if started_at is None else started_at
+        deadline = started_at + self.budget_ms / 1000.0 if self.budget_ms else None
+        
+        keys = [self._key(query, result.content) for result in results]
+        scores = [self._cache_get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            self._ensure_model()
+        while missing:
+            batch_size = self.batch_size
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if self._pair_seconds is None:
+                    batch_size = min(batch_size, self.PROBE_PAIRS)
+                    over_budget = remaining <= 0
+                else:
+                    over_budget = len(missing) * self._pair_seconds > remaining
+                if over_budget:
+                    self.fallbacks += 1
+                    print(f"재순위화 시간 예산 초과 예상 ({self.budget_ms}ms): 검색 순서 사용")
+                    return results[:top_k]
+            
+            batch, missing = missing[:batch_size], missing[batch_size:]
+            batch_started = time.monotonic()
+            batch_scores = self._score_pairs([(query, results[i].content) for i in batch])
+            self._record_cost((time.monotonic() - batch_started) / len(batch))
+            for i, score in zip(batch, batch_scores):
+                scores[i] = float(score)
+                self._cache_put(keys[i], scores[i])
+        
+        self.reranked += 1
+        order = sorted(range(len(results)), key=lambda i: scores[i], reverse=True)[:top_k]
+        return [
+            replace(
+                results[i],
+                score=_sigmoid(scores[i]),
+                metadata={**results[i].metadata, "retrieval_score": results[i].score}
+            )
+            for i in order
+        ]
+    
+    def _record_cost(self, pair_seconds: float):
+        """쌍당 계산 시간 이동 평균 갱신"""
+        if self._pair_seconds is None:
+            self._pair_seconds = pair_seconds
+        else:
+            self._pair_seconds += self.COST_SMOOTHING * (pair_seconds - self._pair_seconds)
+    
+    async def rerank_async(
+        self,
+        query: str,
+        results: List["SearchResult"],
+        top_k: int
+    ) -> List["SearchResult"]:
+        """작업 스레드에서 재순위화 (이벤트 루프를 막지 않음, 대기 시간도 예산에 포함)"""
+        if len(results) <= 1:
+            return results[:top_k]
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.rerank, query, results, top_k, time.monotonic()
+        )
+    
+    def get_stats(self) -> dict:
+        """재순위화 통계"""
+        with self._cache_lock:
+            cache_entries = len(self._cache)
+        return {
+            "model": self.model_name,
+            "reranked": self.reranked,
+            "fallbacks": self.fallbacks,
+            "pair_ms": round(self._pair_seconds * 1000, 3) if self._pair_seconds is not None else None,
+            "cache_hits": self.cache_hits,
+            "cache_entries": cache_entries
+        }
+    
+    def close(self):
+        """작업 스레드 종료"""
+        self._executor.shutdown(wait=False)
+
+
+def _sigmoid(logit: float) -> float:
+    """크로스 인코더 logit을 0~1 점수로 변환"""
+    if logit >= 0:
+        return 1.0 / (1.0 + math.exp(-logit))
+    exp = math.exp(logit)
+    return exp / (1.0 + exp)
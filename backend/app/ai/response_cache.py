@@ -0,0 +1,242 @@
+"""
+LLM 응답 캐시
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Sequence, Set
+
+import numpy as np
+
+from app.core.config import settings
+from app.ai.embedding_cache import QueryEmbeddingCache
+
+
+def provider_identity(provider: Any) -> str:
+    """캐시 키에 쓰는 프로바이더 식별자 (종류, 모델, 접속 주소)"""
+    return "|".join([
+        type(provider).__name__,
+        str(getattr(provider, "model", "")),
+        str(getattr(provider, "base_url", ""))
+    ])
+
+
+def fingerprint(*parts: str) -> str:
+    """텍스트 조각들의 SHA-256"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+@dataclass
+class _Entry:
+    """캐시 항목"""
+    response: str
+    scope: str
+    document_ids: Set[str]
+    expires_at: float
+    query_embedding: Optional[np.ndarray] = None
+
+
+class LLMResponseCache:
+    """LLM 응답 캐시
+    
+    키는 프로바이더/모델, 프롬프트 템플릿, 컨텍스트로 쓴 청크(ID와 본문 해시)와
+    정규화된 질문으로 만든다. 본문 해시가 키에 들어가므로 재인덱싱으로 내용이 바뀐
+    청크는 다른 워커에서도 자연히 캐시를 빗나가고, 이 프로세스에서는 문서 ID로
+    관련 항목을 바로 지운다. 의미 일치 모드를 켜면 같은 컨텍스트(scope)에 대해
+    쿼리 임베딩의 코사인 유사도가 임계값 이상인 이전 질문의 응답도 재사용한다.
+    """
+    
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        semantic: Optional[bool] = None,
+        similarity_threshold: Optional[float] = None
+    ):
+        """응답 캐시 초기화 (ttl_seconds=0이면 만료 없음)"""
+        self.max_size = settings.LLM_CACHE_SIZE if max_size is None else max_size
+        self.ttl_seconds = settings.LLM_CACHE_TTL if ttl_seconds is None else ttl_seconds
+        self.semantic = settings.LLM_CACHE_SEMANTIC if semantic is None else semantic
+        self.similarity_threshold = (
+            settings.LLM_CACHE_SIMILARITY if similarity_threshold is None else similarity_threshold
+        )
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._scopes: Dict[str, Set[str]] = {}  # 컨텍스트 -> 키 (의미 일치 후보)
+        self._documents: Dict[str, Set[str]] = {}  # 문서 ID -> 키 (무효화용)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidated = 0
+    
+    @staticmethod
+    def make_scope(
+        provider: Any,
+        template: str,
+        chunk_keys: Sequence[str],
+        contents: Sequence[str] = ()
+    ) -> str:
+        """질문을 제외한 캐시 범위 (프로바이더, 템플릿, 청크 ID/본문)"""
+        return fingerprint(provider_identity(provider), template, *chunk_keys, fingerprint(*contents))
+    
+    @staticmethod
+    def make_key(scope: str, query: str) -> str:
+        """범위와 정규화된 질문으로 만든 캐시 키"""
+        return fingerprint(scope, QueryEmbeddingCache.normalize_query(query))
+    
+    def get(
+        self,
+        scope: str,
+        query: str,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> Optional[str]:
+        """캐시된 응답 조회 (의미 일치 모드에서는 query_embedding으로 유사 질문 검색)"""
+        key = self.make_key(scope, query)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live_entry(key, now)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.response
+            
+            if self.semantic and query_embedding is not None:
+                match = self._semantic_match(scope, query_embedding, now)
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    self.semantic_hits += 1
+                    return self._entries[match].response
+            
+            self.misses += 1
+            return None
+    
+    def _live_entry(self, key: str, now: float) -> Optional[_Entry]:
+        """만료되지 않은 항목 (만료되었으면 제거, 잠금을 잡은 상태에서 호출)"""
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at and entry.expires_at <= now:
+            self._remove(key)
+            return None
+        return entry
+    
+    def _semantic_match(self, scope: str, query_embedding: np.ndarray, now: float) -> Optional[str]:
+        """같은 범위에서 가장 유사한 이전 질문의 키 (잠금을 잡은 상태에서 호출)"""
+        query = _unit(query_embedding)
+        best_key, best_score = None, self.similarity_threshold
+        for key in list(self._scopes.get(scope, ())):
+            entry = self._live_entry(key, now)
+            if entry is None or entry.query_embedding is None:
+                continue
+            score = float(np.dot(entry.query_embedding, query))
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+    
+    def put(
+        self,
+        scope: str,
+        query: str,
+        response: str,
+        document_ids: Iterable[str],
+        query_embedding: Optional[np.ndarray] = None
+    ):
+        """응답 저장 (document_ids: 응답의 근거가 된 문서)"""
+        if self.max_size <= 0:
+            return
+        key = self.make_key(scope, query)
+        entry = _Entry(
+            response=response,
+            scope=scope,
+            document_ids={str(document_id) for document_id in document_ids},
+            expires_at=time.monotonic() + self.ttl_seconds if self.ttl_seconds else 0,
+            query_embedding=_unit(query_embedding) if self.semantic and query_embedding is not None else None
+        )
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._scopes.setdefault(scope, set()).add(key)
+            for document_id in entry.document_ids:
+                self._documents.setdefault(document_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+    
+    def _remove(self, key: str):
+        """항목과 보조 색인 제거 (잠금을 잡은 상태에서 호출)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        _discard(self._scopes, entry.scope, key)
+        for document_id in entry.document_ids:
+            _discard(self._documents, document_id, key)
+    
+    def invalidate_documents(self, document_ids: Iterable[str]) -> int:
+        """문서를 근거로 한 응답 제거 (제거된 항목 수 반환)"""
+        removed = 0
+        with self._lock:
+            for document_id in document_ids:
+                for key in list(self._documents.get(str(document_id), ())):
+                    self._remove(key)
+                    removed += 1
+            self.invalidated += removed
+        return removed
+    
+    def clear(self):
+        """캐시 비우기"""
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+            self._documents.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "semantic": self.semantic,
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "invalidated": self.invalidated,
+                "hit_rate": round((self.hits + self.semantic_hits) / lookups, 4) if lookups else 0.0
+            }
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    """코사인 유사도 계산용 단위 벡터"""
+    vector = np.asarray(vector, dtype="float32").reshape(-1)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def _discard(index: Dict[str, Set[str]], name: str, key: str):
+    """보조 색인에서 키 제거 (빈 집합은 삭제)"""
+    keys = index.get(name)
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del index[name]
+
+
+# 프로세스 공유 응답 캐시 (RAG 답변과 문서 요약이 함께 사용)
+_response_cache: Optional[LLMResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """공유 응답 캐시 (LLM_CACHE_ENABLED가 꺼져 있으면 None)"""
+    global _response_cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = LLMResponseCache()
+    return _response_cache
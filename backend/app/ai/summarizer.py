@@ -1,12 +1,64 @@
 """
 문서 요약 엔진
 """
+import asyncio
+import weakref
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 
 from app.core.config import settings
 from app.parsers.base import ParsedDocument
-from app.ai.llm_providers import LLMProvider
+from app.ai.llm_providers import LLMProvider, OllamaProvider
+from app.ai.provider_registry import get_provider_registry
+from app.ai.response_cache import LLMResponseCache, get_response_cache, provider_identity
+
+
+# 요약 생성 실패 시 반환하는 안내 문구
+SUMMARY_ERROR_MESSAGE = "요약 생성 중 오류가 발생했습니다."
+
+# 요약 타입별 프롬프트 ({text}: 문서 내용, 긴 문서는 부분 요약 목록)
+SUMMARY_PROMPTS = {
+    "core": """다음 문서의 핵심 내용을 간결하게 요약해주세요. (200자 이내)
+
+문서 내용:
+{text}
+
+핵심 요약:""",
+
+    "detailed": """다음 문서를 상세하게 요약해주세요. 주요 섹션과 내용을 포함해주세요.
+
+문서 내용:
+{text}
+
+상세 요약:""",
+
+    "keywords": """다음 문서에서 핵심 키워드 5-10개를 추출해주세요. 키워드는 쉼표로 구분해주세요.
+
+문서 내용:
+{text}
+
+핵심 키워드:"""
+}
+
+# 긴 문서의 부분 요약 프롬프트 (요약 타입과 무관하므로 타입 간에 결과를 재사용)
+SECTION_PROMPT = """다음은 긴 문서의 일부입니다. 이 부분의 주요 내용과 수치, 절차를 빠뜨리지 말고 간결하게 요약해주세요.
+
+문서 일부:
+{text}
+
+부분 요약:"""
+
+# 부분 요약이 한 프롬프트에 들어가지 않을 때 연속된 요약을 묶어 합치는 프롬프트
+MERGE_PROMPT = """다음은 한 문서의 연속된 부분 요약입니다. 중복을 없애고 하나의 요약으로 합쳐주세요.
+
+부분 요약:
+{text}
+
+통합 요약:"""
+
+# 응답 캐시 키에 들어가는 중간 요약 템플릿 이름 (프롬프트를 바꾸면 버전 변경)
+SECTION_TEMPLATE = "summary:section:v1"
+MERGE_TEMPLATE = "summary:merge:v1"
 
 
 @dataclass
@@ -20,65 +72,111 @@ class Summary:
     summary_length: int
 
 
+def split_sections(text: str, max_chars: int) -> List[str]:
+    """문단 경계에서 max_chars 이하의 부분으로 나누기 (긴 문단은 글자 수로 자름)"""
+    sections: List[str] = []
+    current: List[str] = []
+    length = 0
+    for paragraph in text.split("\n\n"):
+        if not paragraph.strip():
+            continue
+        pieces = [paragraph[i:i + max_chars] for i in range(0, len(paragraph), max_chars)]
+        for piece in pieces:
+            if current and length + len(piece) + 2 > max_chars:
+                sections.append("\n\n".join(current))
+                current, length = [], 0
+            current.append(piece)
+            length += len(piece) + 2
+    if current:
+        sections.append("\n\n".join(current))
+    return sections
+
+
+def _group_partials(partials: List[str], max_chars: int) -> List[List[str]]:
+    """연속된 부분 요약을 max_chars 이하의 묶음으로 나누기"""
+    groups: List[List[str]] = []
+    length = 0
+    for partial in partials:
+        if groups and length + len(partial) + 2 <= max_chars:
+            groups[-1].append(partial)
+            length += len(partial) + 2
+        else:
+            groups.append([partial])
+            length = len(partial)
+    return groups
+
+
+# 이벤트 루프별, 프로바이더별 동시 부분 요약 수 제한
+_map_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _provider_semaphore(provider: LLMProvider) -> asyncio.Semaphore:
+    """프로바이더의 부분 요약 동시 실행 제한 (여러 요청이 공유)"""
+    semaphores = _map_semaphores.setdefault(asyncio.get_running_loop(), {})
+    key = provider_identity(provider)
+    if key not in semaphores:
+        limit = (
+            settings.SUMMARY_MAP_CONCURRENCY_LOCAL
+            if isinstance(provider, OllamaProvider) else settings.SUMMARY_MAP_CONCURRENCY
+        )
+        semaphores[key] = asyncio.Semaphore(max(1, limit))
+    return semaphores[key]
+
+
 class DocumentSummarizer:
-    """문서 요약 엔진"""
+    """문서 요약 엔진
+    
+    SUMMARY_SINGLE_PASS_CHARS보다 긴 문서는 한 프롬프트에 넣지 않고 부분으로 나누어
+    프로바이더별 동시 실행 수 안에서 병렬로 요약(map)한 뒤, 부분 요약을 합쳐 요청한
+    타입의 요약을 만든다(reduce). 부분 요약이 한 프롬프트에 들어가지 않으면 연속된
+    요약을 묶어 합치는 단계를 반복한다. 부분 요약은 응답 캐시에 남아 다른 요약 타입을
+    만들 때도 재사용된다.
+    """
     
-    def __init__(self, llm_provider: Optional[LLMProvider] = None):
-        """요약 엔진 초기화"""
+    def __init__(
+        self,
+        llm_provider: Optional[LLMProvider] = None,
+        response_cache: Optional[LLMResponseCache] = None
+    ):
+        """요약 엔진 초기화 (response_cache 미지정 시 공유 응답 캐시 사용)"""
         self.llm_provider = llm_provider
-        self.ollama_url = settings.OLLAMA_BASE_URL
-        self.ollama_model = settings.OLLAMA_MODEL
+        self.response_cache = response_cache if response_cache is not None else get_response_cache()
     
     async def summarize_document(
         self,
         document: ParsedDocument,
         summary_type: str = "core",
-        llm_provider: Optional[LLMProvider] = None
+        llm_provider: Optional[LLMProvider] = None,
+        document_id: Optional[str] = None
     ) -> Summary:
-        """문서 요약 생성"""
+        """문서 요약 생성 (document_id를 주면 재인덱싱/삭제 시 캐시된 요약도 무효화)"""
         text = document.full_text
         
-        # 요약 타입별 프롬프트
-        prompts = {
-            "core": f"""다음 문서의 핵심 내용을 간결하게 요약해주세요. (200자 이내)
-
-문서 내용:
-{text}
-
-핵심 요약:""",
-            
-            "detailed": f"""다음 문서를 상세하게 요약해주세요. 주요 섹션과 내용을 포함해주세요.
-
-문서 내용:
-{text}
-
-상세 요약:""",
-            
-            "keywords": f"""다음 문서에서 핵심 키워드 5-10개를 추출해주세요. 키워드는 쉼표로 구분해주세요.
-
-문서 내용:
-{text}
-
-핵심 키워드:"""
-        }
-        
-        prompt = prompts.get(summary_type, prompts["core"])
-        
         # LLM 프로바이더를 통한 요약 생성
         provider = llm_provider or self.llm_provider
         if not provider:
-            # 기본 Ollama 사용
-            from app.ai.llm_providers import OllamaProvider
-            provider = OllamaProvider(
-                base_url=self.ollama_url,
-                model=self.ollama_model
+            # 기본 Ollama 사용 (공유 커넥션 풀을 쓰는 레지스트리 인스턴스)
+            provider = get_provider_registry().default_provider()
+        
+        # 같은 문서 내용/요약 타입/모델의 요약은 캐시에서 반환
+        scope = None
+        summary_content = None
+        if self.response_cache is not None:
+            scope = LLMResponseCache.make_scope(
+                provider, f"summary:{summary_type}", [document_id or ""], [text]
             )
+            summary_content = self.response_cache.get(scope, "")
         
-        try:
-            summary_content = await provider.generate(prompt)
-        except Exception as e:
-            print(f"요약 생성 오류: {e}")
-            summary_content = "요약 생성 중 오류가 발생했습니다."
+        if summary_content is None:
+            try:
+                summary_content = await self._summarize_text(text, summary_type, provider, document_id)
+                if scope is not None and summary_content:
+                    self.response_cache.put(scope, "", summary_content, [document_id] if document_id else [])
+            except Exception as e:
+                print(f"요약 생성 오류: {e}")
+                summary_content = SUMMARY_ERROR_MESSAGE
         
         # 키워드 추출 (키워드 타입이 아닌 경우)
         keywords = []
@@ -99,6 +197,64 @@ class DocumentSummarizer:
             summary_length=len(summary_content)
         )
     
+    async def _summarize_text(
+        self,
+        text: str,
+        summary_type: str,
+        provider: LLMProvider,
+        document_id: Optional[str] = None
+    ) -> str:
+        """요약 타입 프롬프트로 요약 (긴 문서는 부분 요약 후 합침)"""
+        template = SUMMARY_PROMPTS.get(summary_type, SUMMARY_PROMPTS["core"])
+        if len(text) <= settings.SUMMARY_SINGLE_PASS_CHARS:
+            return await provider.generate(template.format(text=text))
+        
+        # map: 부분별 요약
+        sections = split_sections(text, settings.SUMMARY_SECTION_CHARS)
+        partials = await self._map(
+            SECTION_TEMPLATE, SECTION_PROMPT, sections, provider, document_id
+        )
+        
+        # reduce: 부분 요약이 한 프롬프트에 들어갈 때까지 연속된 요약을 묶어 합침
+        max_chars = settings.SUMMARY_REDUCE_MAX_CHARS
+        while len(partials) > 1 and sum(len(p) + 2 for p in partials) > max_chars:
+            groups = _group_partials(partials, max_chars)
+            if len(groups) == len(partials):
+                break  # 부분 요약 하나가 이미 한도를 넘으면 더 줄일 수 없음
+            partials = await self._map(
+                MERGE_TEMPLATE, MERGE_PROMPT,
+                ["\n\n".join(group) for group in groups], provider, document_id
+            )
+        
+        combined = "\n\n".join(f"[부분 {i + 1}]\n{partial}" for i, partial in enumerate(partials))
+        return await provider.generate(template.format(text=combined))
+    
+    async def _map(
+        self,
+        template_name: str,
+        prompt: str,
+        texts: List[str],
+        provider: LLMProvider,
+        document_id: Optional[str] = None
+    ) -> List[str]:
+        """여러 부분을 프로바이더별 동시 실행 제한 안에서 병렬로 요약 (캐시된 부분은 재사용)"""
+        semaphore = _provider_semaphore(provider)
+        
+        async def summarize(text: str) -> str:
+            scope = None
+            if self.response_cache is not None:
+                scope = LLMResponseCache.make_scope(provider, template_name, [], [text])
+                cached = self.response_cache.get(scope, "")
+                if cached is not None:
+                    return cached
+            async with semaphore:
+                result = await provider.generate(prompt.format(text=text))
+            if scope is not None and result:
+                self.response_cache.put(scope, "", result, [document_id] if document_id else [])
+            return result
+        
+        return list(await asyncio.gather(*(summarize(text) for text in texts)))
+    
     async def _extract_keywords(self, text: str) -> List[str]:
         """키워드 추출"""
         # 간단한 키워드 추출 (실제로는 더 정교한 방법 사용 가능)
@@ -0,0 +1,395 @@
+"""
+벡터 ID -> 청크 메타데이터 저장소
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+# FAISS ID는 부호 있는 int64이고 -1은 빈 결과이므로 양수 63비트만 사용
+_ID_MASK = (1 << 63) - 1
+
+# 열로 저장하는 메타데이터 키 (값 사전의 int32 코드, 나머지 키는 행별 JSON)
+COLUMN_KEYS = ("document_id", "chunk_index", "file_type", "page_number", "section_title")
+
+# 열 파일 구성: 매직 + 헤더 길이 + JSON 헤더, 이후 64바이트 정렬된 배열 구역
+# (ID, 코드, JSON 오프셋, JSON 바이트)
+_MAGIC = b"VMETA001"
+_PREFIX = struct.Struct("<8sQ")
+_ALIGN = 64
+
+
+def vector_id_for(key: str) -> int:
+    """청크 UUID 등 고유 키에서 결정적인 int64 벡터 ID 생성
+    
+    같은 청크는 재인덱싱, 재구성, 동기화 가져오기 이후에도 같은 ID를 갖는다.
+    """
+    digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") & _ID_MASK
+
+
+def new_vector_ids(count: int) -> np.ndarray:
+    """키가 없는 벡터용 임의 ID"""
+    return np.array(
+        [uuid.uuid4().int & _ID_MASK for _ in range(count)],
+        dtype="int64"
+    )
+
+
+def _align(offset: int) -> int:
+    """다음 정렬 경계"""
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _is_column_value(value: Any) -> bool:
+    """값 사전에 넣을 수 있는 스칼라 값인지 여부"""
+    return isinstance(value, (str, int, float, bool))
+
+
+class ColumnarMetadata:
+    """열 단위 메타데이터 파일의 읽기 전용 메모리 매핑 뷰
+    
+    배열은 파일을 복사하지 않고 페이지 캐시를 직접 가리키므로 같은 파일을 여는
+    여러 워커가 메모리를 공유하고, 여는 시간은 파일 크기와 무관하다.
+    """
+    
+    def __init__(self, path: str):
+        """파일 매핑"""
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_length = _PREFIX.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"메타데이터 파일 형식이 올바르지 않습니다: {path}")
+        header = json.loads(bytes(self._mmap[_PREFIX.size:_PREFIX.size + header_length]))
+        
+        self.keys: Tuple[str, ...] = tuple(header["keys"])
+        self.values: Dict[str, List[Any]] = header["values"]
+        count = header["count"]
+        
+        offset = _align(_PREFIX.size + header_length)
+        self.ids, offset = self._view(offset, "int64", (count,))
+        self.codes, offset = self._view(offset, "int32", (count, len(self.keys)))
+        self.extra_offsets, offset = self._view(offset, "int64", (count + 1,))
+        self._extra_start = offset
+    
+    def _view(self, offset: int, dtype: str, shape: Tuple[int, ...]) -> Tuple[np.ndarray, int]:
+        """파일 구역을 가리키는 배열과 다음 구역 오프셋"""
+        count = int(np.prod(shape))
+        if count == 0:
+            return np.empty(shape, dtype=dtype), offset
+        array = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset).reshape(shape)
+        return array, _align(offset + array.nbytes)
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    @property
+    def nbytes(self) -> int:
+        """매핑된 파일 크기"""
+        return len(self._mmap)
+    
+    def extra_bytes(self, row: int) -> bytes:
+        """행의 열 외 메타데이터 (JSON 바이트)"""
+        start = self._extra_start + int(self.extra_offsets[row])
+        end = self._extra_start + int(self.extra_offsets[row + 1])
+        return self._mmap[start:end]
+    
+    def record(self, row: int) -> Dict[str, Any]:
+        """행의 메타데이터 딕셔너리"""
+        extra = self.extra_bytes(row)
+        metadata = json.loads(extra) if extra else {}
+        for key, code in zip(self.keys, self.codes[row].tolist()):
+            if code >= 0:
+                metadata[key] = self.values[key][code]
+        return metadata
+    
+    @staticmethod
+    def write(
+        path: str,
+        ids: np.ndarray,
+        codes: np.ndarray,
+        values: Dict[str, List[Any]],
+        extras: List[bytes]
+    ):
+        """열 파일 쓰기 (ids 순서로 정렬된 입력)"""
+        offsets = np.zeros(len(ids) + 1, dtype="int64")
+        if extras:
+            np.cumsum([len(extra) for extra in extras], out=offsets[1:])
+        header = json.dumps({
+            "count": len(ids),
+            "keys": list(COLUMN_KEYS),
+            "values": values
+        }, ensure_ascii=False).encode("utf-8")
+        
+        with open(path, "wb") as f:
+            f.write(_PREFIX.pack(_MAGIC, len(header)))
+            f.write(header)
+            for chunk in (
+                np.ascontiguousarray(ids, dtype="int64").tobytes(),
+                np.ascontiguousarray(codes, dtype="int32").tobytes(),
+                offsets.tobytes()
+            ):
+                f.write(b"\0" * (_align(f.tell()) - f.tell()))
+                f.write(chunk)
+            f.write(b"\0" * (_align(f.tell()) - f.tell()))
+            f.write(b"".join(extras))
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class VectorMetadataStore:
+    """int64 벡터 ID로 청크 메타데이터를 찾는 저장소
+    
+    마지막 체크포인트의 열 파일(메모리 매핑, 읽기 전용)과 그 이후 변경분을 담는
+    메모리 영역으로 구성된다. 두 영역 모두 정렬된 ID 배열에서 np.searchsorted로
+    조회하므로 문자열 키 딕셔너리보다 메모리가 적고 여러 ID를 한 번에 찾을 수 있다.
+    """
+    
+    def __init__(self, base: Optional[ColumnarMetadata] = None):
+        """저장소 초기화 (base: 체크포인트 열 파일)"""
+        self._base = base
+        # 삭제/교체된 기본 행 표시 (처음 삭제할 때만 배열 생성)
+        self._base_alive: Optional[np.ndarray] = None
+        self._base_count = len(base) if base is not None else 0
+        # 체크포인트 이후 추가/교체된 메타데이터
+        self._ids = np.empty(0, dtype="int64")   # 정렬된 벡터 ID
+        self._rows = np.empty(0, dtype="int64")  # ID별 _records 위치
+        self._records: List[Optional[Dict[str, Any]]] = []
+    
+    @classmethod
+    def load(cls, path: str) -> "VectorMetadataStore":
+        """열 파일을 매핑하여 열기"""
+        return cls(ColumnarMetadata(path))
+    
+    def __len__(self) -> int:
+        return self._base_count + len(self._ids)
+    
+    def __contains__(self, vector_id: int) -> bool:
+        return bool(self.contains([vector_id])[0])
+    
+    @property
+    def mapped_bytes(self) -> int:
+        """매핑된 체크포인트 파일 크기"""
+        return self._base.nbytes if self._base is not None else 0
+    
+    def contains(self, ids: Iterable[int]) -> np.ndarray:
+        """ID별 존재 여부 (bool 배열)"""
+        ids = np.asarray(list(ids), dtype="int64")
+        return (self._find(ids) >= 0) | (self._find_base(ids) >= 0)
+    
+    def ids(self) -> np.ndarray:
+        """저장된 모든 벡터 ID (정렬됨)"""
+        if self._base is None:
+            return self._ids.copy()
+        ids = np.concatenate([self._base.ids[self._alive_base_rows()], self._ids])
+        ids.sort()
+        return ids
+    
+    def _alive_base_rows(self) -> np.ndarray:
+        """유효한 기본 행 번호"""
+        if self._base_alive is None:
+            return np.arange(len(self._base), dtype="int64")
+        return np.flatnonzero(self._base_alive)
+    
+    def _find(self, ids: np.ndarray) -> np.ndarray:
+        """ID별 _ids 내 위치 (없으면 -1)"""
+        return _search(self._ids, ids)
+    
+    def _find_base(self, ids: np.ndarray) -> np.ndarray:
+        """ID별 유효한 기본 행 번호 (없으면 -1)"""
+        if self._base is None:
+            return np.full(len(ids), -1, dtype="int64")
+        rows = _search(self._base.ids, ids)
+        if self._base_alive is not None:
+            rows = np.where((rows >= 0) & self._base_alive[np.maximum(rows, 0)], rows, -1)
+        return rows
+    
+    def _kill_base_rows(self, rows: np.ndarray):
+        """기본 행을 삭제된 것으로 표시"""
+        if len(rows) == 0:
+            return
+        if self._base_alive is None:
+            self._base_alive = np.ones(len(self._base), dtype=bool)
+        self._base_alive[rows] = False
+        self._base_count -= len(rows)
+    
+    def add(self, ids: Iterable[int], metadatas: Iterable[Dict[str, Any]]):
+        """메타데이터 추가 (이미 있는 ID는 먼저 remove 해야 함)"""
+        ids = np.asarray(list(ids), dtype="int64")
+        metadatas = list(metadatas)
+        if len(ids) == 0:
+            return
+        if len(np.unique(ids)) != len(ids) or self.contains(ids).any():
+            raise ValueError("이미 존재하는 벡터 ID입니다.")
+        
+        rows = np.arange(len(self._records), len(self._records) + len(ids), dtype="int64")
+        self._records.extend(metadatas)
+        
+        order = np.argsort(ids, kind="stable")
+        positions = np.searchsorted(self._ids, ids[order])
+        self._ids = np.insert(self._ids, positions, ids[order])
+        self._rows = np.insert(self._rows, positions, rows[order])
+    
+    def get(self, vector_id: int) -> Optional[Dict[str, Any]]:
+        """단일 ID의 메타데이터"""
+        return self.get_many([vector_id])[0]
+    
+    def get_many(self, ids: Iterable[int]) -> List[Optional[Dict[str, Any]]]:
+        """여러 ID의 메타데이터 (없는 ID는 None)"""
+        ids = np.asarray(list(ids), dtype="int64")
+        positions = self._find(ids).tolist()
+        base_rows = self._find_base(ids).tolist()
+        results = []
+        for pos, row in zip(positions, base_rows):
+            if pos >= 0:
+                results.append(self._records[self._rows[pos]])
+            elif row >= 0:
+                results.append(self._base.record(row))
+            else:
+                results.append(None)
+        return results
+    
+    def update(self, vector_id: int, metadata: Dict[str, Any]):
+        """기존 ID의 메타데이터 교체"""
+        ids = np.array([vector_id], dtype="int64")
+        pos = self._find(ids)[0]
+        if pos >= 0:
+            self._records[self._rows[pos]] = metadata
+            return
+        row = self._find_base(ids)[0]
+        if row < 0:
+            raise KeyError(vector_id)
+        self._kill_base_rows(np.array([row]))
+        self.add(ids, [metadata])
+    
+    def remove(self, ids: Iterable[int]) -> List[Tuple[int, Dict[str, Any]]]:
+        """메타데이터 삭제 후 삭제된 (ID, 메타데이터) 목록 반환"""
+        ids = np.asarray(list(ids), dtype="int64")
+        removed = []
+        
+        base_rows = self._find_base(ids)
+        base_rows = np.unique(base_rows[base_rows >= 0])
+        for row in base_rows.tolist():
+            removed.append((int(self._base.ids[row]), self._base.record(row)))
+        self._kill_base_rows(base_rows)
+        
+        positions = self._find(ids)
+        positions = np.unique(positions[positions >= 0])
+        if len(positions) == 0:
+            return removed
+        for pos in positions:
+            row = self._rows[pos]
+            removed.append((int(self._ids[pos]), self._records[row]))
+            self._records[row] = None
+        self._ids = np.delete(self._ids, positions)
+        self._rows = np.delete(self._rows, positions)
+        
+        # 빈 행이 절반을 넘으면 레코드 목록 정리
+        if len(self._records) > 2 * len(self._ids):
+            self.compact()
+        return removed
+    
+    def items(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """(ID, 메타데이터) 순회 (ID 순)"""
+        ids = self.ids()
+        return zip(ids.tolist(), self.get_many(ids))
+    
+    def base_columns(self) -> Iterator[Tuple[str, np.ndarray, np.ndarray, List[Any]]]:
+        """체크포인트 열별 (키, 유효 ID, 값 코드, 값 사전) - 역색인 일괄 구성용"""
+        if self._base is None:
+            return
+        rows = self._alive_base_rows()
+        ids = self._base.ids[rows]
+        for column, key in enumerate(self._base.keys):
+            yield key, ids, self._base.codes[rows, column], self._base.values[key]
+    
+    def base_extra_items(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """체크포인트에서 열 외 메타데이터가 있는 행의 (ID, 열 외 메타데이터)"""
+        if self._base is None:
+            return
+        rows = self._alive_base_rows()
+        lengths = np.diff(self._base.extra_offsets)[rows]
+        for row in rows[lengths > 0].tolist():
+            yield int(self._base.ids[row]), json.loads(self._base.extra_bytes(row))
+    
+    def overlay_items(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """체크포인트 이후 추가/교체된 (ID, 메타데이터)"""
+        for vector_id, row in zip(self._ids.tolist(), self._rows.tolist()):
+            yield vector_id, self._records[row]
+    
+    def compact(self):
+        """삭제된 행을 제거하여 레코드 목록을 ID 순서로 재배치"""
+        self._records = [self._records[row] for row in self._rows.tolist()]
+        self._rows = np.arange(len(self._ids), dtype="int64")
+    
+    def clear(self):
+        """저장소 비우기"""
+        self.__init__()
+    
+    def save(self, path: str):
+        """열 파일로 저장 (기본 행의 코드와 JSON은 디코딩 없이 재사용)"""
+        values = {
+            key: list(self._base.values.get(key, [])) if self._base is not None else []
+            for key in COLUMN_KEYS
+        }
+        codes_of = {key: {value: code for code, value in enumerate(vals)} for key, vals in values.items()}
+        
+        id_parts, code_parts, extras = [], [], []
+        if self._base is not None:
+            if self._base.keys != COLUMN_KEYS:
+                raise ValueError("열 구성이 다른 메타데이터 파일입니다.")
+            rows = self._alive_base_rows()
+            id_parts.append(self._base.ids[rows])
+            code_parts.append(self._base.codes[rows])
+            extras.extend(self._base.extra_bytes(row) for row in rows.tolist())
+        
+        overlay_codes = np.full((len(self._ids), len(COLUMN_KEYS)), -1, dtype="int32")
+        for i, (_, metadata) in enumerate(self.overlay_items()):
+            extra = {}
+            for key, value in metadata.items():
+                if key not in codes_of or not _is_column_value(value):
+                    extra[key] = value
+                    continue
+                code = codes_of[key].get(value)
+                if code is None:
+                    code = codes_of[key][value] = len(values[key])
+                    values[key].append(value)
+                overlay_codes[i, COLUMN_KEYS.index(key)] = code
+            extras.append(json.dumps(extra, ensure_ascii=False, default=str).encode("utf-8") if extra else b"")
+        id_parts.append(self._ids)
+        code_parts.append(overlay_codes)
+        
+        ids = np.concatenate(id_parts)
+        order = np.argsort(ids, kind="stable")
+        ColumnarMetadata.write(
+            path,
+            ids[order],
+            np.concatenate(code_parts)[order],
+            values,
+            [extras[i] for i in order.tolist()]
+        )
+    
+    @classmethod
+    def from_state(cls, state: Any) -> "VectorMetadataStore":
+        """이전 버전 pickle 상태로 복원 ({문자열 ID: 메타데이터} 또는 ID/레코드 목록)"""
+        store = cls()
+        if isinstance(state, dict) and "ids" in state and "records" in state:
+            store.add(state["ids"], state["records"])
+        elif state:
+            store.add((int(k) for k in state), state.values())
+        return store
+
+
+def _search(sorted_ids: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """정렬된 배열에서 ID 위치 (없으면 -1)"""
+    if len(sorted_ids) == 0:
+        return np.full(len(ids), -1, dtype="int64")
+    pos = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return np.where(sorted_ids[pos] == ids, pos, -1)
@@ -5,138 +5,869 @@ import faiss
 import numpy as np
 import pickle
 import os
-from typing import List, Tuple, Dict, Any
+import threading
+from typing import List, Tuple, Dict, Any, Optional, Iterable, Sequence
 from pathlib import Path
 
 from app.core.config import settings
 from app.ai.embedding import EmbeddingGenerator
+from app.ai.embedding_cache import ChunkEmbeddingCache, EmbeddingDiskStore, model_store_name
+from app.ai import index_factory
+from app.ai.metadata_index import MetadataIndex
+from app.ai.vector_metadata import VectorMetadataStore, new_vector_ids
+from app.ai.vector_wal import VectorWAL
+from app.ai.chunk_text_store import ChunkTextStore
+from app.ai.lexical_index import BM25Index
 
 
 class VectorStore:
     """FAISS 기반 벡터 저장소"""
     
-    def __init__(self, vector_db_path: str = None):
+    def __init__(
+        self,
+        vector_db_path: str = None,
+        embedding_generator: Optional[EmbeddingGenerator] = None,
+        chunk_cache: Optional[ChunkEmbeddingCache] = None
+    ):
         """벡터 저장소 초기화"""
         self.vector_db_path = vector_db_path or settings.VECTOR_DB_PATH
         self.index = None
-        self.metadata_store = {}  # {vector_id: metadata}
-        self.embedding_generator = EmbeddingGenerator()
+        self.metadata_store = VectorMetadataStore()  # 벡터 ID -> 메타데이터
+        self.metadata_index = MetadataIndex()
+        # 본문 BM25 색인 (시작을 늦추지 않도록 백그라운드에서 구성, 구성 중 변경은 모았다가 반영)
+        self.lexical_index = BM25Index()
+        self._lexical_ready = False
+        self._lexical_build: Optional[threading.Thread] = None
+        self._lexical_pending: Optional[List[Tuple[Sequence[int], Optional[List[str]]]]] = None
+        self._lexical_epoch = 0  # reload 시 증가 (이전 데이터로 구성하던 색인은 버림)
+        self.embedding_generator = embedding_generator or EmbeddingGenerator()
         self.dimension = self.embedding_generator.get_embedding_dimension()
-        self._load_or_create_index()
+        self.chunk_cache = chunk_cache or self._create_chunk_cache()
+        # 인덱스/메타데이터 접근 보호 (요청 간 공유되므로 필수)
+        self._lock = threading.RLock()
+        # 인덱스 재구성은 한 번에 하나만 (오래 걸리므로 _lock과 별도)
+        self._rebuild_lock = threading.Lock()
+        self._removed_during_rebuild: Optional[set] = None
+        # 로그 재생 중 삭제 표시된 ID와 겹쳐 재생이 끝난 뒤 추가할 벡터 (ID -> (벡터, 메타데이터))
+        self._replay_deferred: Optional[Dict[int, Tuple[np.ndarray, Dict[str, Any]]]] = None
+        # 인덱스에서 바로 제거할 수 없어(HNSW) 검색에서만 제외하는 벡터 ID
+        self._tombstones = set()
+        self.deletion_stats = {"deleted_vectors": 0, "reclaimed_bytes": 0, "last_compaction": None}
+        # 체크포인트 이후 변경은 로그에만 기록 (변경마다 전체 인덱스를 다시 쓰지 않음)
+        # 로그 잠금을 다른 프로세스가 잡고 있으면 읽기 전용: 검색만 하고 기록 프로세스의 변경은
+        # VECTOR_READER_REFRESH_INTERVAL마다 로그를 이어 읽어 반영
+        self._wal = VectorWAL(
+            os.path.join(self.vector_db_path, "vectors.wal"), fsync=settings.VECTOR_WAL_FSYNC
+        )
+        # 검색 결과에 DB 조회 없이 본문을 채우기 위한 청크 본문 저장소
+        self.text_store = ChunkTextStore(self.vector_db_path, read_only=self.read_only)
+        self._checkpoint_bytes = 0
+        self._loaded_signature = None
+        # 메모리 매핑으로 로드한 인덱스는 읽기 전용이므로 변경 전에 메모리로 복사
+        self._index_mapped = False
+        # 로그 재생 중 재구성이 필요할 수 있으므로 reload와 같이 재구성 잠금을 잡고 로드
+        with self._rebuild_lock:
+            self._load_or_create_index()
+        self._closed = threading.Event()
+        if self.read_only:
+            print(f"다른 프로세스가 벡터 저장소에 기록 중이므로 읽기 전용으로 엽니다: {self.vector_db_path}")
+            if settings.VECTOR_READER_REFRESH_INTERVAL > 0:
+                threading.Thread(
+                    target=self._refresh_loop, name="vector-store-refresh", daemon=True
+                ).start()
+    
+    @property
+    def read_only(self) -> bool:
+        """변경 로그 기록 잠금이 없어 읽기 전용인지 여부"""
+        return not self._wal.writable
+    
+    def _create_chunk_cache(self) -> Optional[ChunkEmbeddingCache]:
+        """설정에 따른 청크 임베딩 캐시 생성"""
+        if not settings.CHUNK_EMBEDDING_CACHE_ENABLED:
+            return None
+        
+        model_name = self.embedding_generator.model_name
+        disk_store = EmbeddingDiskStore(
+            settings.EMBEDDING_CACHE_DIR,
+            model_store_name("chunks", model_name),
+            self.dimension,
+            max_entries=settings.CHUNK_EMBEDDING_CACHE_MAX_ENTRIES
+        )
+        return ChunkEmbeddingCache(model_name, disk_store)
     
     def _load_or_create_index(self):
         """인덱스 로드 또는 생성"""
+        # 읽는 도중 교체되면 다음 refresh에서 다시 로드하도록 읽기 전에 기록
+        self._loaded_signature = self._checkpoint_signature()
         index_path = os.path.join(self.vector_db_path, "faiss.index")
-        metadata_path = os.path.join(self.vector_db_path, "metadata.pkl")
+        metadata_path = os.path.join(self.vector_db_path, "metadata.cols")
+        legacy_metadata_path = os.path.join(self.vector_db_path, "metadata.pkl")
+        if not os.path.exists(metadata_path):
+            metadata_path = legacy_metadata_path
         
         if os.path.exists(index_path) and os.path.exists(metadata_path):
-            # 기존 인덱스 로드
-            self.index = faiss.read_index(index_path)
-            with open(metadata_path, 'rb') as f:
-                self.metadata_store = pickle.load(f)
+            # 기존 인덱스 로드 (메모리 매핑 시 워커들이 같은 페이지 캐시를 공유)
+            index = index_factory.read_index(index_path, mmap=settings.VECTOR_INDEX_MMAP)
+            # 위치 기반 ID를 쓰던 이전 인덱스는 메모리에 ID 인덱스로 변환
+            self.index = index_factory.ensure_ids(index)
+            self._index_mapped = settings.VECTOR_INDEX_MMAP and self.index is index
+            if metadata_path == legacy_metadata_path:
+                with open(metadata_path, 'rb') as f:
+                    self.metadata_store = VectorMetadataStore.from_state(pickle.load(f))
+            else:
+                self.metadata_store = VectorMetadataStore.load(metadata_path)
+            # 거리 척도는 저장된 인덱스를 따름 (설정 변경 시 재인덱싱 필요)
+            self.metric = index_factory.metric_of(self.index)
+            if self.metric != settings.VECTOR_METRIC:
+                print(f"경고: 저장된 인덱스 척도({self.metric})가 설정({settings.VECTOR_METRIC})과 다릅니다.")
+            self._rebuild_metadata_index()
+            
+            # 메타데이터가 없는 벡터는 삭제 표시된 벡터
+            ids = index_factory.stored_ids(self.index)
+            self._tombstones = set(np.setdiff1d(ids, self.metadata_store.ids()).tolist())
+            self._checkpoint_bytes = os.path.getsize(index_path) + os.path.getsize(metadata_path)
             print(f"벡터 인덱스 로드 완료: {self.index.ntotal}개 벡터")
         else:
             # 새 인덱스 생성
-            self.index = faiss.IndexFlatL2(self.dimension)
-            print(f"새 벡터 인덱스 생성: 차원 {self.dimension}")
+            self.metric = settings.VECTOR_METRIC
+            self.index = index_factory.wrap_with_ids(
+                index_factory.create_index(self._target_index_type(0), self.dimension, metric=self.metric)
+            )
+            self._index_mapped = False
+            self._tombstones = set()
+            self._checkpoint_bytes = 0
+            print(f"새 벡터 인덱스 생성: 차원 {self.dimension}, 척도 {self.metric}")
+        
+        self._replay_wal()
+    
+    def _replay_wal(self, start: int = 0) -> int:
+        """마지막 체크포인트 이후의 변경 로그 재생 (start: 이어서 재생할 로그 위치, 재구성 잠금 안에서 호출)
+        
+        추가는 같은 ID를 교체하고 삭제는 없는 ID를 무시하므로, 체크포인트에 이미
+        반영된 기록을 다시 재생해도 결과가 같다. 삭제 표시된 ID를 다시 추가하는 기록은
+        재생 중에 재구성(체크포인트로 로그를 비움)하지 않고 미뤄 두었다가 끝난 뒤 한 번 반영한다.
+        """
+        replayed = 0
+        self._replay_deferred = {}
+        try:
+            for record in self._wal.replay(start):
+                if record[0] == "add":
+                    # 이전 버전 기록에는 본문이 없음
+                    _, ids, embeddings, metadatas, *texts = record
+                    self._apply_add(ids, embeddings, metadatas, texts[0] if texts else None)
+                elif record[0] == "delete":
+                    with self._lock:
+                        self._remove_ids(record[1])
+                    for vector_id in np.asarray(record[1]).tolist():
+                        self._replay_deferred.pop(int(vector_id), None)
+                replayed += 1
+        finally:
+            deferred, self._replay_deferred = self._replay_deferred, None
+        
+        if deferred:
+            self._apply_deferred(deferred)
+        if replayed and not start:
+            print(f"벡터 변경 로그 재생: {replayed}개 기록")
+        return replayed
+    
+    def _apply_deferred(self, deferred: Dict[int, Tuple[np.ndarray, Dict[str, Any]]]):
+        """재생 중 미룬 벡터 추가: 삭제 표시된 벡터를 재구성으로 정리한 뒤 추가하고 한 번 체크포인트
+        (재구성 잠금 안에서 호출)
+        """
+        ids = np.fromiter(deferred, dtype="int64", count=len(deferred))
+        self._rebuild(self._target_index_type(len(self.metadata_store) + len(ids)), checkpoint=False)
+        
+        with self._lock:
+            embeddings = np.stack([deferred[vector_id][0] for vector_id in ids.tolist()])
+            metadatas = [deferred[vector_id][1] for vector_id in ids.tolist()]
+            self._ensure_writable_index()
+            self.index.add_with_ids(embeddings, ids)
+            self.metadata_store.add(ids, metadatas)
+            for vector_id, metadata in zip(ids.tolist(), metadatas):
+                self.metadata_index.add(vector_id, metadata)
+            if not self.read_only:
+                self._checkpoint()
+    
+    def _checkpoint_signature(self) -> Tuple:
+        """체크포인트 파일 식별값 (교체되면 inode가 바뀜)"""
+        signature = []
+        for filename in ("faiss.index", "metadata.cols"):
+            try:
+                stat = os.stat(os.path.join(self.vector_db_path, filename))
+                signature.append((stat.st_ino, stat.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+    
+    def refresh(self) -> bool:
+        """읽기 전용 저장소에 기록 프로세스의 변경 반영 (반영한 변경이 있으면 True)
+        
+        체크포인트 이후 새로 기록된 로그만 이어서 재생하고, 체크포인트 파일이 바뀌었거나
+        (로그가 비워짐) 기록하던 프로세스가 끝나 잠금을 넘겨받을 수 있으면 다시 로드한다.
+        """
+        if not self.read_only:
+            return False
+        if (
+            self._wal.acquire()
+            or self._checkpoint_signature() != self._loaded_signature
+            or self._wal.size_bytes() < self._wal.read_offset
+        ):
+            self.reload()
+            return True
+        if self._wal.size_bytes() == self._wal.read_offset:
+            return False
+        
+        with self._rebuild_lock:
+            replayed = self._replay_wal(self._wal.read_offset)
+        # 재생 중 체크포인트가 끼어들었으면 새 체크포인트로 다시 로드
+        if self._checkpoint_signature() != self._loaded_signature:
+            self.reload()
+            return True
+        return replayed > 0
+    
+    def _refresh_loop(self):
+        """읽기 전용인 동안 주기적으로 기록 프로세스의 변경 반영"""
+        while self.read_only and not self._closed.wait(settings.VECTOR_READER_REFRESH_INTERVAL):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"벡터 저장소 변경 반영 오류: {e}")
+    
+    def _rebuild_metadata_index(self):
+        """메타데이터 저장소로부터 역색인 재구성"""
+        self.metadata_index.clear()
+        # 체크포인트 부분은 열 단위로 일괄 색인
+        for key, ids, codes, values in self.metadata_store.base_columns():
+            self.metadata_index.add_column(key, ids, codes, values)
+        for vector_id, metadata in self.metadata_store.base_extra_items():
+            self.metadata_index.add(vector_id, metadata)
+        for vector_id, metadata in self.metadata_store.overlay_items():
+            self.metadata_index.add(vector_id, metadata)
+    
+    def _ensure_writable_index(self):
+        """매핑된 인덱스를 변경하기 전에 메모리로 복사 (잠금 안에서 호출)"""
+        if not self._index_mapped:
+            return
+        self.index = index_factory.materialize(
+            self.index, os.path.join(self.vector_db_path, "faiss.index")
+        )
+        self._index_mapped = False
+    
+    def _target_index_type(self, ntotal: int) -> str:
+        """벡터 수에 맞는 인덱스 타입 결정"""
+        index_type = settings.VECTOR_INDEX_TYPE
+        threshold = settings.VECTOR_INDEX_AUTO_ANN_THRESHOLD
+        if index_type == index_factory.INDEX_FLAT and threshold and ntotal >= threshold:
+            index_type = settings.VECTOR_INDEX_ANN_TYPE
+        
+        # 학습 데이터가 부족하면 충분히 쌓일 때까지 flat 인덱스 사용
+        if ntotal < index_factory.min_training_points(index_type):
+            return index_factory.INDEX_FLAT
+        return index_type
+    
+    def _maybe_rebuild_index(self):
+        """목표 인덱스 타입과 다르면 새 인덱스로 재구성"""
+        with self._lock:
+            target = self._target_index_type(len(self.metadata_store))
+            if target == index_factory.index_type_of(self.index):
+                return
+        self._rebuild_index(target)
+    
+    def _rebuild_index(self, target: str, wait: bool = False) -> Optional[Dict[str, Any]]:
+        """재구성 잠금을 잡고 인덱스 재구성 (다른 재구성이 진행 중이고 wait=False면 None)"""
+        if not self._rebuild_lock.acquire(blocking=wait):
+            return None
+        
+        try:
+            return self._rebuild(target)
+        finally:
+            self._rebuild_lock.release()
+    
+    def _rebuild(self, target: str, checkpoint: bool = True) -> Optional[Dict[str, Any]]:
+        """살아 있는 벡터만으로 target 타입 인덱스를 새로 구성 (재구성 잠금 안에서 호출)
+        
+        재구성(학습 포함)은 잠금 밖에서 수행하고, 그동안 추가/삭제된 벡터를 반영한 뒤
+        잠금 안에서 교체하므로 검색이 멈추지 않는다.
+        """
+        with self._lock:
+            # 재구성 중 추가되는 벡터가 기존 인덱스 객체에 들어가도록 먼저 복사
+            self._ensure_writable_index()
+            old_index = self.index
+            snapshot_ids = self.metadata_store.ids()
+            vectors = index_factory.reconstruct_ids(old_index, snapshot_ids)
+            self._removed_during_rebuild = set()
+        
+        try:
+            print(f"벡터 인덱스 재구성: {index_factory.index_type_of(old_index)} -> {target} ({len(snapshot_ids)}개 벡터)")
+            new_index = index_factory.build_index(
+                target, self.dimension, vectors, self.metric, ids=snapshot_ids
+            )
+            
+            with self._lock:
+                if self.index is not old_index:  # 재구성 중 reload 발생
+                    return None
+                live_ids = self.metadata_store.ids()
+                
+                # 재구성 중 삭제 후 다시 추가된 벡터는 새 인덱스의 값이 낡았으므로 교체
+                removed = np.fromiter(self._removed_during_rebuild, dtype="int64")
+                replaced = np.intersect1d(np.intersect1d(snapshot_ids, removed), live_ids)
+                if len(replaced):
+                    if not index_factory.supports_remove(new_index):
+                        print("벡터 인덱스 재구성 취소: 재구성 중 벡터가 교체되었습니다.")
+                        return None
+                    new_index.remove_ids(replaced)
+                    snapshot_ids = np.setdiff1d(snapshot_ids, replaced)
+                added = np.setdiff1d(live_ids, snapshot_ids)
+                if len(added):
+                    new_index.add_with_ids(index_factory.reconstruct_ids(old_index, added), added)
+                
+                old_bytes = old_index.ntotal * index_factory.bytes_per_vector(old_index)
+                self.index = new_index
+                self._index_mapped = False
+                self._tombstones = set()
+                self.metadata_store.compact()
+                # 재구성 중 삭제된 벡터
+                self._remove_ids(np.setdiff1d(snapshot_ids, live_ids))
+                
+                reclaimed = max(0, old_bytes - self.index.ntotal * index_factory.bytes_per_vector(self.index))
+                result = {
+                    "index_type": target,
+                    "removed_vectors": old_index.ntotal - self.index.ntotal,
+                    "reclaimed_bytes": reclaimed,
+                    "total_vectors": self.index.ntotal
+                }
+                self.deletion_stats["last_compaction"] = result
+                if checkpoint:
+                    self._checkpoint()
+            print(f"벡터 인덱스 재구성 완료: {result['removed_vectors']}개 제거, 약 {reclaimed}바이트 회수")
+            return result
+        finally:
+            self._removed_during_rebuild = None
     
     def add_documents(
         self,
         texts: List[str],
-        metadatas: List[Dict[str, Any]]
-    ) -> List[str]:
-        """문서 추가 및 인덱싱"""
+        metadatas: List[Dict[str, Any]],
+        ids: Optional[Sequence[int]] = None
+    ) -> List[int]:
+        """문서 추가 및 인덱싱
+        
+        ids(청크별 고정 int64 ID)를 주면 그 ID로 추가하고, 이미 있는 ID는 교체한다.
+        주지 않으면 임의의 ID를 부여한다.
+        """
         if not texts:
             return []
+        self._wal.ensure_writable()
+        ids = new_vector_ids(len(texts)) if ids is None else np.asarray(ids, dtype="int64")
+        if len(np.unique(ids)) != len(ids):
+            raise ValueError("중복된 벡터 ID가 있습니다.")
         
-        # 임베딩 생성
-        embeddings = self.embedding_generator.generate_embeddings(texts)
+        # 임베딩 생성 (잠금 밖에서 수행하여 검색을 막지 않음)
+        if self.chunk_cache is not None:
+            # 이전에 인코딩한 적 없는 청크만 인코딩
+            embeddings = self.chunk_cache.encode(
+                texts, self.embedding_generator.generate_embeddings
+            )
+        else:
+            embeddings = self.embedding_generator.generate_embeddings(texts)
+        embeddings = self._prepare_vectors(embeddings)
         
-        # 벡터 ID 생성
-        start_id = self.index.ntotal
-        vector_ids = [str(start_id + i) for i in range(len(texts))]
+        self._apply_add(ids, embeddings, metadatas, texts, log=True)
         
-        # 인덱스에 추가
-        self.index.add(embeddings.astype('float32'))
+        # 벡터 수가 임계값을 넘으면 ANN 인덱스로 전환
+        self._maybe_rebuild_index()
         
-        # 메타데이터 저장
-        for vector_id, metadata in zip(vector_ids, metadatas):
-            self.metadata_store[vector_id] = metadata
+        return ids.tolist()
+    
+    def _apply_add(
+        self,
+        ids: np.ndarray,
+        embeddings: np.ndarray,
+        metadatas: List[Dict[str, Any]],
+        texts: Optional[List[str]] = None,
+        log: bool = False
+    ):
+        """벡터와 메타데이터, 본문 반영 (log=True면 먼저 변경 로그에 기록)"""
+        record = ("add", ids, embeddings, metadatas, texts)
+        with self._lock:
+            if log:
+                self._wal.append(record)
+            pending = self._replace_existing(ids, embeddings, metadatas)
         
-        # 저장
-        self._save_index()
+        # 삭제 표시된 ID는 아직 인덱스에 남아 있으므로 압축한 뒤 다시 추가
+        collided = self._tombstones.intersection(ids[pending].tolist())
+        if collided:
+            if log:
+                self.compact(wait=True)
+                # 압축 체크포인트가 로그를 비웠으므로 다시 기록
+                self._wal.append(record)
+            else:
+                # 로그 재생 중에는 재생이 끝난 뒤 재구성하고 추가하도록 미룸
+                for i in np.flatnonzero(pending).tolist():
+                    if int(ids[i]) in collided:
+                        self._replay_deferred[int(ids[i])] = (embeddings[i], metadatas[i])
+                        pending[i] = False
         
-        return vector_ids
+        with self._lock:
+            # 인덱스에 추가
+            self._ensure_writable_index()
+            self.index.add_with_ids(embeddings[pending], ids[pending])
+            
+            # 메타데이터 저장
+            new_metadatas = [metadatas[i] for i in np.flatnonzero(pending)]
+            self.metadata_store.add(ids[pending], new_metadatas)
+            for vector_id, metadata in zip(ids[pending].tolist(), new_metadatas):
+                self.metadata_index.add(vector_id, metadata)
+            if texts is not None:
+                self.text_store.put(ids, texts)
+                self._update_lexical_index(ids.tolist(), texts)
+            
+            if log:
+                self._maybe_checkpoint()
+    
+    def _replace_existing(
+        self,
+        ids: np.ndarray,
+        embeddings: np.ndarray,
+        metadatas: List[Dict[str, Any]]
+    ) -> np.ndarray:
+        """이미 있는 ID 처리 후 인덱스에 새로 추가할 항목의 마스크 반환 (잠금 안에서 호출)
+        
+        벡터가 그대로인 항목은 메타데이터만 바꾸고, 나머지는 기존 벡터를 삭제한다.
+        """
+        existing = self.metadata_store.contains(ids)
+        pending = np.ones(len(ids), dtype=bool)
+        if not existing.any():
+            return pending
+        
+        if not index_factory.supports_remove(self.index):
+            # HNSW는 같은 ID를 다시 추가할 수 없으므로 벡터가 같으면 그대로 둠
+            stored = index_factory.reconstruct_ids(self.index, ids[existing])
+            same = np.all(np.isclose(stored, embeddings[existing], atol=1e-6), axis=1)
+            for i in np.flatnonzero(existing)[same].tolist():
+                vector_id = int(ids[i])
+                self.metadata_index.remove(vector_id, self.metadata_store.get(vector_id))
+                self.metadata_store.update(vector_id, metadatas[i])
+                self.metadata_index.add(vector_id, metadatas[i])
+                pending[i] = False
+        
+        self._remove_ids(ids[existing & pending])
+        return pending
     
     def search(
         self,
         query: str,
         top_k: int = 5,
-        filter_dict: Dict[str, Any] = None
-    ) -> List[Tuple[str, float, Dict[str, Any]]]:
-        """유사도 검색"""
+        filter_dict: Dict[str, Any] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None
+    ) -> List[Tuple[int, float, Dict[str, Any]]]:
+        """유사도 검색 (nprobe/ef_search로 쿼리별 정확도-속도 조정)"""
         if self.index.ntotal == 0:
             return []
         
         # 쿼리 임베딩 생성
         query_embedding = self.embedding_generator.generate_embedding(query)
-        query_embedding = query_embedding.reshape(1, -1).astype('float32')
+        return self.search_by_vector(query_embedding, top_k, filter_dict, nprobe, ef_search)
+    
+    def search_by_vector(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int = 5,
+        filter_dict: Dict[str, Any] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None
+    ) -> List[Tuple[int, float, Dict[str, Any]]]:
+        """임베딩 벡터로 유사도 검색"""
+        query_embedding = self._prepare_vectors(np.asarray(query_embedding).reshape(1, -1))
+        
+        with self._lock:
+            if self.index.ntotal == 0:
+                return []
+            
+            # 색인된 메타데이터 조건은 후보 ID로 변환하여 FAISS 검색 안에서 적용
+            candidate_ids = self.metadata_index.lookup(filter_dict) if filter_dict else None
+            if candidate_ids is not None and len(candidate_ids) == 0:
+                return []
+            if candidate_ids is not None:
+                limit = len(candidate_ids)
+            else:
+                limit = self.index.ntotal - len(self._tombstones)
+            if limit <= 0:
+                return []
+            
+            # 색인되지 않은 조건이 남아 있으면 결과가 찰 때까지 검색 범위 확대
+            fetch_k = top_k
+            while True:
+                k = min(fetch_k, limit)
+                params = index_factory.make_search_params(
+                    self.index, nprobe, ef_search, candidate_ids,
+                    excluded_ids=self._tombstone_array() if candidate_ids is None else None
+                )
+                distances, indices = self.index.search(query_embedding, k, params=params)
+                results = self._collect_results(distances[0], indices[0], filter_dict)
+                if len(results) >= top_k or k >= limit:
+                    break
+                fetch_k = k * 2
+            
+            return self._attach_text(results[:top_k])
+    
+    def lexical_search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter_dict: Dict[str, Any] = None,
+        wait: bool = True
+    ) -> List[Tuple[int, float, Dict[str, Any]]]:
+        """본문 BM25 검색 (점수는 BM25 값 그대로, 필터는 벡터 검색과 동일하게 적용)
         
-        # 검색
-        k = min(top_k, self.index.ntotal)
-        distances, indices = self.index.search(query_embedding, k)
+        색인이 아직 구성 중이면 wait=True일 때 구성이 끝나기를 기다리고,
+        wait=False면 빈 결과를 반환한다 (하이브리드 검색은 그동안 의미 검색 결과만 사용).
+        """
+        if not self._lexical_ready:
+            build = self.start_lexical_build()
+            if not wait:
+                return []
+            if build is not None:
+                build.join()
         
-        # 결과 구성
-        results = []
-        for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-            if idx == -1:  # FAISS의 빈 결과
-                continue
+        with self._lock:
+            if not self._lexical_ready:
+                return []
+            candidate_ids = self.metadata_index.lookup(filter_dict) if filter_dict else None
+            if candidate_ids is not None and len(candidate_ids) == 0:
+                return []
             
-            vector_id = str(idx)
-            metadata = self.metadata_store.get(vector_id, {})
+            scores = self.lexical_index.scores(query, candidate_ids)
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            results = []
+            # 색인되지 않은 필터 조건은 점수 순으로 확인하며 top_k개를 채움
+            batch_size = max(top_k, 1) * 2
+            for start in range(0, len(ranked), batch_size):
+                batch = ranked[start:start + batch_size]
+                metadatas = self.metadata_store.get_many(vector_id for vector_id, _ in batch)
+                for (vector_id, score), metadata in zip(batch, metadatas):
+                    if metadata is None:
+                        continue
+                    if filter_dict and not self._matches_filter(metadata, filter_dict):
+                        continue
+                    results.append((vector_id, float(score), metadata))
+                if len(results) >= top_k:
+                    break
+            return self._attach_text(results[:top_k])
+    
+    def start_lexical_build(self) -> Optional[threading.Thread]:
+        """BM25 색인을 백그라운드에서 구성 시작 (이미 구성됐으면 None, 구성 중이면 그 스레드)"""
+        with self._lock:
+            if self._lexical_ready:
+                return None
+            if self._lexical_build is None or not self._lexical_build.is_alive():
+                self._lexical_pending = []
+                self._lexical_build = threading.Thread(
+                    target=self._build_lexical_index, args=(self._lexical_epoch,),
+                    name="bm25-build", daemon=True
+                )
+                self._lexical_build.start()
+            return self._lexical_build
+    
+    def _build_lexical_index(self, epoch: int):
+        """저장된 본문으로 새 BM25 색인을 구성한 뒤 잠금 안에서 교체
+        
+        본문은 묶음 단위로 짧게 잠금을 잡고 읽고, 토큰화와 색인은 잠금 밖에서 한다.
+        구성 중 추가/삭제된 청크는 _lexical_pending에 모였다가 교체 직전에 순서대로 반영한다.
+        """
+        index = BM25Index()
+        with self._lock:
+            ids = self.text_store.ids()
+        for start in range(0, len(ids), 1024):
+            batch = ids[start:start + 1024].tolist()
+            with self._lock:
+                if epoch != self._lexical_epoch:
+                    return
+                texts = self.text_store.get_many(batch)
+            present = [(vector_id, text) for vector_id, text in zip(batch, texts) if text is not None]
+            if present:
+                index.add(*zip(*present))
+        
+        with self._lock:
+            if epoch != self._lexical_epoch:
+                return
+            for changed_ids, changed_texts in self._lexical_pending:
+                if changed_texts is None:
+                    index.remove(changed_ids)
+                else:
+                    index.add(changed_ids, changed_texts)
+            self.lexical_index = index
+            self._lexical_pending = None
+            self._lexical_ready = True
+        print(f"BM25 색인 구성 완료: {len(index)}개 청크")
+    
+    def _update_lexical_index(self, ids: Sequence[int], texts: Optional[List[str]] = None):
+        """BM25 색인에 청크 추가/교체 (texts가 None이면 제거, 잠금 안에서 호출)"""
+        if self._lexical_ready:
+            if texts is None:
+                self.lexical_index.remove(ids)
+            else:
+                self.lexical_index.add(ids, texts)
+        elif self._lexical_pending is not None:
+            self._lexical_pending.append((list(ids), texts))
+    
+    def _attach_text(
+        self,
+        results: List[Tuple[int, float, Dict[str, Any]]]
+    ) -> List[Tuple[int, float, Dict[str, Any]]]:
+        """최종 결과의 본문을 한 번에 읽어 메타데이터 사본에 추가 (잠금 안에서 호출)"""
+        texts = self.text_store.get_many(vector_id for vector_id, _, _ in results)
+        return [
+            (vector_id, score, {**metadata, "content": text or ""})
+            for (vector_id, score, metadata), text in zip(results, texts)
+        ]
+    
+    def _collect_results(
+        self,
+        distances: np.ndarray,
+        indices: np.ndarray,
+        filter_dict: Dict[str, Any] = None
+    ) -> List[Tuple[int, float, Dict[str, Any]]]:
+        """FAISS 검색 결과를 (벡터 ID, 유사도, 메타데이터) 목록으로 변환"""
+        results = []
+        valid = indices != -1  # FAISS의 빈 결과 제외
+        metadatas = self.metadata_store.get_many(indices[valid])
+        for distance, vector_id, metadata in zip(distances[valid], indices[valid].tolist(), metadatas):
+            metadata = metadata or {}
             
-            # 필터 적용
+            # 필터 적용 (후보 ID 선택 이후에도 전체 조건 확인)
             if filter_dict:
                 if not self._matches_filter(metadata, filter_dict):
                     continue
             
-            # 거리를 유사도 점수로 변환 (L2 거리이므로 낮을수록 유사)
-            similarity = 1 / (1 + distance)
+            similarity = self._to_similarity(distance)
             
             results.append((vector_id, similarity, metadata))
         
         return results
     
+    def _prepare_vectors(self, vectors: np.ndarray) -> np.ndarray:
+        """인덱스 입력용 float32 배열 (cosine 척도는 L2 정규화)"""
+        vectors = np.array(vectors, dtype='float32', order='C')
+        if self.metric == index_factory.METRIC_COSINE:
+            faiss.normalize_L2(vectors)
+        return vectors
+    
+    def _to_similarity(self, distance: float) -> float:
+        """검색 거리를 유사도 점수로 변환"""
+        if self.metric == index_factory.METRIC_COSINE:
+            # 정규화된 벡터의 내적 = 코사인 유사도 (쿼리 간 비교 및 임계값 적용 가능)
+            return float(distance)
+        # L2 거리이므로 낮을수록 유사
+        return float(1 / (1 + distance))
+    
     def _matches_filter(self, metadata: Dict[str, Any], filter_dict: Dict[str, Any]) -> bool:
-        """메타데이터 필터 매칭"""
+        """메타데이터 필터 매칭 (리스트 값은 그중 하나와 일치하면 통과)"""
         for key, value in filter_dict.items():
-            if key not in metadata or metadata[key] != value:
+            if key not in metadata:
+                return False
+            if isinstance(value, (list, tuple, set)):
+                if metadata[key] not in value:
+                    return False
+            elif metadata[key] != value:
                 return False
         return True
     
-    def delete_documents(self, vector_ids: List[str]):
-        """문서 삭제 (FAISS는 삭제를 직접 지원하지 않으므로 재구성 필요)"""
-        # FAISS는 삭제를 직접 지원하지 않으므로
-        # 전체 인덱스를 재구성해야 함
-        # 실제 운영 환경에서는 더 효율적인 방법 고려 필요
-        pass
+    def delete_documents(self, vector_ids: Iterable[int]) -> int:
+        """벡터 삭제 (삭제된 벡터 수 반환)"""
+        with self._lock:
+            ids = np.asarray(list(vector_ids), dtype="int64")
+            ids = ids[self.metadata_store.contains(ids)]
+        return self._delete(ids)
+    
+    def delete_by_document(self, document_id: str) -> int:
+        """문서의 모든 벡터 삭제 (삭제된 벡터 수 반환)"""
+        return self._delete(self.document_vector_ids(document_id))
+    
+    def document_vector_ids(self, document_id: str) -> np.ndarray:
+        """문서에 속한 벡터 ID"""
+        with self._lock:
+            ids = self.metadata_index.lookup({"document_id": document_id})
+        return ids if ids is not None else np.empty(0, dtype="int64")
     
-    def _save_index(self):
-        """인덱스 저장"""
+    def _delete(self, ids: Optional[np.ndarray]) -> int:
+        """메타데이터와 인덱스에서 벡터 삭제 후 필요하면 압축 예약"""
+        if ids is None or len(ids) == 0:
+            return 0
+        self._wal.ensure_writable()
+        
+        with self._lock:
+            self._wal.append(("delete", np.asarray(ids, dtype="int64")))
+            removed = self._remove_ids(ids)
+            self._maybe_checkpoint()
+        
+        self._maybe_schedule_compaction()
+        return removed
+    
+    def _remove_ids(self, ids: np.ndarray) -> int:
+        """벡터 ID 제거 (잠금 안에서 호출)
+        
+        remove_ids를 지원하는 인덱스는 바로 제거하고, HNSW처럼 지원하지 않는
+        인덱스는 삭제 표시만 하여 검색에서 제외한 뒤 압축 때 정리한다.
+        """
+        if len(ids) == 0:
+            return 0
+        
+        ids = np.ascontiguousarray(ids, dtype="int64")
+        removed_metadata = self.metadata_store.remove(ids)
+        for vector_id, metadata in removed_metadata:
+            self.metadata_index.remove(vector_id, metadata)
+        self.text_store.remove(ids.tolist())
+        self._update_lexical_index(ids.tolist())
+        removed = len(removed_metadata)
+        if self._removed_during_rebuild is not None:
+            self._removed_during_rebuild.update(ids.tolist())
+        
+        if index_factory.supports_remove(self.index):
+            self._ensure_writable_index()
+            bytes_per_vector = index_factory.bytes_per_vector(self.index)
+            reclaimed = self.index.remove_ids(ids) * bytes_per_vector
+            self.deletion_stats["reclaimed_bytes"] += reclaimed
+        else:
+            self._tombstones.update(ids.tolist())
+        self.deletion_stats["deleted_vectors"] += removed
+        return removed
+    
+    def _tombstone_array(self) -> Optional[np.ndarray]:
+        """검색에서 제외할 벡터 ID"""
+        if not self._tombstones:
+            return None
+        return np.fromiter(self._tombstones, dtype="int64", count=len(self._tombstones))
+    
+    def _needs_compaction(self) -> bool:
+        """삭제 표시된 벡터 비율이 임계값을 넘었는지 여부"""
+        if not self._tombstones or self.index.ntotal == 0:
+            return False
+        return len(self._tombstones) / self.index.ntotal >= settings.VECTOR_COMPACTION_THRESHOLD
+    
+    def _maybe_schedule_compaction(self):
+        """필요하면 백그라운드 스레드에서 압축 실행"""
+        with self._lock:
+            if self._rebuild_lock.locked() or not self._needs_compaction():
+                return
+        threading.Thread(target=self.compact, name="vector-store-compaction", daemon=True).start()
+    
+    def compact(self, wait: bool = False) -> Optional[Dict[str, Any]]:
+        """삭제 표시된 벡터를 제거하도록 인덱스 재구성
+        
+        다른 재구성이 진행 중이면 wait=True일 때 끝날 때까지 기다리고, 아니면 None 반환.
+        """
+        self._wal.ensure_writable()
+        with self._lock:
+            target = self._target_index_type(len(self.metadata_store))
+        return self._rebuild_index(target, wait=wait)
+    
+    def _maybe_checkpoint(self):
+        """변경 로그가 체크포인트 크기에 비례해 커지면 체크포인트 (잠금 안에서 호출)
+        
+        기준을 체크포인트 크기의 일정 비율로 두어 말뭉치가 커져도 추가당 평균
+        디스크 쓰기량이 일정하게 유지된다.
+        """
+        threshold = max(
+            settings.VECTOR_WAL_CHECKPOINT_MIN_BYTES,
+            self._checkpoint_bytes * settings.VECTOR_WAL_CHECKPOINT_RATIO
+        )
+        if self._wal.size_bytes() >= threshold:
+            self._checkpoint()
+    
+    def checkpoint(self):
+        """현재 상태를 체크포인트로 저장하고 변경 로그 비우기 (내보내기 전 등)"""
+        with self._lock:
+            self._checkpoint()
+    
+    def _checkpoint(self):
+        """인덱스와 메타데이터를 임시 파일에 쓴 뒤 원자적으로 교체 (잠금 안에서 호출)
+        
+        인덱스를 먼저 교체하므로 중간에 중단되어도 메타데이터가 인덱스보다 앞서지 않고,
+        로그는 두 파일이 모두 교체된 뒤 비우므로 재생으로 복구된다.
+        """
+        self._wal.ensure_writable()
         os.makedirs(self.vector_db_path, exist_ok=True)
         
         index_path = os.path.join(self.vector_db_path, "faiss.index")
-        metadata_path = os.path.join(self.vector_db_path, "metadata.pkl")
+        metadata_path = os.path.join(self.vector_db_path, "metadata.cols")
+        
+        faiss.write_index(self.index, index_path + ".tmp")
+        with open(index_path + ".tmp", 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(index_path + ".tmp", index_path)
         
-        faiss.write_index(self.index, index_path)
-        with open(metadata_path, 'wb') as f:
-            pickle.dump(self.metadata_store, f)
+        self.metadata_store.save(metadata_path + ".tmp")
+        os.replace(metadata_path + ".tmp", metadata_path)
+        # 변경분을 메모리에서 내리고 새 체크포인트 파일을 매핑
+        self.metadata_store = VectorMetadataStore.load(metadata_path)
+        legacy_metadata_path = os.path.join(self.vector_db_path, "metadata.pkl")
+        if os.path.exists(legacy_metadata_path):
+            os.remove(legacy_metadata_path)
+        self.text_store.checkpoint()
+        
+        self._wal.reset()
+        self._checkpoint_bytes = os.path.getsize(index_path) + os.path.getsize(metadata_path)
+    
+    def reload(self, discard_log: bool = False):
+        """디스크에서 인덱스와 메타데이터 다시 로드 (RAG 동기화 가져오기 이후 등)
+        
+        discard_log=True면 체크포인트 파일을 외부에서 교체한 경우로 보고 변경 로그를 버린다.
+        읽기 전용 저장소는 기록하던 프로세스가 끝났으면 기록 잠금을 넘겨받는다.
+        """
+        # 진행 중인 재구성이 끝난 뒤 교체
+        with self._rebuild_lock, self._lock:
+            self._wal.acquire()
+            if discard_log:
+                self._wal.reset()
+            self.index = None
+            self._index_mapped = False
+            self.metadata_store = VectorMetadataStore()
+            self.metadata_index.clear()
+            self.text_store.close()
+            self.text_store = ChunkTextStore(self.vector_db_path, read_only=self.read_only)
+            self.lexical_index = BM25Index()
+            self._lexical_ready = False
+            self._lexical_pending = None
+            self._lexical_epoch += 1
+            self._tombstones = set()
+            self._load_or_create_index()
+    
+    def close(self):
+        """남은 변경을 체크포인트로 저장하고 로그 닫기"""
+        self._closed.set()
+        with self._lock:
+            if not self.read_only and self._wal.size_bytes():
+                self._checkpoint()
+            self._wal.close()
+            self.text_store.close()
+    
+    def is_empty(self) -> bool:
+        """인덱스가 비어 있는지 여부"""
+        return len(self.metadata_store) == 0
     
     def get_stats(self) -> Dict[str, Any]:
         """벡터 저장소 통계"""
-        return {
-            "total_vectors": self.index.ntotal,
-            "dimension": self.dimension,
-            "index_type": type(self.index).__name__
-        }
+        with self._lock:
+            index_info = index_factory.describe_index(self.index)
+            stats = {
+                "total_vectors": len(self.metadata_store),
+                "dimension": self.dimension,
+                "index_type": index_info.pop("type"),
+                "index_class": type(self.index).__name__,
+                "index_params": index_info,
+                "metadata_index": self.metadata_index.get_stats(),
+                "tombstones": len(self._tombstones),
+                "wal_bytes": self._wal.size_bytes(),
+                "read_only": self.read_only,
+                "index_mmapped": self._index_mapped,
+                "metadata_mapped_bytes": self.metadata_store.mapped_bytes,
+                "chunk_text": self.text_store.get_stats(),
+                "lexical_index": self.lexical_index.get_stats() if self._lexical_ready else None,
+                **self.deletion_stats
+            }
+        if self.chunk_cache is not None:
+            stats["chunk_cache"] = self.chunk_cache.get_stats()
+        return stats
 
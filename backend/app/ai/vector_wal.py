@@ -0,0 +1,123 @@
+"""
+벡터 저장소 변경 로그 (write-ahead log)
+"""
+import os
+import pickle
+import struct
+import threading
+import zlib
+from typing import Any, Iterator, Tuple
+
+try:
+    import fcntl
+except ImportError:  # fcntl 미지원 환경(Windows)은 잠금 없이 기록
+    fcntl = None
+
+
+# 레코드 헤더: 본문 길이, 본문 CRC32
+_HEADER = struct.Struct("<II")
+
+
+class VectorWAL:
+    """추가/삭제 기록을 파일 끝에 덧붙이는 변경 로그
+    
+    변경마다 전체 인덱스를 다시 쓰는 대신 로그에 기록하고, 주기적인 체크포인트
+    이후 로그를 비운다. 시작 시 마지막 체크포인트 위에 로그를 재생하여 복구한다.
+    마지막 레코드가 쓰다 만 상태(프로세스 중단)면 그 앞까지만 재생한다.
+    
+    체크포인트 후 로그를 비우면 다른 프로세스의 기록도 지워지므로, 로그 파일에 배타
+    잠금(flock)을 얻은 하나만 기록한다. 잠금을 얻지 못하면 읽기 전용으로 열려 재생만 한다.
+    """
+    
+    def __init__(self, path: str, fsync: bool = False):
+        """로그 파일 열기"""
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "ab")
+        # 마지막으로 재생한 완전한 레코드의 끝 위치 (읽기 전용이면 이후 기록만 이어서 재생)
+        self.read_offset = 0
+        self.writable = False
+        self.acquire()
+    
+    def acquire(self) -> bool:
+        """기록 잠금 획득 시도 (다른 프로세스가 잡고 있으면 읽기 전용 유지)"""
+        with self._lock:
+            if not self.writable:
+                if fcntl is None:
+                    self.writable = True
+                else:
+                    try:
+                        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        self.writable = True
+                    except BlockingIOError:
+                        pass
+            return self.writable
+    
+    def ensure_writable(self):
+        """기록 잠금이 없으면 변경 거부"""
+        if not self.writable:
+            raise RuntimeError(
+                f"다른 프로세스가 변경 로그를 사용 중이므로 벡터 저장소가 읽기 전용으로 열렸습니다: {self.path}"
+            )
+    
+    def append(self, record: Tuple[Any, ...]):
+        """레코드 추가"""
+        self.ensure_writable()
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        header = _HEADER.pack(len(payload), zlib.crc32(payload))
+        with self._lock:
+            self._file.write(header + payload)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+    
+    def replay(self, start: int = 0) -> Iterator[Tuple[Any, ...]]:
+        """start 위치부터 기록된 레코드 순회 (손상된 꼬리 레코드는 잘라내고 중단)"""
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            self.read_offset = start
+            while True:
+                offset = f.tell()
+                header = f.read(_HEADER.size)
+                if not header:
+                    return
+                if len(header) == _HEADER.size:
+                    length, checksum = _HEADER.unpack(header)
+                    payload = f.read(length)
+                    if len(payload) == length and zlib.crc32(payload) == checksum:
+                        self.read_offset = f.tell()
+                        yield pickle.loads(payload)
+                        continue
+                
+                # 이후 기록이 손상된 부분 뒤에 붙지 않도록 잘라냄
+                # (읽기 전용이면 기록 중인 레코드일 수 있으므로 그 앞까지만 재생)
+                if self.writable:
+                    print(f"변경 로그 끝의 손상된 레코드를 버립니다: {self.path}")
+                    with self._lock:
+                        self._file.truncate(offset)
+                return
+    
+    def size_bytes(self) -> int:
+        """로그 파일 크기"""
+        with self._lock:
+            if not self.writable:
+                # 다른 프로세스가 덧붙이므로 파일 크기로 확인
+                return os.fstat(self._file.fileno()).st_size
+            return self._file.tell()
+    
+    def reset(self):
+        """체크포인트 이후 로그 비우기"""
+        self.ensure_writable()
+        with self._lock:
+            self._file.truncate(0)
+            self._file.seek(0)
+            if self.fsync:
+                os.fsync(self._file.fileno())
+    
+    def close(self):
+        """로그 파일 닫기 (기록 잠금도 해제됨)"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
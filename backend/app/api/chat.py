@@ -4,7 +4,7 @@ AI 채팅 API 라우터
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple
 from datetime import datetime
 
 from app.core.database import get_db
@@ -13,6 +13,9 @@ from app.api.dependencies import get_current_user
 from app.services.llm_service import LLMService
 from app.services.search_service import SearchService
 from app.services.chat_service import ChatService
+from app.api.streaming import sse_response
+from app.ai.rag_engine import RAGSearchEngine, get_rag_engine
+from app.ai.llm_providers import LLMProvider
 from app.models.database import User
 
 router = APIRouter(prefix="/chat", tags=["AI 채팅"])
@@ -44,13 +47,16 @@ class ChatResponse(BaseModel):
     provider: str
 
 
-@router.post("/", response_model=ChatResponse)
-async def chat(
+async def _prepare_chat(
     request: ChatRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """AI 채팅"""
+    current_user: User,
+    db: Session,
+    rag_engine: RAGSearchEngine
+) -> Tuple[ChatService, Any, str, Optional[List[dict]], LLMProvider, str]:
+    """입력 검증, 사용자 메시지 저장, RAG 검색, 프롬프트/프로바이더 준비
+    
+    (채팅 서비스, 대화, 프롬프트, 출처, 프로바이더, 프로바이더명) 반환
+    """
     # 입력 검증
     if not request.message or not request.message.strip():
         raise HTTPException(
@@ -67,7 +73,7 @@ async def chat(
     logger.info(f"채팅 요청: 사용자={current_user.username}, RAG={request.use_rag}, 시스템={request.use_main_system}")
     
     llm_service = LLMService(db)
-    search_service = SearchService(db)
+    search_service = SearchService(db, rag_engine)
     chat_service = ChatService(db)
     
     # 대화 조회 또는 생성
@@ -112,22 +118,36 @@ async def chat(
 사용자 질문: {request.message}
 
 답변:"""
+
+    provider = llm_service.get_provider(
+        provider_name=request.provider_name,
+        use_main_system=request.use_main_system
+    )
+    if not provider:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="사용 가능한 LLM 프로바이더가 없습니다."
+        )
+    
+    provider_name = request.provider_name or "default"
+    return chat_service, conversation, prompt, sources, provider, provider_name
+
+
+@router.post("/", response_model=ChatResponse)
+async def chat(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    rag_engine: RAGSearchEngine = Depends(get_rag_engine)
+):
+    """AI 채팅"""
+    chat_service, conversation, prompt, sources, provider, provider_name = await _prepare_chat(
+        request, current_user, db, rag_engine
+    )
     
     # LLM을 통한 답변 생성
     try:
-        provider = llm_service.get_provider(
-            provider_name=request.provider_name,
-            use_main_system=request.use_main_system
-        )
-        
-        if not provider:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="사용 가능한 LLM 프로바이더가 없습니다."
-            )
-        
         response_text = await provider.generate(prompt)
-        provider_name = request.provider_name or "default"
         
         # AI 응답 저장
         chat_service.add_message(
@@ -145,8 +165,6 @@ async def chat(
             sources=sources,
             provider=provider_name
         )
-    except HTTPException:
-        raise
     except Exception as e:
         logger.error(f"채팅 응답 생성 오류: {e}", exc_info=True)
         raise HTTPException(
@@ -155,6 +173,54 @@ async def chat(
         )
 
 
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    rag_engine: RAGSearchEngine = Depends(get_rag_engine)
+):
+    """AI 채팅 (SSE 스트리밍)
+    
+    이벤트: meta(대화 ID, 출처) -> token(답변 조각, 여러 번) -> done(저장된 메시지 ID) 또는 error.
+    답변은 스트림이 끝까지 완료된 뒤 한 번 저장한다.
+    """
+    chat_service, conversation, prompt, sources, provider, provider_name = await _prepare_chat(
+        request, current_user, db, rag_engine
+    )
+    
+    async def events():
+        yield "meta", {
+            "conversation_id": conversation.id,
+            "sources": sources,
+            "provider": provider_name
+        }
+        
+        parts = []
+        try:
+            async for text in provider.stream(prompt):
+                parts.append(text)
+                yield "token", {"text": text}
+        except Exception as e:
+            logger.error(f"채팅 응답 스트리밍 오류: {e}", exc_info=True)
+            yield "error", {"detail": "답변 생성 중 오류가 발생했습니다."}
+            return
+        
+        # AI 응답 저장
+        response_text = "".join(parts)
+        message = chat_service.add_message(
+            conversation_id=conversation.id,
+            role="assistant",
+            content=response_text,
+            sources=sources,
+            provider=provider_name
+        )
+        logger.info(f"채팅 스트리밍 완료: 대화ID={conversation.id}, 프로바이더={provider_name}")
+        yield "done", {"message_id": message.id, "response": response_text}
+    
+    return sse_response(events())
+
+
 @router.get("/conversations")
 async def get_conversations(
     limit: int = 50,
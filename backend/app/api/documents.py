@@ -1,31 +1,78 @@
 """
 문서 관리 API 라우터
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+import asyncio
 import os
 import tempfile
+import time
 
 from app.core.database import get_db
 from app.core.config import settings
 from app.core.logging import logger
 from app.api.dependencies import get_current_user
-from app.api.schemas import DocumentResponse
+from app.api.schemas import DocumentResponse, IngestionJobCreate, IngestionJobResponse
 from app.services.document_service import DocumentService
+from app.services.ingestion_service import (
+    IngestionService, ACTIVE_STATUSES, JOB_DELETE, JOB_INDEX, JOB_PIPELINE, STATUS_COMPLETED
+)
+from app.services.ingestion_worker import wake_ingestion_worker
 from app.services.permission_service import PermissionService
-from app.models.database import User
+from app.services.summary_service import pregenerate_summaries
+from app.ai.rag_engine import RAGSearchEngine, get_rag_engine
+from app.models.database import IngestionJob, User
 
 router = APIRouter(prefix="/documents", tags=["문서"])
 
+# 기록 프로세스에 넘긴 작업의 상태 확인 주기 (초)
+WRITER_JOB_POLL_INTERVAL = 0.5
+
+
+async def _run_in_writer(
+    db: Session,
+    document_id: str,
+    job_type: str,
+    user_id: str
+) -> Optional[IngestionJob]:
+    """벡터 저장소가 읽기 전용인 프로세스의 인덱스 변경을 작업 큐로 기록 프로세스에 넘기고 완료 대기
+    
+    작업이 실패하거나 취소되면 400, INGESTION_JOB_LEASE_SECONDS 안에 끝나지 않으면 504.
+    삭제 작업은 문서와 함께 작업도 삭제되므로 성공하면 None을 반환한다.
+    """
+    service = IngestionService(db)
+    job = service.enqueue(document_id, job_type, user_id=user_id)
+    job_id = job.id
+    deadline = time.monotonic() + settings.INGESTION_JOB_LEASE_SECONDS
+    
+    while job is not None and job.status in ACTIVE_STATUSES:
+        if time.monotonic() > deadline:
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="인덱스 기록 작업이 제시간에 끝나지 않았습니다. 작업 상태를 확인하세요."
+            )
+        await asyncio.sleep(WRITER_JOB_POLL_INTERVAL)
+        db.expire_all()
+        job = service.get_job(job_id)
+    
+    if job is not None and job.status != STATUS_COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=job.error_message or "인덱스 기록 작업이 완료되지 않았습니다."
+        )
+    return job
+
 
 @router.post("/upload", response_model=DocumentResponse)
 async def upload_document(
     file: UploadFile = File(...),
+    auto_process: Optional[bool] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """문서 업로드"""
+    """문서 업로드 (auto_process: 파싱/인덱싱 작업 자동 등록, 미지정 시 INGESTION_AUTO_PIPELINE 사용)"""
     # 파일 확장자 확인
     file_ext = os.path.splitext(file.filename)[1].lower()
     if file_ext not in settings.ALLOWED_EXTENSIONS:
@@ -55,6 +102,12 @@ async def upload_document(
             user_id=current_user.id
         )
         logger.info(f"문서 업로드 완료: {file.filename} (사용자: {current_user.username})")
+        
+        if auto_process is None:
+            auto_process = settings.INGESTION_AUTO_PIPELINE
+        if auto_process:
+            IngestionService(db).enqueue(document.id, JOB_PIPELINE, user_id=current_user.id)
+            wake_ingestion_worker()
         return document
     except Exception as e:
         logger.error(f"문서 업로드 오류: {e}", exc_info=True)
@@ -121,7 +174,7 @@ async def parse_document(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """문서 파싱"""
+    """문서 파싱 (완료까지 기다리지 않으려면 작업 등록 API 사용)"""
     doc_service = DocumentService(db)
     permission_service = PermissionService(db)
     
@@ -133,7 +186,8 @@ async def parse_document(
         )
     
     try:
-        document = doc_service.parse_document(document_id)
+        # 파싱은 CPU를 오래 사용하므로 이벤트 루프를 막지 않도록 스레드에서 실행
+        document = await run_in_threadpool(doc_service.parse_document, document_id)
         return document
     except ValueError as e:
         raise HTTPException(
@@ -145,11 +199,13 @@ async def parse_document(
 @router.post("/{document_id}/index", response_model=DocumentResponse)
 async def index_document(
     document_id: str,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    rag_engine: RAGSearchEngine = Depends(get_rag_engine)
 ):
-    """문서 인덱싱"""
-    doc_service = DocumentService(db)
+    """문서 인덱싱 (완료까지 기다리지 않으려면 작업 등록 API 사용)"""
+    doc_service = DocumentService(db, rag_engine)
     permission_service = PermissionService(db)
     
     # 권한 확인
@@ -159,8 +215,17 @@ async def index_document(
             detail="이 문서를 인덱싱할 권한이 없습니다."
         )
     
+    if rag_engine.read_only:
+        # 다른 프로세스가 벡터 저장소 기록 잠금을 가지고 있으면 그 프로세스의 작업 워커가 인덱싱
+        # (요약 미리 생성도 작업 워커가 수행)
+        await _run_in_writer(db, document_id, JOB_INDEX, current_user.id)
+        db.expire_all()
+        return doc_service.get_document(document_id)
+    
     try:
-        document = doc_service.index_document(document_id)
+        document = await run_in_threadpool(doc_service.index_document, document_id)
+        # 첫 요약 요청이 LLM 응답을 기다리지 않도록 미리 생성
+        background_tasks.add_task(pregenerate_summaries, document_id)
         return document
     except ValueError as e:
         raise HTTPException(
@@ -169,14 +234,69 @@ async def index_document(
         )
 
 
+@router.post(
+    "/{document_id}/jobs",
+    response_model=IngestionJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def create_ingestion_job(
+    document_id: str,
+    request: Optional[IngestionJobCreate] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """문서 파싱/인덱싱 작업 등록 (작업 워커가 백그라운드에서 처리)"""
+    permission_service = PermissionService(db)
+    
+    # 권한 확인
+    if not permission_service.check_permission(current_user.id, document_id, "write"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="이 문서를 처리할 권한이 없습니다."
+        )
+    
+    try:
+        job_type = request.job_type if request else JOB_PIPELINE
+        job = IngestionService(db).enqueue(document_id, job_type, user_id=current_user.id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    wake_ingestion_worker()
+    return job
+
+
+@router.get("/{document_id}/jobs", response_model=List[IngestionJobResponse])
+async def list_ingestion_jobs(
+    document_id: str,
+    limit: int = 20,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """문서의 처리 작업 목록 조회"""
+    permission_service = PermissionService(db)
+    
+    # 권한 확인
+    if not permission_service.check_permission(current_user.id, document_id, "read"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="이 문서에 대한 접근 권한이 없습니다."
+        )
+    
+    return IngestionService(db).list_jobs(document_id=document_id, limit=limit)
+
+
 @router.delete("/{document_id}")
 async def delete_document(
     document_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    rag_engine: RAGSearchEngine = Depends(get_rag_engine)
 ):
-    """문서 삭제"""
-    doc_service = DocumentService(db)
+    """문서 삭제 (벡터 저장소가 읽기 전용이면 기록 프로세스에서 삭제)"""
+    doc_service = DocumentService(db, rag_engine)
     permission_service = PermissionService(db)
     
     # 권한 확인
@@ -186,6 +306,11 @@ async def delete_document(
             detail="이 문서를 삭제할 권한이 없습니다."
         )
     
+    document = doc_service.get_document(document_id)
+    if document is not None and document.is_indexed and rag_engine.read_only:
+        await _run_in_writer(db, document_id, JOB_DELETE, current_user.id)
+        return {"message": "문서가 삭제되었습니다."}
+    
     success = doc_service.delete_document(document_id)
     if not success:
         raise HTTPException(
@@ -0,0 +1,82 @@
+"""
+문서 처리 작업 API 라우터
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.api.dependencies import get_current_user
+from app.api.schemas import IngestionJobResponse
+from app.services.ingestion_service import IngestionService
+from app.services.ingestion_worker import wake_ingestion_worker
+from app.services.permission_service import PermissionService
+from app.models.database import IngestionJob, User
+
+router = APIRouter(prefix="/jobs", tags=["문서 처리 작업"])
+
+
+def _get_job(job_id: str, user: User, permission_type: str, db: Session) -> IngestionJob:
+    """작업 조회 및 작업 대상 문서 권한 확인"""
+    job = IngestionService(db).get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="작업을 찾을 수 없습니다."
+        )
+    
+    if not PermissionService(db).check_permission(user.id, job.document_id, permission_type):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="이 작업에 대한 권한이 없습니다."
+        )
+    
+    return job
+
+
+@router.get("/{job_id}", response_model=IngestionJobResponse)
+async def get_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """작업 상태 조회"""
+    return _get_job(job_id, current_user, "read", db)
+
+
+@router.post("/{job_id}/cancel", response_model=IngestionJobResponse)
+async def cancel_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """작업 취소 (실행 중인 작업은 현재 단계가 끝난 뒤 중단)"""
+    _get_job(job_id, current_user, "write", db)
+    
+    try:
+        return IngestionService(db).cancel(job_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.post("/{job_id}/retry", response_model=IngestionJobResponse)
+async def retry_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """실패하거나 취소된 작업 다시 실행"""
+    _get_job(job_id, current_user, "write", db)
+    
+    try:
+        job = IngestionService(db).retry(job_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    wake_ingestion_worker()
+    return job
@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.api.dependencies import get_current_user
 from app.utils.performance import PerformanceMonitor
+from app.ai.rag_engine import RAGSearchEngine, get_rag_engine
 from app.models.database import User
 
 router = APIRouter(prefix="/performance", tags=["성능 모니터링"])
@@ -37,3 +38,16 @@ async def get_process_resources(
     
     return PerformanceMonitor.get_process_resources()
 
+
+
+@router.get("/rag")
+async def get_rag_stats(
+    current_user: User = Depends(get_current_user),
+    rag_engine: RAGSearchEngine = Depends(get_rag_engine)
+):
+    """RAG 엔진 통계 조회 (벡터 인덱스, 임베딩 배치/캐시)"""
+    # 관리자만 조회 가능
+    if current_user.role != "admin":
+        return {"error": "권한이 없습니다."}
+    
+    return rag_engine.get_stats()
@@ -8,7 +8,8 @@ from pydantic import BaseModel
 
 from app.core.database import get_db
 from app.api.dependencies import get_current_user
-from app.services.rag_sync_service import RAGSyncService
+from app.services.rag_sync_service import RAGSyncConflict, RAGSyncService
+from app.ai.rag_engine import reload_rag_engine, get_rag_engine
 from app.models.database import User
 
 router = APIRouter(prefix="/rag-sync", tags=["RAG 동기화"])
@@ -24,12 +25,15 @@ class ImportRequest(BaseModel):
 
 
 @router.post("/export")
-async def export_rag(
+def export_rag(
     sync_request: SyncRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """RAG 데이터 내보내기 (메인 시스템 -> 선박 시스템)"""
+    """RAG 데이터 내보내기 (메인 시스템 -> 선박 시스템)
+    
+    파일 복사가 오래 걸리므로 일반 함수로 두어 스레드 풀에서 실행 (이벤트 루프를 막지 않음)
+    """
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -37,17 +41,23 @@ async def export_rag(
         )
     
     sync_service = RAGSyncService(db)
-    result = sync_service.export_rag(sync_request.target_system)
+    try:
+        result = sync_service.export_rag(sync_request.target_system)
+    except RAGSyncConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     return result
 
 
 @router.post("/import")
-async def import_rag(
+def import_rag(
     import_request: ImportRequest,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """RAG 데이터 가져오기 (선박 시스템 <- 메인 시스템)"""
+    """RAG 데이터 가져오기 (선박 시스템 <- 메인 시스템, 파일 교체와 재로드는 스레드 풀에서 실행)"""
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -55,13 +65,62 @@ async def import_rag(
         )
     
     sync_service = RAGSyncService(db)
-    result = sync_service.import_rag(
-        sync_id=import_request.sync_id,
-        source_path=import_request.source_path
-    )
+    try:
+        result = sync_service.import_rag(
+            sync_id=import_request.sync_id,
+            source_path=import_request.source_path
+        )
+    except RAGSyncConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     return result
 
 
+@router.post("/reload")
+def reload_index(
+    current_user: User = Depends(get_current_user)
+):
+    """벡터 인덱스 다시 로드 (인덱스 로드는 스레드 풀에서 실행)"""
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="관리자만 다시 로드할 수 있습니다."
+        )
+    
+    engine = reload_rag_engine()
+    return {"message": "벡터 인덱스를 다시 로드했습니다.", "stats": engine.get_stats()}
+
+
+@router.post("/compact")
+def compact_index(
+    current_user: User = Depends(get_current_user)
+):
+    """벡터 인덱스 압축 (삭제된 벡터 정리)"""
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="관리자만 압축할 수 있습니다."
+        )
+    
+    try:
+        RAGSyncService.ensure_writer()
+    except RAGSyncConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    
+    result = get_rag_engine().compact()
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="인덱스 재구성이 이미 진행 중입니다."
+        )
+    return {"message": "벡터 인덱스를 압축했습니다.", "result": result}
+
+
 @router.get("/history")
 async def get_sync_history(
     limit: int = 20,
@@ -3,7 +3,7 @@ API 라우터 통합
 """
 from fastapi import APIRouter
 
-from app.api import auth, documents, search, summary, permissions, performance, llm_settings, models, rag_sync, huggingface, model_serving, chat
+from app.api import auth, documents, search, summary, permissions, performance, llm_settings, models, rag_sync, huggingface, model_serving, chat, jobs
 
 api_router = APIRouter()
 
@@ -20,4 +20,5 @@ api_router.include_router(rag_sync.router)
 api_router.include_router(huggingface.router)
 api_router.include_router(model_serving.router)
 api_router.include_router(chat.router)
+api_router.include_router(jobs.router)
 
@@ -2,7 +2,7 @@
 API 스키마 (Pydantic 모델)
 """
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 
 
@@ -59,6 +59,30 @@ class DocumentResponse(BaseModel):
         from_attributes = True
 
 
+# 문서 처리 작업 스키마
+class IngestionJobCreate(BaseModel):
+    job_type: Literal["parse", "index", "pipeline"] = "pipeline"  # pipeline: 파싱 후 인덱싱
+
+
+class IngestionJobResponse(BaseModel):
+    id: str
+    document_id: str
+    job_type: str
+    status: str
+    stage: Optional[str] = None
+    progress: int
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool
+    error_message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
 # 검색 스키마
 class SearchRequest(BaseModel):
     query: str
@@ -67,6 +91,8 @@ class SearchRequest(BaseModel):
     filter_dict: Optional[Dict[str, Any]] = None
     use_main_system: Optional[bool] = True
     provider_name: Optional[str] = None
+    min_score: Optional[float] = None  # 미지정 시 SEARCH_MIN_SCORE 사용
+    search_mode: Optional[Literal["hybrid", "semantic", "lexical"]] = None  # 미지정 시 SEARCH_MODE 사용
     
     class Config:
         # 입력 검증
@@ -8,7 +8,9 @@ from typing import List
 from app.core.database import get_db
 from app.api.dependencies import get_current_user
 from app.api.schemas import SearchRequest, SearchResponse
+from app.api.streaming import sse_response
 from app.services.search_service import SearchService
+from app.ai.rag_engine import RAGSearchEngine, get_rag_engine
 from app.models.database import User
 
 router = APIRouter(prefix="/search", tags=["검색"])
@@ -18,10 +20,11 @@ router = APIRouter(prefix="/search", tags=["검색"])
 async def search(
     search_request: SearchRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    rag_engine: RAGSearchEngine = Depends(get_rag_engine)
 ):
     """의미 기반 검색"""
-    search_service = SearchService(db)
+    search_service = SearchService(db, rag_engine)
     result = await search_service.search(
         query=search_request.query,
         user_id=current_user.id,
@@ -29,11 +32,37 @@ async def search(
         generate_answer=search_request.generate_answer,
         filter_dict=search_request.filter_dict,
         use_main_system=search_request.use_main_system,
-        provider_name=search_request.provider_name
+        provider_name=search_request.provider_name,
+        min_score=search_request.min_score,
+        search_mode=search_request.search_mode
     )
     return result
 
 
+@router.post("/stream")
+async def search_stream(
+    search_request: SearchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    rag_engine: RAGSearchEngine = Depends(get_rag_engine)
+):
+    """검색 + 답변 생성 (SSE 스트리밍)
+    
+    이벤트: results(검색 결과) -> token(답변 조각, 여러 번) -> done(전체 답변, 신뢰도) 또는 error
+    """
+    search_service = SearchService(db, rag_engine)
+    return sse_response(search_service.search_stream(
+        query=search_request.query,
+        user_id=current_user.id,
+        top_k=search_request.top_k,
+        filter_dict=search_request.filter_dict,
+        use_main_system=search_request.use_main_system,
+        provider_name=search_request.provider_name,
+        min_score=search_request.min_score,
+        search_mode=search_request.search_mode
+    ))
+
+
 @router.get("/suggestions")
 async def get_search_suggestions(
     q: str = Query(..., description="검색어"),
@@ -0,0 +1,29 @@
+"""
+Server-Sent Events 응답 유틸리티
+"""
+import json
+from typing import Any, AsyncIterator, Dict, Tuple
+
+from fastapi.responses import StreamingResponse
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """SSE 이벤트 한 건 (data는 JSON)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def sse_response(events: AsyncIterator[Tuple[str, Dict[str, Any]]]) -> StreamingResponse:
+    """(이벤트명, 데이터) 비동기 이터레이터를 SSE 스트리밍 응답으로 변환"""
+    async def body():
+        async for event, data in events:
+            yield sse_event(event, data)
+    
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # 리버스 프록시(nginx)의 응답 버퍼링 비활성화
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -45,18 +45,106 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PERMISSION_CACHE_TTL: int = 60  # 사용자별 읽기 가능 문서 캐시 (초, 0이면 캐시 안 함)
     
     # AI/ML 설정
     EMBEDDING_MODEL: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
     VECTOR_DB_PATH: str = "./data/vector_db"
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     OLLAMA_MODEL: str = "llama2:7b"
+    LLM_HTTP_TIMEOUT: float = 60.0  # 클라우드 LLM 응답 대기 시간 (초)
+    OLLAMA_HTTP_TIMEOUT: float = 120.0  # 로컬 Ollama 응답 대기 시간 (초)
+    LLM_HTTP_CONNECT_TIMEOUT: float = 10.0
+    LLM_HTTP_MAX_CONNECTIONS: int = 20  # 프로바이더별 최대 동시 연결 수
+    LLM_HTTP_MAX_KEEPALIVE: int = 10  # 프로바이더별 유지할 유휴 연결 수
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 60.0  # 유휴 연결 유지 시간 (초)
+    LLM_HTTP2: bool = True  # h2 패키지가 설치된 경우 클라우드 프로바이더에 HTTP/2 사용
+    PRELOAD_RAG_ENGINE: bool = True  # 시작 시 임베딩 모델/벡터 인덱스 미리 로드
+    
+    # 벡터 인덱스 설정 (flat, ivf_flat, hnsw_flat, ivf_pq)
+    VECTOR_METRIC: str = "l2"  # l2 또는 cosine (정규화 벡터 + 내적 인덱스)
+    VECTOR_INDEX_TYPE: str = "flat"
+    VECTOR_INDEX_ANN_TYPE: str = "hnsw_flat"  # flat 인덱스가 임계값을 넘으면 전환할 타입
+    VECTOR_INDEX_AUTO_ANN_THRESHOLD: int = 50000  # 0이면 자동 전환 안 함
+    VECTOR_INDEX_TRAIN_SAMPLE_SIZE: int = 100000  # IVF 학습 샘플 수
+    VECTOR_INDEX_NLIST: int = 1024
+    VECTOR_INDEX_NPROBE: int = 16
+    VECTOR_INDEX_PQ_M: int = 16
+    VECTOR_INDEX_PQ_NBITS: int = 8
+    VECTOR_INDEX_HNSW_M: int = 32
+    VECTOR_INDEX_EF_CONSTRUCTION: int = 80
+    VECTOR_INDEX_EF_SEARCH: int = 64
+    VECTOR_COMPACTION_THRESHOLD: float = 0.2  # 삭제 표시된 벡터 비율이 이 값을 넘으면 인덱스 압축
+    # 변경 로그(vectors.wal)는 한 프로세스만 기록: 로그 파일 잠금을 얻은 프로세스가 기록/체크포인트하고
+    # 문서 처리 작업을 실행한다. 같은 VECTOR_DB_PATH를 여는 나머지 프로세스(여러 uvicorn 워커 등)는
+    # 읽기 전용으로 열려 검색만 하고, 인덱싱/삭제 요청은 작업 큐를 통해 기록 프로세스에 넘긴다.
+    VECTOR_WAL_FSYNC: bool = False  # 변경 로그 기록마다 fsync (전원 장애 대비)
+    VECTOR_READER_REFRESH_INTERVAL: float = 2.0  # 읽기 전용 프로세스가 변경 로그를 이어 읽는 주기 (초, 0이면 안 함)
+    VECTOR_WAL_CHECKPOINT_MIN_BYTES: int = 64 * 1024 * 1024
+    VECTOR_WAL_CHECKPOINT_RATIO: float = 0.5  # 로그가 체크포인트 크기의 이 비율을 넘으면 체크포인트
+    VECTOR_INDEX_MMAP: bool = True  # 인덱스를 메모리 매핑으로 로드 (워커 간 페이지 캐시 공유)
+    CHUNK_TEXT_COMPRESSION_LEVEL: int = 3  # 청크 본문 zstd 압축 레벨
+    CHUNK_TEXT_COMPACTION_RATIO: float = 0.5  # 본문 데이터 파일의 유효 비율이 이 값 미만이면 체크포인트 때 압축
     
     # 성능 설정
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
     MAX_SEARCH_RESULTS: int = 10
+    SEARCH_MIN_SCORE: float = 0.0  # 이 점수 미만의 검색 결과는 제외
+    SEARCH_MODE: str = "hybrid"  # hybrid(의미+BM25), semantic, lexical
+    SEARCH_RRF_K: int = 60  # RRF 순위 상수 (클수록 하위 순위 영향 증가)
+    SEARCH_VECTOR_WEIGHT: float = 1.0  # RRF 결합 시 의미 검색 가중치
+    SEARCH_LEXICAL_WEIGHT: float = 1.0  # RRF 결합 시 BM25 검색 가중치
+    SEARCH_HYBRID_FETCH_MULTIPLIER: int = 4  # 결합 전 각 검색에서 top_k의 몇 배를 가져올지
+    BM25_K1: float = 1.2
+    BM25_B: float = 0.75
+    RERANK_ENABLED: bool = False  # 크로스 인코더 재순위화 사용 여부
+    RERANK_MODEL: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+    RERANK_CANDIDATES: int = 50  # 재순위화할 후보 수
+    RERANK_BATCH_SIZE: int = 16
+    RERANK_MAX_LENGTH: int = 512
+    RERANK_BUDGET_MS: float = 300.0  # 쿼리별 시간 예산 (초과 시 검색 순서 사용, 0이면 무제한)
+    RERANK_CACHE_SIZE: int = 4096  # (쿼리, 청크) 점수 캐시 크기
+    LLM_CACHE_ENABLED: bool = True  # RAG 답변/문서 요약 응답 캐시
+    LLM_CACHE_SIZE: int = 1024
+    LLM_CACHE_TTL: int = 60 * 60  # 초 (0이면 만료 없음)
+    LLM_CACHE_SEMANTIC: bool = False  # 같은 컨텍스트에서 유사한 질문의 답변도 재사용
+    LLM_CACHE_SIMILARITY: float = 0.95  # 의미 일치로 판단할 쿼리 임베딩 코사인 유사도
+    SUMMARY_PREGENERATE_TYPES: List[str] = ["core"]  # 인덱싱 후 백그라운드에서 미리 만들 요약 타입 (빈 목록이면 안 함)
+    SUMMARY_SINGLE_PASS_CHARS: int = 12000  # 이보다 긴 문서는 부분별로 요약한 뒤 합침
+    SUMMARY_SECTION_CHARS: int = 6000  # 부분 요약 한 번에 넣는 최대 글자 수
+    SUMMARY_REDUCE_MAX_CHARS: int = 12000  # 부분 요약을 합칠 때 한 프롬프트의 최대 글자 수
+    SUMMARY_MAP_CONCURRENCY: int = 4  # 클라우드 프로바이더별 동시 부분 요약 수
+    SUMMARY_MAP_CONCURRENCY_LOCAL: int = 1  # 로컬 Ollama 동시 부분 요약 수
     BATCH_SIZE: int = 32
+    EMBEDDING_BATCH_MAX_SIZE: int = 32  # 쿼리 임베딩 마이크로 배치 최대 크기
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 10.0  # 배치를 모으기 위한 최대 대기 시간
+    
+    # 문서 처리 작업 큐 설정
+    INGESTION_WORKER_ENABLED: bool = True  # 애플리케이션 시작 시 작업 워커 실행
+    INGESTION_CONCURRENCY: int = 2  # 워커가 동시에 처리할 작업 수
+    INGESTION_PARSE_PROCESSES: int = 2  # 파싱 프로세스 수 (0이면 스레드에서 파싱)
+    INGESTION_MAX_ATTEMPTS: int = 3
+    INGESTION_RETRY_BACKOFF: float = 30.0  # 첫 재시도 대기 (초, 시도마다 두 배)
+    INGESTION_POLL_INTERVAL: float = 2.0  # 대기 작업 확인 주기 (초)
+    INGESTION_JOB_LEASE_SECONDS: int = 300  # 이 시간 동안 확인이 없는 실행 중 작업은 중단된 것으로 보고 다시 실행
+    INGESTION_SPILL_DIR: str = "./data/ingestion_spill"  # 파싱 프로세스가 청크를 기록하는 임시 디렉토리
+    INGESTION_AUTO_PIPELINE: bool = False  # 업로드 직후 파싱/인덱싱 작업 자동 등록
+    
+    # 문서 파싱 설정
+    PDF_PARSE_WORKERS: int = 4  # PDF 페이지 추출 프로세스 수 (1이면 순차 추출, 풀은 재사용, 작업 프로세스 안에서는 순차 추출)
+    PDF_PARALLEL_MIN_PAGES: int = 40  # 이 페이지 수 이상일 때만 여러 프로세스로 추출
+    CHUNK_INSERT_BATCH_SIZE: int = 500  # 파싱 중 청크를 DB에 한 번에 저장하는 개수
+    EXCEL_CHUNK_MAX_ROWS: int = 100  # Excel 행 묶음 청크의 최대 행 수 (길이는 CHUNK_SIZE 이하)
+    
+    # 임베딩 캐시 설정
+    EMBEDDING_CACHE_DIR: str = "./data/embedding_cache"
+    QUERY_EMBEDDING_CACHE_SIZE: int = 1024  # 0이면 쿼리 캐시 비활성화
+    QUERY_EMBEDDING_CACHE_TTL: int = 24 * 60 * 60  # 초 (0이면 만료 없음, 디스크 계층에도 적용)
+    QUERY_EMBEDDING_CACHE_PERSIST: bool = True  # 디스크 계층 사용 여부
+    QUERY_EMBEDDING_CACHE_DISK_MAX_ENTRIES: int = 100_000  # 넘으면 오래된 항목부터 압축 (0이면 제한 없음)
+    CHUNK_EMBEDDING_CACHE_ENABLED: bool = True  # 재인덱싱 시 변경되지 않은 청크 임베딩 재사용
+    CHUNK_EMBEDDING_CACHE_MAX_ENTRIES: int = 2_000_000  # 넘으면 오래된 항목부터 압축 (0이면 제한 없음)
     
     class Config:
         env_file = ".env"
@@ -12,6 +12,9 @@ import traceback
 from app.core.config import settings
 from app.core.logging import logger
 from app.api.router import api_router
+from app.ai.rag_engine import init_rag_engine, shutdown_rag_engine
+from app.ai.provider_registry import close_provider_registry
+from app.services.ingestion_worker import start_ingestion_worker, stop_ingestion_worker
 
 # FastAPI 앱 생성
 app = FastAPI(
@@ -40,6 +43,37 @@ if not os.path.exists(settings.UPLOAD_DIR):
 app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
 
 
+@app.on_event("startup")
+async def startup_event():
+    """공유 리소스 초기화"""
+    if settings.PRELOAD_RAG_ENGINE:
+        # 첫 요청에서 모델 로딩 지연이 발생하지 않도록 미리 생성
+        engine = init_rag_engine()
+        if settings.SEARCH_MODE != "semantic":
+            # BM25 색인은 백그라운드에서 구성 (완료 전 하이브리드 검색은 의미 검색 결과만 사용)
+            engine.vector_store.start_lexical_build()
+        logger.info("RAG 엔진 초기화 완료")
+    
+    if settings.INGESTION_WORKER_ENABLED:
+        # 업로드 문서의 파싱/인덱싱 작업을 요청과 분리하여 처리
+        # (벡터 저장소 기록 잠금을 가진 프로세스의 워커만 작업을 가져감)
+        engine = init_rag_engine()
+        start_ingestion_worker()
+        if engine.read_only:
+            logger.info("문서 처리 작업 워커 시작 (벡터 저장소 읽기 전용: 기록 잠금을 얻을 때까지 대기)")
+        else:
+            logger.info("문서 처리 작업 워커 시작")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """공유 리소스 정리"""
+    # 처리 중인 작업을 대기 상태로 되돌린 뒤 엔진 종료
+    await stop_ingestion_worker()
+    shutdown_rag_engine()
+    await close_provider_registry()
+
+
 # 전역 예외 처리
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
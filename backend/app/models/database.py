@@ -1,7 +1,7 @@
 """
 데이터베이스 모델
 """
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Text, ForeignKey, JSON, Boolean, Float, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -46,6 +46,8 @@ class Document(Base):
     creator = relationship("User", back_populates="documents")
     chunks = relationship("DocumentChunk", back_populates="document", cascade="all, delete-orphan")
     permissions = relationship("Permission", back_populates="document", cascade="all, delete-orphan")
+    summaries = relationship("DocumentSummary", back_populates="document", cascade="all, delete-orphan")
+    ingestion_jobs = relationship("IngestionJob", back_populates="document", cascade="all, delete-orphan")
 
 
 class DocumentChunk(Base):
@@ -57,13 +59,61 @@ class DocumentChunk(Base):
     chunk_index = Column(Integer, nullable=False)
     content = Column(Text, nullable=False)
     chunk_metadata = Column(JSON)  # 청크 메타데이터 (페이지 번호, 섹션 등)
-    embedding_id = Column(String)  # 벡터 DB의 ID
+    embedding_id = Column(BigInteger)  # 벡터 DB의 ID (청크 ID에서 만든 int64)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # 관계
     document = relationship("Document", back_populates="chunks")
 
 
+class DocumentSummary(Base):
+    """문서 요약 모델 (문서 본문 해시별로 저장하여 같은 요약을 다시 생성하지 않음)"""
+    __tablename__ = "document_summaries"
+    __table_args__ = (
+        UniqueConstraint("document_id", "summary_type", "provider", "content_hash", name="uq_document_summary"),
+    )
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    document_id = Column(String, ForeignKey("documents.id"), nullable=False, index=True)
+    summary_type = Column(String, nullable=False)  # core, detailed, keywords
+    provider = Column(String, nullable=False)  # 프로바이더 종류|모델|접속 주소
+    content_hash = Column(String, nullable=False)  # 요약한 본문의 SHA-256
+    content = Column(Text, nullable=False)
+    keywords = Column(JSON)
+    quality_score = Column(Float, default=0.0)
+    original_length = Column(Integer, default=0)
+    summary_length = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # 관계
+    document = relationship("Document", back_populates="summaries")
+
+
+class IngestionJob(Base):
+    """문서 처리 작업 모델 (파싱/인덱싱 작업 큐)"""
+    __tablename__ = "ingestion_jobs"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    document_id = Column(String, ForeignKey("documents.id"), nullable=False, index=True)
+    job_type = Column(String, nullable=False)  # parse, index, pipeline (파싱 후 인덱싱)
+    status = Column(String, default="pending", index=True)  # pending, running, completed, failed, cancelled
+    stage = Column(String)  # 현재 단계 (parse, index)
+    progress = Column(Integer, default=0)  # 진행률 (0-100)
+    attempts = Column(Integer, default=0)  # 실행 시도 횟수
+    max_attempts = Column(Integer, default=3)
+    cancel_requested = Column(Boolean, default=False)
+    error_message = Column(Text)  # 마지막 오류 메시지
+    created_by = Column(String, ForeignKey("users.id"))
+    run_after = Column(DateTime, default=datetime.utcnow)  # 재시도 대기 (이 시각 이후 실행)
+    heartbeat_at = Column(DateTime)  # 실행 중인 워커의 마지막 확인 시각
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    
+    # 관계
+    document = relationship("Document", back_populates="ingestion_jobs")
+
+
 class Permission(Base):
     """권한 모델"""
     __tablename__ = "permissions"
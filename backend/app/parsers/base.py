@@ -1,11 +1,18 @@
 """
 문서 파서 기본 클래스
 """
+import json
+import os
+import tempfile
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
-from dataclasses import dataclass
+from bisect import bisect_right
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
+from dataclasses import asdict, dataclass
 from datetime import datetime
 
+from app.core.config import settings
+
 
 @dataclass
 class DocumentMetadata:
@@ -41,19 +48,313 @@ class ParsedDocument:
     structure: Dict[str, Any] = None  # 문서 구조 (제목, 섹션 등)
 
 
+@dataclass
+class SpilledDocument:
+    """청크를 임시 파일(JSON Lines)에 기록한 파싱 결과
+    
+    작업 프로세스에서 파싱할 때 전체 청크와 본문 대신 이 객체만 부모 프로세스로 넘기고,
+    부모는 파일에서 청크를 하나씩 읽어 저장한다.
+    """
+    filename: str
+    file_type: str
+    metadata: DocumentMetadata
+    structure: Dict[str, Any]
+    chunk_path: str
+    chunk_count: int = 0
+    
+    def iter_chunks(self) -> Iterator[ContentChunk]:
+        """기록된 청크를 순서대로 읽기"""
+        with open(self.chunk_path, encoding="utf-8") as f:
+            for line in f:
+                yield ContentChunk(**json.loads(line))
+    
+    def remove(self):
+        """청크 파일 삭제"""
+        try:
+            os.remove(self.chunk_path)
+        except FileNotFoundError:
+            pass
+
+
+def spill_chunks(chunks: Iterable[ContentChunk], spill_dir: Optional[str] = None) -> Tuple[str, int]:
+    """청크를 만드는 대로 임시 파일에 기록 (파일 경로와 청크 수 반환, 실패 시 파일 삭제)"""
+    if spill_dir:
+        os.makedirs(spill_dir, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="chunks-", suffix=".jsonl", dir=spill_dir)
+    count = 0
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(json.dumps(asdict(chunk), ensure_ascii=False, default=str) + "\n")
+                count += 1
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, count
+
+
+@dataclass
+class TextSegment:
+    """파서가 문서 순서대로 내보내는 원문 조각 (페이지, 단락, 표 등)"""
+    text: str
+    page_number: int = None
+    section_title: str = ""
+    metadata: Dict[str, Any] = None
+
+
+@dataclass
+class ParseContext:
+    """파싱 컨텍스트 (한 번 연 파일 핸들을 메타데이터와 본문 추출에 함께 사용)"""
+    file_path: str
+    handle: Any  # 파서별 문서 객체 (pdfplumber PDF, docx Document, openpyxl Workbook)
+    word_count: int = 0  # 지금까지 읽은 본문 단어 수
+    
+    @property
+    def filename(self) -> str:
+        return self.file_path.split("/")[-1]
+
+
+class StreamingChunker:
+    """원문 조각을 받는 대로 청크로 나누는 분할기
+    
+    chunk_document와 같은 규칙(문장/줄 경계에서 자르고 chunk_overlap만큼 겹침)으로 나누되, 아직
+    내보내지 않은 부분만 버퍼에 두므로 메모리 사용량이 문서 길이가 아닌 청크 크기에 비례한다.
+    청크 metadata의 start/end는 전체 원문 기준 위치이고, overlap은 본문 앞부분 중 이전 청크 본문과
+    겹치는 글자 수다 (음수면 사이에 공백만 있었음, join_chunks에서 사용).
+    """
+    
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+        """분할기 초기화"""
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._buffer = ""  # _buffer_start부터의 원문
+        self._buffer_start = 0
+        self._start = 0  # 다음 청크 시작 위치
+        self._source_starts: List[int] = []  # 버퍼에 걸친 조각의 시작 위치
+        self._sources: List[TextSegment] = []
+        self._chunk_index = 0
+        self._prev_content_end: Optional[int] = None
+    
+    def feed(self, segment: TextSegment) -> Iterator[ContentChunk]:
+        """조각 추가 (자를 위치가 정해진 청크를 바로 내보냄)"""
+        if not segment.text:
+            return
+        self._source_starts.append(self._buffer_start + len(self._buffer))
+        self._sources.append(segment)
+        self._buffer += segment.text
+        yield from self._drain(final=False)
+    
+    def finish(self) -> Iterator[ContentChunk]:
+        """남은 원문을 청크로 내보냄"""
+        yield from self._drain(final=True)
+    
+    def _drain(self, final: bool) -> Iterator[ContentChunk]:
+        text_end = self._buffer_start + len(self._buffer)
+        while self._start < text_end:
+            end = self._start + self.chunk_size
+            if end >= text_end and not final:
+                return  # 다음 조각이 와야 자를 위치를 정할 수 있음
+            
+            chunk_text = self._buffer[self._start - self._buffer_start:end - self._buffer_start]
+            
+            # 문장 경계에서 자르기
+            if end < text_end:
+                cut_point = max(chunk_text.rfind('.'), chunk_text.rfind('\n'))
+                if cut_point > self.chunk_size * 0.5:  # 최소한 절반 이상은 유지
+                    chunk_text = chunk_text[:cut_point + 1]
+            end = self._start + len(chunk_text)
+            
+            chunk = self._make_chunk(chunk_text, self._start)
+            if chunk is not None:
+                yield chunk
+            
+            if end >= text_end:
+                self._start = end
+                break
+            self._start = max(end - self.chunk_overlap, self._start + 1)
+            self._trim()
+    
+    def _make_chunk(self, chunk_text: str, start: int) -> Optional[ContentChunk]:
+        content = chunk_text.strip()
+        if not content:
+            return None
+        
+        content_start = start + len(chunk_text) - len(chunk_text.lstrip())
+        metadata = {"start": start, "end": start + len(chunk_text)}
+        if self._prev_content_end is not None:
+            metadata["overlap"] = self._prev_content_end - content_start
+        self._prev_content_end = content_start + len(content)
+        
+        # 청크 본문이 시작하는 조각의 페이지/섹션 사용
+        source = self._sources[bisect_right(self._source_starts, content_start) - 1]
+        chunk = ContentChunk(
+            content=content,
+            chunk_index=self._chunk_index,
+            page_number=source.page_number,
+            section_title=source.section_title,
+            metadata={**(source.metadata or {}), **metadata}
+        )
+        self._chunk_index += 1
+        return chunk
+    
+    def _trim(self):
+        """이미 내보낸 앞부분 정리 (버퍼 복사가 선형이 되도록 절반 이상 지났을 때만)"""
+        consumed = self._start - self._buffer_start
+        if consumed > len(self._buffer) // 2:
+            self._buffer = self._buffer[consumed:]
+            self._buffer_start = self._start
+        
+        keep = bisect_right(self._source_starts, self._start) - 1
+        if keep > 0:
+            del self._source_starts[:keep]
+            del self._sources[:keep]
+
+
+def stream_chunks(
+    segments: Iterable[TextSegment],
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200
+) -> Iterator[ContentChunk]:
+    """원문 조각 스트림을 청크 스트림으로 변환"""
+    chunker = StreamingChunker(chunk_size, chunk_overlap)
+    for segment in segments:
+        yield from chunker.feed(segment)
+    yield from chunker.finish()
+
+
+def join_chunks(chunks: Iterable[Tuple[str, Optional[Dict[str, Any]]]]) -> str:
+    """(본문, metadata) 청크들을 겹침을 빼고 이어 원문 복원 (앞뒤 공백과 겹침 정보가 없는 경계는 줄바꿈)"""
+    parts = []
+    for content, metadata in chunks:
+        overlap = (metadata or {}).get("overlap")
+        if not parts:
+            parts.append(content)
+        elif overlap is None or overlap < 0:
+            parts.append("\n" + content)
+        else:
+            parts.append(content[overlap:])
+    return "".join(parts)
+
+
 class DocumentParser(ABC):
-    """문서 파서 기본 클래스"""
+    """문서 파서 기본 클래스
+    
+    파일은 parse 한 번에 한 번만 열고, 메타데이터와 본문은 같은 파싱 컨텍스트에서 읽는다.
+    하위 클래스는 open, read_metadata, iter_segments를 구현하고, 본문은 문서 순서대로 내보낸
+    원문 조각을 StreamingChunker로 바로 청크로 나눈다. 저장 시에는 iter_chunks로 청크를 받는 대로
+    기록하므로 전체 본문을 메모리에 모으지 않는다.
+    """
+    
+    file_type: str = ""
     
     @abstractmethod
-    def parse(self, file_path: str) -> ParsedDocument:
-        """문서 파싱"""
+    def open(self, file_path: str) -> Any:
+        """파일 열기 (메타데이터와 본문 추출에 함께 쓸 문서 객체 반환)"""
         pass
     
     @abstractmethod
-    def extract_metadata(self, file_path: str) -> DocumentMetadata:
-        """메타데이터 추출"""
+    def read_metadata(self, context: ParseContext) -> DocumentMetadata:
+        """열린 문서에서 메타데이터 추출"""
+        pass
+    
+    def new_structure(self) -> Dict[str, Any]:
+        """iter_segments/iter_chunks가 채울 문서 구조"""
+        return {}
+    
+    @abstractmethod
+    def iter_segments(
+        self,
+        context: ParseContext,
+        structure: Optional[Dict[str, Any]] = None
+    ) -> Iterator[TextSegment]:
+        """열린 문서의 원문 조각을 문서 순서대로 생성 (structure가 주어지면 문서 구조를 채움)"""
         pass
     
+    def iter_chunks(
+        self,
+        context: ParseContext,
+        structure: Optional[Dict[str, Any]] = None
+    ) -> Iterator[ContentChunk]:
+        """열린 문서의 청크를 만드는 대로 생성"""
+        return self._chunk_segments(context, self.iter_segments(context, structure))
+    
+    def _chunk_segments(
+        self,
+        context: ParseContext,
+        segments: Iterable[TextSegment]
+    ) -> Iterator[ContentChunk]:
+        def counted():
+            for segment in segments:
+                context.word_count += len(segment.text.split())
+                yield segment
+        
+        return stream_chunks(counted(), settings.CHUNK_SIZE, settings.CHUNK_OVERLAP)
+    
+    def parse_context(self, context: ParseContext) -> ParsedDocument:
+        """열린 문서 파싱 (청크와 전체 본문을 함께 반환)"""
+        structure = self.new_structure()
+        parts = []
+        
+        def collected():
+            for segment in self.iter_segments(context, structure):
+                parts.append(segment.text)
+                yield segment
+        
+        chunks = list(self._chunk_segments(context, collected()))
+        metadata = self.read_metadata(context)
+        metadata.word_count = context.word_count
+        
+        return ParsedDocument(
+            filename=context.filename,
+            file_type=self.file_type,
+            metadata=metadata,
+            chunks=chunks,
+            full_text="".join(parts),
+            structure=structure
+        )
+    
+    @contextmanager
+    def open_context(self, file_path: str) -> Iterator[ParseContext]:
+        """파일을 열어 파싱 컨텍스트 생성 (끝나면 문서 객체를 닫음)"""
+        handle = self.open(file_path)
+        try:
+            yield ParseContext(file_path=file_path, handle=handle)
+        finally:
+            close = getattr(handle, "close", None)
+            if close is not None:
+                close()
+    
+    def parse(self, file_path: str) -> ParsedDocument:
+        """문서 파싱"""
+        with self.open_context(file_path) as context:
+            return self.parse_context(context)
+    
+    def parse_to_spill(self, file_path: str, spill_dir: Optional[str] = None) -> SpilledDocument:
+        """문서 파싱 (청크를 임시 파일에 기록하여 전체 청크/본문을 메모리에 모으지 않음)"""
+        with self.open_context(file_path) as context:
+            structure = self.new_structure()
+            chunk_path, chunk_count = spill_chunks(self.iter_chunks(context, structure), spill_dir)
+            metadata = self.read_metadata(context)
+            metadata.word_count = context.word_count
+        
+        return SpilledDocument(
+            filename=context.filename,
+            file_type=self.file_type,
+            metadata=metadata,
+            structure=structure,
+            chunk_path=chunk_path,
+            chunk_count=chunk_count
+        )
+    
+    def extract_metadata(self, file_path: str) -> DocumentMetadata:
+        """메타데이터만 추출"""
+        try:
+            with self.open_context(file_path) as context:
+                return self.read_metadata(context)
+        except Exception as e:
+            print(f"메타데이터 추출 오류: {e}")
+            return DocumentMetadata()
+    
     def chunk_document(
         self,
         text: str,
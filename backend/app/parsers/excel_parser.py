@@ -3,66 +3,163 @@ Excel 문서 파서
 """
 from openpyxl import load_workbook
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, Iterator, List, Optional
 
-from app.parsers.base import DocumentParser, ParsedDocument, DocumentMetadata, ContentChunk
+from app.core.config import settings
+from app.parsers.base import DocumentParser, ParsedDocument, DocumentMetadata, ContentChunk, ParseContext, TextSegment
 
 
 class ExcelParser(DocumentParser):
-    """Excel 문서 파서"""
+    """Excel 문서 파서
     
-    def parse(self, file_path: str) -> ParsedDocument:
-        """Excel 문서 파싱"""
-        wb = load_workbook(file_path, data_only=True)
-        
-        full_text = ""
-        chunks = []
-        structure = {
+    통합 문서를 읽기 전용 모드로 열어 행을 순서대로 읽고, 행 묶음 단위 조각(시트 이름과 행 범위
+    포함)을 만들어 하나씩 청크로 내보낸다. 한 번에 한 묶음만 메모리에 두므로 행 수와 관계없이 사용량이 일정하다.
+    """
+    
+    file_type = "xlsx"
+    
+    def __init__(self, max_rows: Optional[int] = None, max_chars: Optional[int] = None):
+        """Excel 파서 초기화 (미지정 시 EXCEL_CHUNK_MAX_ROWS, CHUNK_SIZE 사용)"""
+        self.max_rows = max_rows or settings.EXCEL_CHUNK_MAX_ROWS
+        self.max_chars = max_chars or settings.CHUNK_SIZE
+    
+    def open(self, file_path: str):
+        """Excel 통합 문서 열기 (읽기 전용 스트리밍 모드, 수식 대신 계산된 값 사용)"""
+        return load_workbook(file_path, read_only=True, data_only=True)
+    
+    def new_structure(self) -> Dict[str, Any]:
+        """Excel 문서 구조"""
+        return {
             "sheets": [],
             "tables": []
         }
-        
-        # 시트별 처리
-        for sheet_name in wb.sheetnames:
-            sheet = wb[sheet_name]
-            sheet_text = f"시트: {sheet_name}\n"
-            
-            # 셀 데이터 추출
-            for row in sheet.iter_rows(values_only=True):
-                row_text = " | ".join(str(cell) if cell is not None else "" for cell in row)
-                if row_text.strip():
-                    sheet_text += row_text + "\n"
-            
-            full_text += sheet_text + "\n"
-            structure["sheets"].append({
-                "name": sheet_name,
-                "max_row": sheet.max_row,
-                "max_column": sheet.max_column
-            })
+    
+    def parse_context(self, context: ParseContext) -> ParsedDocument:
+        """Excel 문서 파싱 (행 묶음 청크는 겹치지 않으므로 본문은 청크를 이어 만듦)"""
+        structure = self.new_structure()
+        chunks = list(self.iter_chunks(context, structure))
         
         # 메타데이터 추출
-        metadata = self.extract_metadata(file_path)
-        metadata.word_count = len(full_text.split())
-        
-        # 청크 분할
-        chunks = self.chunk_document(full_text)
+        metadata = self.read_metadata(context)
+        metadata.word_count = context.word_count
         
         return ParsedDocument(
-            filename=file_path.split("/")[-1],
-            file_type="xlsx",
+            filename=context.filename,
+            file_type=self.file_type,
             metadata=metadata,
             chunks=chunks,
-            full_text=full_text,
+            full_text="\n".join(chunk.content for chunk in chunks),
             structure=structure
         )
     
-    def extract_metadata(self, file_path: str) -> DocumentMetadata:
+    def iter_segments(
+        self,
+        context: ParseContext,
+        structure: Optional[Dict[str, Any]] = None
+    ) -> Iterator[TextSegment]:
+        """시트 행을 읽으며 행 묶음 조각 생성 (structure가 주어지면 시트 정보를 채움)
+        
+        각 조각은 "시트: 이름" 줄로 시작하고, 시트의 두 번째 묶음부터는 첫 행(머리글)을 다시 붙여
+        조각만으로도 열의 의미를 알 수 있게 한다. 조각의 metadata에 시트 이름과 행 범위를 담는다.
+        """
+        for sheet in context.handle.worksheets:
+            header = None
+            header_row = 0
+            rows: List[str] = []
+            size = 0
+            first_row = last_row = 0
+            row_count = 0
+            max_column = 0
+            
+            for row_number, row in enumerate(sheet.iter_rows(values_only=True), 1):
+                cells = ["" if cell is None else str(cell) for cell in row]
+                if not any(cell.strip() for cell in cells):
+                    continue
+                row_text = " | ".join(cells)
+                row_count += 1
+                context.word_count += sum(len(cell.split()) for cell in cells)
+                max_column = max(max_column, len(cells))
+                
+                # 묶음이 가득 차면 내보내고 새 묶음 시작
+                if rows and (len(rows) >= self.max_rows or size + len(row_text) + 1 > self.max_chars):
+                    yield self._row_segment(
+                        sheet.title, header if header_row < first_row else None,
+                        rows, first_row, last_row
+                    )
+                    rows, size = [], 0
+                
+                if header is None:
+                    header, header_row = row_text, row_number
+                if not rows:
+                    first_row = row_number
+                rows.append(row_text)
+                size += len(row_text) + 1
+                last_row = row_number
+            
+            if rows:
+                yield self._row_segment(
+                    sheet.title, header if header_row < first_row else None,
+                    rows, first_row, last_row
+                )
+            
+            if structure is not None:
+                structure["sheets"].append({
+                    "name": sheet.title,
+                    "max_row": last_row,
+                    "max_column": max_column,
+                    "row_count": row_count
+                })
+    
+    def iter_chunks(
+        self,
+        context: ParseContext,
+        structure: Optional[Dict[str, Any]] = None
+    ) -> Iterator[ContentChunk]:
+        """행 묶음 조각을 그대로 청크로 변환
+        
+        행 묶음은 이미 CHUNK_SIZE 이하이고 행 중간에서 자르면 안 되므로 겹침 없이 한 조각을 한 청크로
+        만든다. 청크의 start/end는 청크 본문을 줄바꿈으로 이은 전체 텍스트 기준 위치다.
+        """
+        offset = 0
+        for chunk_index, segment in enumerate(self.iter_segments(context, structure)):
+            end = offset + len(segment.text)
+            yield ContentChunk(
+                content=segment.text,
+                chunk_index=chunk_index,
+                section_title=segment.section_title,
+                metadata={**segment.metadata, "start": offset, "end": end}
+            )
+            offset = end + 1
+    
+    def _row_segment(
+        self,
+        sheet_name: str,
+        header: Optional[str],
+        rows: List[str],
+        first_row: int,
+        last_row: int
+    ) -> TextSegment:
+        """행 묶음을 조각으로 변환 (header: 시트 첫 묶음이 아니면 다시 붙일 머리글 행)"""
+        lines = [f"시트: {sheet_name}"]
+        if header is not None:
+            lines.append(header)
+        lines.extend(rows)
+        return TextSegment(
+            text="\n".join(lines),
+            section_title=sheet_name,
+            metadata={
+                "sheet": sheet_name,
+                "row_start": first_row,
+                "row_end": last_row
+            }
+        )
+    
+    def read_metadata(self, context: ParseContext) -> DocumentMetadata:
         """Excel 메타데이터 추출"""
         metadata = DocumentMetadata()
         
         try:
-            wb = load_workbook(file_path)
-            props = wb.properties
+            props = context.handle.properties
             
             metadata.title = props.title or ""
             metadata.author = props.creator or ""
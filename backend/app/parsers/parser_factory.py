@@ -4,7 +4,7 @@
 from pathlib import Path
 from typing import Optional
 
-from app.parsers.base import DocumentParser
+from app.parsers.base import DocumentParser, SpilledDocument
 from app.parsers.pdf_parser import PDFParser
 from app.parsers.word_parser import WordParser
 from app.parsers.excel_parser import ExcelParser
@@ -38,3 +38,10 @@ class ParserFactory:
         file_ext = Path(file_path).suffix.lower()
         return file_ext in cls._parsers
 
+
+def parse_file_to_spill(file_path: str, spill_dir: Optional[str] = None) -> SpilledDocument:
+    """파일 파싱 후 청크를 임시 파일에 기록 (작업 프로세스에서 실행할 수 있도록 모듈 함수로 둠)"""
+    parser = ParserFactory.get_parser(file_path)
+    if parser is None:
+        raise ValueError(f"지원하지 않는 파일 형식입니다: {Path(file_path).suffix}")
+    return parser.parse_to_spill(file_path, spill_dir)
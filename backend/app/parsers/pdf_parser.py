@@ -1,94 +1,206 @@
 """
 PDF 문서 파서
 """
+import multiprocessing
+import threading
 import pdfplumber
-from typing import List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 
-from app.parsers.base import DocumentParser, ParsedDocument, DocumentMetadata, ContentChunk
+from app.core.config import settings
+from app.parsers.base import DocumentParser, DocumentMetadata, ParseContext, TextSegment
+
+
+def page_ranges(page_count: int, shard_count: int) -> List[Tuple[int, int]]:
+    """페이지를 연속된 범위로 분할 (1부터 시작, 끝 페이지 포함)"""
+    shard_count = max(1, min(shard_count, page_count))
+    size, extra = divmod(page_count, shard_count)
+    ranges = []
+    first = 1
+    for index in range(shard_count):
+        last = first + size - 1 + (1 if index < extra else 0)
+        ranges.append((first, last))
+        first = last + 1
+    return ranges
+
+
+# 페이지 추출 프로세스 풀 (작업 수별로 한 번 만들어 모든 파싱이 재사용)
+_page_pools: Dict[int, ProcessPoolExecutor] = {}
+_page_pools_lock = threading.Lock()
+
+
+def _page_pool(max_workers: int) -> ProcessPoolExecutor:
+    """공유 페이지 추출 프로세스 풀"""
+    with _page_pools_lock:
+        pool = _page_pools.get(max_workers)
+        if pool is None:
+            # 포크된 자식이 부모의 모델/스레드 상태를 물려받지 않도록 spawn 사용
+            pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            _page_pools[max_workers] = pool
+        return pool
+
+
+def _discard_page_pool(pool: ProcessPoolExecutor):
+    """비정상 종료된 풀을 버려 다음 파싱에서 새로 만들게 함"""
+    with _page_pools_lock:
+        for max_workers, current in list(_page_pools.items()):
+            if current is pool:
+                del _page_pools[max_workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def extract_pages(
+    file_path: str,
+    first_page: int = 1,
+    last_page: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """페이지 범위의 텍스트와 표 추출 (last_page 미지정 시 끝까지, 작업 프로세스에서 실행할 수 있도록 모듈 함수로 둠)"""
+    page_numbers = None if last_page is None else list(range(first_page, last_page + 1))
+    with pdfplumber.open(file_path, pages=page_numbers) as pdf:
+        return list(_iter_page_contents(pdf.pages))
+
+
+def _iter_page_contents(pdf_pages) -> Iterator[Dict[str, Any]]:
+    """pdfplumber 페이지들의 텍스트와 표 추출"""
+    for page in pdf_pages:
+        yield {
+            "page_number": page.page_number,
+            "text": page.extract_text(),
+            "tables": [table for table in page.extract_tables() or [] if table]
+        }
+        # 페이지별 파싱 캐시를 비워 긴 범위에서도 메모리가 늘지 않도록 함
+        page.flush_cache()
 
 
 class PDFParser(DocumentParser):
-    """PDF 문서 파서"""
+    """PDF 문서 파서
+    
+    페이지가 많은 문서는 페이지 범위를 여러 프로세스에 나누어 추출하고 페이지 순서대로
+    내보낸다. pdfplumber 추출은 CPU만 사용하고 GIL을 놓지 않으므로 스레드가 아닌 프로세스를
+    사용한다. 프로세스 풀은 모듈 단위로 한 번 만들어 재사용하고, 문서 처리 워커의 파싱
+    프로세스처럼 이미 작업 프로세스 안에서 실행 중이면 프로세스를 더 만들지 않고 순차 추출한다.
+    """
+    
+    file_type = "pdf"
+    
+    def __init__(self, max_workers: Optional[int] = None, parallel_min_pages: Optional[int] = None):
+        """PDF 파서 초기화 (미지정 시 PDF_PARSE_WORKERS, PDF_PARALLEL_MIN_PAGES 사용)"""
+        self.max_workers = settings.PDF_PARSE_WORKERS if max_workers is None else max_workers
+        self.parallel_min_pages = (
+            settings.PDF_PARALLEL_MIN_PAGES if parallel_min_pages is None else parallel_min_pages
+        )
+    
+    def open(self, file_path: str) -> pdfplumber.PDF:
+        """PDF 열기"""
+        return pdfplumber.open(file_path)
     
-    def parse(self, file_path: str) -> ParsedDocument:
-        """PDF 문서 파싱"""
-        full_text = ""
-        chunks = []
-        structure = {
+    def new_structure(self) -> Dict[str, Any]:
+        """PDF 문서 구조"""
+        return {
             "pages": [],
             "tables": [],
             "images": []
         }
+    
+    def iter_segments(
+        self,
+        context: ParseContext,
+        structure: Optional[Dict[str, Any]] = None
+    ) -> Iterator[TextSegment]:
+        """페이지 순서대로 페이지 본문과 표를 원문 조각으로 생성"""
+        structure = self.new_structure() if structure is None else structure
+        offset = 0
         
-        with pdfplumber.open(file_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                # 텍스트 추출
-                page_text = page.extract_text()
-                if page_text:
-                    full_text += page_text + "\n"
-                    structure["pages"].append({
-                        "page_number": page_num,
-                        "text_length": len(page_text)
-                    })
-                
-                # 표 추출
-                tables = page.extract_tables()
-                if tables:
-                    for table_idx, table in enumerate(tables):
-                        table_text = self._table_to_text(table)
-                        full_text += table_text + "\n"
-                        structure["tables"].append({
-                            "page_number": page_num,
-                            "table_index": table_idx,
-                            "rows": len(table)
-                        })
-        
-        # 메타데이터 추출
-        metadata = self.extract_metadata(file_path)
-        metadata.page_count = len(structure["pages"])
-        metadata.word_count = len(full_text.split())
+        for page in self._iter_pages(context, len(context.handle.pages)):
+            page_num = page["page_number"]
+            
+            # 텍스트
+            page_text = page["text"]
+            if page_text:
+                structure["pages"].append({
+                    "page_number": page_num,
+                    "text_length": len(page_text),
+                    "start": offset,
+                    "end": offset + len(page_text)
+                })
+                offset += len(page_text) + 1
+                yield TextSegment(text=page_text + "\n", page_number=page_num)
+            
+            # 표
+            for table_idx, table in enumerate(page["tables"]):
+                table_text = self._table_to_text(table)
+                structure["tables"].append({
+                    "page_number": page_num,
+                    "table_index": table_idx,
+                    "rows": len(table)
+                })
+                offset += len(table_text) + 1
+                yield TextSegment(text=table_text + "\n", page_number=page_num)
+    
+    def _iter_pages(self, context: ParseContext, page_count: int) -> Iterator[Dict[str, Any]]:
+        """페이지 순서대로 추출 결과 생성 (페이지가 많으면 여러 프로세스로 나누어 추출)"""
+        in_worker_process = multiprocessing.parent_process() is not None
+        if in_worker_process or self.max_workers <= 1 or page_count < max(self.parallel_min_pages, 2):
+            # 이미 연 문서에서 바로 추출
+            yield from _iter_page_contents(context.handle.pages)
+            return
         
-        # 청크 분할
-        chunks = self.chunk_document(full_text)
+        # 페이지마다 추출 시간이 달라 작업 수보다 잘게 나누어 고르게 분배하고,
+        # 결과를 기다리는 범위 수를 제한하여 추출 결과가 메모리에 쌓이지 않게 함
+        ranges = page_ranges(page_count, self.max_workers * 4)
+        window = self.max_workers * 2
+        next_page = 1
         
-        # 페이지 번호 추가
-        current_page = 1
-        chars_per_page = len(full_text) // metadata.page_count if metadata.page_count > 0 else len(full_text)
-        for chunk in chunks:
-            chunk.page_number = min(
-                current_page,
-                int(chunk.metadata.get("start", 0) // chars_per_page) + 1
-            )
+        def received(future):
+            nonlocal next_page
+            for page in future.result():
+                next_page = page["page_number"] + 1
+                yield page
         
-        return ParsedDocument(
-            filename=file_path.split("/")[-1],
-            file_type="pdf",
-            metadata=metadata,
-            chunks=chunks,
-            full_text=full_text,
-            structure=structure
-        )
+        executor = _page_pool(self.max_workers)
+        pending = deque()
+        try:
+            # 제출 순서대로 결과를 받아 페이지 순서 유지
+            for first, last in ranges:
+                pending.append(executor.submit(extract_pages, context.file_path, first, last))
+                if len(pending) >= window:
+                    yield from received(pending.popleft())
+            while pending:
+                yield from received(pending.popleft())
+        except (BrokenProcessPool, OSError) as e:
+            print(f"PDF 병렬 추출 실패, 남은 페이지는 순차 추출로 전환: {e}")
+            if isinstance(e, BrokenProcessPool):
+                _discard_page_pool(executor)
+            yield from _iter_page_contents(context.handle.pages[next_page - 1:])
+        finally:
+            # 공유 풀이므로 닫지 않고 이 문서의 남은 작업만 취소
+            for future in pending:
+                future.cancel()
     
-    def extract_metadata(self, file_path: str) -> DocumentMetadata:
+    def read_metadata(self, context: ParseContext) -> DocumentMetadata:
         """PDF 메타데이터 추출"""
         metadata = DocumentMetadata()
+        pdf = context.handle
+        metadata.page_count = len(pdf.pages)
         
+        # PDF 메타데이터 추출 시도
         try:
-            with pdfplumber.open(file_path) as pdf:
-                metadata.page_count = len(pdf.pages)
-                
-                # PDF 메타데이터 추출 시도
-                if hasattr(pdf, 'metadata') and pdf.metadata:
-                    metadata.title = pdf.metadata.get('Title', '')
-                    metadata.author = pdf.metadata.get('Author', '')
-                    if pdf.metadata.get('CreationDate'):
-                        try:
-                            metadata.created_date = datetime.fromisoformat(
-                                pdf.metadata['CreationDate'].replace('D:', '')
-                            )
-                        except:
-                            pass
+            if hasattr(pdf, 'metadata') and pdf.metadata:
+                metadata.title = pdf.metadata.get('Title', '')
+                metadata.author = pdf.metadata.get('Author', '')
+                if pdf.metadata.get('CreationDate'):
+                    try:
+                        metadata.created_date = datetime.fromisoformat(
+                            pdf.metadata['CreationDate'].replace('D:', '')
+                        )
+                    except:
+                        pass
         except Exception as e:
             print(f"메타데이터 추출 오류: {e}")
         
@@ -3,26 +3,36 @@ Word 문서 파서
 """
 from docx import Document
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, Iterator, Optional
 
-from app.parsers.base import DocumentParser, ParsedDocument, DocumentMetadata, ContentChunk
+from app.parsers.base import DocumentParser, DocumentMetadata, ParseContext, TextSegment
 
 
 class WordParser(DocumentParser):
     """Word 문서 파서"""
     
-    def parse(self, file_path: str) -> ParsedDocument:
-        """Word 문서 파싱"""
-        doc = Document(file_path)
-        
-        full_text = ""
-        chunks = []
-        structure = {
+    file_type = "docx"
+    
+    def open(self, file_path: str):
+        """Word 문서 열기"""
+        return Document(file_path)
+    
+    def new_structure(self) -> Dict[str, Any]:
+        """Word 문서 구조"""
+        return {
             "paragraphs": [],
             "tables": [],
             "sections": []
         }
-        
+    
+    def iter_segments(
+        self,
+        context: ParseContext,
+        structure: Optional[Dict[str, Any]] = None
+    ) -> Iterator[TextSegment]:
+        """본문 단락(제목 제외)과 표를 원문 조각으로 생성"""
+        doc = context.handle
+        structure = self.new_structure() if structure is None else structure
         current_section = ""
         
         # 단락 추출
@@ -39,10 +49,11 @@ class WordParser(DocumentParser):
                     "level": para.style.name.replace('Heading ', '')
                 })
             else:
-                full_text += text + "\n"
+                yield TextSegment(text=text + "\n", section_title=current_section)
             
+            # 본문은 청크에 있으므로 구조에는 길이만 기록
             structure["paragraphs"].append({
-                "text": text,
+                "length": len(text),
                 "style": para.style.name,
                 "section": current_section
             })
@@ -50,39 +61,18 @@ class WordParser(DocumentParser):
         # 표 추출
         for table_idx, table in enumerate(doc.tables):
             table_text = self._table_to_text(table)
-            full_text += table_text + "\n"
             structure["tables"].append({
                 "table_index": table_idx,
                 "rows": len(table.rows)
             })
-        
-        # 메타데이터 추출
-        metadata = self.extract_metadata(file_path)
-        metadata.word_count = len(full_text.split())
-        
-        # 청크 분할
-        chunks = self.chunk_document(full_text)
-        
-        # 섹션 정보 추가
-        for chunk in chunks:
-            chunk.section_title = current_section
-        
-        return ParsedDocument(
-            filename=file_path.split("/")[-1],
-            file_type="docx",
-            metadata=metadata,
-            chunks=chunks,
-            full_text=full_text,
-            structure=structure
-        )
+            yield TextSegment(text=table_text + "\n")
     
-    def extract_metadata(self, file_path: str) -> DocumentMetadata:
+    def read_metadata(self, context: ParseContext) -> DocumentMetadata:
         """Word 메타데이터 추출"""
         metadata = DocumentMetadata()
         
         try:
-            doc = Document(file_path)
-            core_props = doc.core_properties
+            core_props = context.handle.core_properties
             
             metadata.title = core_props.title or ""
             metadata.author = core_props.author or ""
@@ -1,26 +1,34 @@
 """
 문서 서비스
 """
-from typing import List, Optional
+from typing import Iterable, List, Optional, Union
 from sqlalchemy.orm import Session
 import os
 import shutil
 from pathlib import Path
 
-from app.models.database import Document, DocumentChunk, User
+from app.models.database import Document, DocumentChunk, DocumentSummary, User
 from app.parsers.parser_factory import ParserFactory
-from app.parsers.base import ParsedDocument
-from app.ai.rag_engine import RAGSearchEngine
+from app.parsers.base import ContentChunk, ParsedDocument, SpilledDocument
+from app.ai.rag_engine import RAGSearchEngine, get_rag_engine
+from app.services.permission_service import invalidate_permission_cache
 from app.core.config import settings
 
 
 class DocumentService:
     """문서 관리 서비스"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, rag_engine: Optional[RAGSearchEngine] = None):
         """문서 서비스 초기화"""
         self.db = db
-        self.rag_engine = RAGSearchEngine()
+        self._rag_engine = rag_engine
+    
+    @property
+    def rag_engine(self) -> RAGSearchEngine:
+        """RAG 엔진 (미주입 시 프로세스 공유 엔진 사용)"""
+        if self._rag_engine is None:
+            self._rag_engine = get_rag_engine()
+        return self._rag_engine
     
     def upload_document(
         self,
@@ -51,11 +59,20 @@ class DocumentService:
         self.db.add(document)
         self.db.commit()
         self.db.refresh(document)
+        invalidate_permission_cache(user_id)
         
         return document
     
-    def parse_document(self, document_id: str) -> Document:
-        """문서 파싱"""
+    def parse_document(
+        self,
+        document_id: str,
+        parsed_doc: Optional[Union[ParsedDocument, SpilledDocument]] = None
+    ) -> Document:
+        """문서 파싱 (parsed_doc: 작업 프로세스에서 미리 파싱한 결과, 청크 파일이면 읽는 대로 저장)
+        
+        parsed_doc이 없으면 파서가 만드는 청크를 받는 대로 묶음 단위로 저장하므로, 전체 본문이나
+        청크 목록을 메모리에 모으지 않는다. 본문은 청크에만 저장한다.
+        """
         document = self.db.query(Document).filter(Document.id == document_id).first()
         if not document:
             raise ValueError("문서를 찾을 수 없습니다.")
@@ -63,48 +80,78 @@ class DocumentService:
         if not ParserFactory.is_supported(document.file_path):
             raise ValueError(f"지원하지 않는 파일 형식입니다: {document.file_type}")
         
-        # 파서로 문서 파싱
-        parser = ParserFactory.get_parser(document.file_path)
-        parsed_doc: ParsedDocument = parser.parse(document.file_path)
+        try:
+            # 본문이 바뀌었을 수 있으므로 저장된 요약 삭제
+            self.db.query(DocumentSummary).filter(
+                DocumentSummary.document_id == document.id
+            ).delete(synchronize_session=False)
+            
+            # 청크 저장 (다시 파싱하면 이전 청크를 교체)
+            self.db.query(DocumentChunk).filter(
+                DocumentChunk.document_id == document.id
+            ).delete(synchronize_session=False)
+            
+            if parsed_doc is not None:
+                metadata, structure = parsed_doc.metadata, parsed_doc.structure
+                if isinstance(parsed_doc, SpilledDocument):
+                    self._insert_chunks(document.id, parsed_doc.iter_chunks())
+                else:
+                    self._insert_chunks(document.id, parsed_doc.chunks)
+            else:
+                # 파서로 문서를 파싱하며 청크 저장
+                parser = ParserFactory.get_parser(document.file_path)
+                with parser.open_context(document.file_path) as context:
+                    structure = parser.new_structure()
+                    self._insert_chunks(document.id, parser.iter_chunks(context, structure))
+                    metadata = parser.read_metadata(context)
+                    metadata.word_count = context.word_count
+        except Exception:
+            self.db.rollback()
+            raise
         
         # 파싱 결과 저장
-        document.parsed_content = {
-            "full_text": parsed_doc.full_text,
-            "structure": parsed_doc.structure,
-            "metadata": {
-                "title": parsed_doc.metadata.title,
-                "author": parsed_doc.metadata.author,
-                "page_count": parsed_doc.metadata.page_count,
-                "word_count": parsed_doc.metadata.word_count
-            }
+        doc_metadata = {
+            "title": metadata.title,
+            "author": metadata.author,
+            "page_count": metadata.page_count,
+            "word_count": metadata.word_count
         }
-        document.doc_metadata = {
-            "title": parsed_doc.metadata.title,
-            "author": parsed_doc.metadata.author,
-            "page_count": parsed_doc.metadata.page_count,
-            "word_count": parsed_doc.metadata.word_count
+        document.parsed_content = {
+            "structure": structure,
+            "metadata": doc_metadata
         }
+        document.doc_metadata = dict(doc_metadata)
         document.is_parsed = True
         
-        # 청크 저장
-        for chunk in parsed_doc.chunks:
-            db_chunk = DocumentChunk(
-                document_id=document.id,
-                chunk_index=chunk.chunk_index,
-                content=chunk.content,
-                chunk_metadata={
-                    "page_number": chunk.page_number,
-                    "section_title": chunk.section_title,
-                    **(chunk.metadata if hasattr(chunk, 'metadata') and chunk.metadata else {})
-                }
-            )
-            self.db.add(db_chunk)
-        
         self.db.commit()
         self.db.refresh(document)
         
         return document
     
+    def _insert_chunks(self, document_id: str, chunks: Iterable[ContentChunk]) -> int:
+        """청크를 CHUNK_INSERT_BATCH_SIZE개씩 묶어 저장 (세션에 객체를 남기지 않음)"""
+        batch = []
+        count = 0
+        for chunk in chunks:
+            batch.append({
+                "document_id": document_id,
+                "chunk_index": chunk.chunk_index,
+                "content": chunk.content,
+                "chunk_metadata": {
+                    "page_number": chunk.page_number,
+                    "section_title": chunk.section_title,
+                    **(chunk.metadata or {})
+                }
+            })
+            if len(batch) >= settings.CHUNK_INSERT_BATCH_SIZE:
+                self.db.bulk_insert_mappings(DocumentChunk, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            self.db.bulk_insert_mappings(DocumentChunk, batch)
+            count += len(batch)
+        return count
+    
     def index_document(self, document_id: str) -> Document:
         """문서 인덱싱 (벡터화)"""
         document = self.db.query(Document).filter(Document.id == document_id).first()
@@ -125,6 +172,7 @@ class DocumentService:
         # RAG 엔진에 인덱싱
         chunk_data = [
             {
+                "id": chunk.id,
                 "content": chunk.content,
                 "chunk_index": chunk.chunk_index,
                 "metadata": chunk.chunk_metadata or {}
@@ -132,7 +180,11 @@ class DocumentService:
             for chunk in chunks
         ]
         
-        vector_ids = self.rag_engine.index_document(document_id, chunk_data)
+        vector_ids = self.rag_engine.index_document(
+            document_id,
+            chunk_data,
+            document_metadata={"file_type": document.file_type}
+        )
         
         # 벡터 ID 저장
         for chunk, vector_id in zip(chunks, vector_ids):
@@ -168,6 +220,10 @@ class DocumentService:
         if not document:
             return False
         
+        # 벡터 삭제 (인덱싱된 문서만)
+        if document.is_indexed:
+            self.rag_engine.delete_document(document_id)
+        
         # 파일 삭제
         if os.path.exists(document.file_path):
             os.remove(document.file_path)
@@ -175,6 +231,7 @@ class DocumentService:
         # 데이터베이스에서 삭제 (관계로 인해 청크도 자동 삭제)
         self.db.delete(document)
         self.db.commit()
+        invalidate_permission_cache()
         
         return True
 
@@ -0,0 +1,126 @@
+"""
+문서 처리 작업 큐 서비스
+"""
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy.orm import Session
+
+from app.models.database import Document, IngestionJob
+from app.core.config import settings
+
+
+# 작업 종류
+JOB_PARSE = "parse"
+JOB_INDEX = "index"
+JOB_PIPELINE = "pipeline"  # 파싱 후 인덱싱
+JOB_DELETE = "delete"  # 문서와 벡터 삭제 (읽기 전용 프로세스가 기록 프로세스에 넘기는 작업)
+JOB_TYPES = (JOB_PARSE, JOB_INDEX, JOB_PIPELINE, JOB_DELETE)
+
+# 작업 상태
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+ACTIVE_STATUSES = (STATUS_PENDING, STATUS_RUNNING)
+
+
+class IngestionService:
+    """문서 파싱/인덱싱 작업 등록, 조회, 취소"""
+    
+    def __init__(self, db: Session):
+        """작업 큐 서비스 초기화"""
+        self.db = db
+    
+    def enqueue(
+        self,
+        document_id: str,
+        job_type: str = JOB_PIPELINE,
+        user_id: Optional[str] = None
+    ) -> IngestionJob:
+        """작업 등록 (같은 문서에 같은 종류의 대기/실행 중 작업이 있으면 그 작업 반환)"""
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"지원하지 않는 작업 종류입니다: {job_type}")
+        
+        document = self.db.query(Document).filter(Document.id == document_id).first()
+        if not document:
+            raise ValueError("문서를 찾을 수 없습니다.")
+        
+        existing = self.db.query(IngestionJob).filter(
+            IngestionJob.document_id == document_id,
+            IngestionJob.job_type == job_type,
+            IngestionJob.status.in_(ACTIVE_STATUSES),
+            IngestionJob.cancel_requested == False
+        ).first()
+        if existing:
+            return existing
+        
+        job = IngestionJob(
+            document_id=document_id,
+            job_type=job_type,
+            status=STATUS_PENDING,
+            progress=0,
+            attempts=0,
+            max_attempts=settings.INGESTION_MAX_ATTEMPTS,
+            created_by=user_id,
+            run_after=datetime.utcnow()
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+    
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        """작업 조회"""
+        return self.db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+    
+    def list_jobs(
+        self,
+        document_id: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 50
+    ) -> List[IngestionJob]:
+        """작업 목록 조회 (최근 순)"""
+        query = self.db.query(IngestionJob)
+        if document_id:
+            query = query.filter(IngestionJob.document_id == document_id)
+        if status:
+            query = query.filter(IngestionJob.status == status)
+        return query.order_by(IngestionJob.created_at.desc()).limit(limit).all()
+    
+    def cancel(self, job_id: str) -> IngestionJob:
+        """작업 취소 (대기 중이면 바로 취소, 실행 중이면 다음 단계 전에 중단)"""
+        job = self.get_job(job_id)
+        if not job:
+            raise ValueError("작업을 찾을 수 없습니다.")
+        if job.status not in ACTIVE_STATUSES:
+            raise ValueError(f"이미 종료된 작업입니다: {job.status}")
+        
+        if job.status == STATUS_PENDING:
+            job.status = STATUS_CANCELLED
+            job.completed_at = datetime.utcnow()
+        job.cancel_requested = True
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+    
+    def retry(self, job_id: str) -> IngestionJob:
+        """실패하거나 취소된 작업을 다시 대기 상태로"""
+        job = self.get_job(job_id)
+        if not job:
+            raise ValueError("작업을 찾을 수 없습니다.")
+        if job.status not in (STATUS_FAILED, STATUS_CANCELLED):
+            raise ValueError(f"실패하거나 취소된 작업만 다시 실행할 수 있습니다: {job.status}")
+        
+        job.status = STATUS_PENDING
+        job.stage = None
+        job.progress = 0
+        job.attempts = 0
+        job.cancel_requested = False
+        job.error_message = None
+        job.run_after = datetime.utcnow()
+        job.started_at = None
+        job.completed_at = None
+        self.db.commit()
+        self.db.refresh(job)
+        return job
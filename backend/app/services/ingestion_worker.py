@@ -0,0 +1,415 @@
+"""
+문서 처리 작업 워커
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.ai.rag_engine import get_rag_engine
+from app.models.database import Document, IngestionJob
+from app.parsers.base import SpilledDocument
+from app.parsers.parser_factory import parse_file_to_spill
+from app.services.document_service import DocumentService
+from app.services.ingestion_service import (
+    JOB_DELETE, JOB_INDEX, JOB_PARSE, JOB_PIPELINE,
+    STATUS_CANCELLED, STATUS_COMPLETED, STATUS_FAILED, STATUS_PENDING, STATUS_RUNNING
+)
+
+
+class JobCancelled(Exception):
+    """작업 취소 요청"""
+
+
+class IngestionWorker:
+    """DB 작업 큐의 파싱/인덱싱 작업을 처리하는 워커
+    
+    CPU를 많이 쓰는 파싱은 프로세스 풀에서, 임베딩과 DB 기록은 단일 작업 스레드에서,
+    작업 상태 조회/갱신은 별도의 큐 스레드에서 실행하여 이벤트 루프를 막지 않는다(큐 스레드를
+    따로 두어 긴 인덱싱 중에도 확인 시각이 갱신된다). 작업은 상태 조건부 UPDATE로 가져가므로 여러
+    워커 프로세스가 같은 큐를 나누어 처리할 수 있고, 실행 중 작업의 확인 시각이
+    INGESTION_JOB_LEASE_SECONDS보다 오래되면 중단된 것으로 보고 다시 실행한다.
+    벡터 저장소가 읽기 전용인 프로세스(다른 프로세스가 기록 잠금을 가짐)에서는 작업을
+    가져가지 않고, 잠금을 넘겨받으면 그때부터 처리한다.
+    실패한 작업은 대기 시간을 두 배씩 늘리며 max_attempts까지 재시도한다.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        rag_engine=None,
+        concurrency: Optional[int] = None,
+        parse_processes: Optional[int] = None,
+        poll_interval: Optional[float] = None
+    ):
+        """워커 초기화 (rag_engine 미지정 시 프로세스 공유 엔진 사용)"""
+        self.session_factory = session_factory
+        self.rag_engine = rag_engine
+        self.concurrency = concurrency or settings.INGESTION_CONCURRENCY
+        self.parse_processes = (
+            settings.INGESTION_PARSE_PROCESSES if parse_processes is None else parse_processes
+        )
+        self.poll_interval = poll_interval or settings.INGESTION_POLL_INTERVAL
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        self._index_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-index")
+        self._queue_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-queue")
+        self._active: Dict[str, asyncio.Task] = {}
+        self._background = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+    
+    @contextmanager
+    def _session(self):
+        db = self.session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    def start(self):
+        """작업 처리 루프 시작 (실행 중인 이벤트 루프에서 호출)"""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+    
+    def notify(self):
+        """새 작업 등록 알림 (다음 확인 주기를 기다리지 않고 바로 처리, 스레드 안전)"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+    
+    async def _run(self):
+        """대기 작업을 가져와 동시 처리 수만큼 실행"""
+        while True:
+            try:
+                await self._in_queue_thread(self._heartbeat, list(self._active))
+                while len(self._active) < self.concurrency and self._can_write():
+                    job_id = await self._claim(set(self._active))
+                    if job_id is None:
+                        break
+                    task = self._loop.create_task(self._process(job_id))
+                    self._active[job_id] = task
+                    task.add_done_callback(lambda _, job_id=job_id: self._on_done(job_id))
+            except Exception as e:
+                print(f"작업 큐 확인 오류: {e}")
+            
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+    
+    def _on_done(self, job_id: str):
+        self._active.pop(job_id, None)
+        self._wake.set()
+    
+    async def run_pending(self):
+        """대기 작업을 모두 처리할 때까지 실행 (시작하지 않은 워커용, 스크립트/테스트)"""
+        self._loop = asyncio.get_running_loop()
+        while self._can_write():
+            job_id = await self._claim(set())
+            if job_id is None:
+                return
+            await self._process(job_id)
+    
+    def _can_write(self) -> bool:
+        """벡터 저장소 기록 잠금을 가진 프로세스인지 여부 (읽기 전용이면 작업을 가져가지 않음)"""
+        engine = self.rag_engine if self.rag_engine is not None else get_rag_engine()
+        return not getattr(engine, "read_only", False)
+    
+    async def _claim(self, active: Set[str]) -> Optional[str]:
+        """큐 스레드에서 작업 하나를 가져옴 (기다리는 중에 워커가 멈추면 가져온 작업을 되돌림)"""
+        claim = self._loop.run_in_executor(self._queue_pool, self._claim_next, active)
+        try:
+            return await asyncio.shield(claim)
+        except asyncio.CancelledError:
+            job_id = await claim
+            if job_id is not None:
+                await self._in_queue_thread(self._release, job_id)
+            raise
+    
+    def _claim_next(self, active: Set[str]) -> Optional[str]:
+        """실행할 작업 하나를 가져옴 (대기 중이거나 확인이 끊긴 실행 중 작업, active는 제외)"""
+        now = datetime.utcnow()
+        runnable = or_(
+            and_(IngestionJob.status == STATUS_PENDING, IngestionJob.run_after <= now),
+            and_(
+                IngestionJob.status == STATUS_RUNNING,
+                IngestionJob.heartbeat_at < now - timedelta(seconds=settings.INGESTION_JOB_LEASE_SECONDS)
+            )
+        )
+        with self._session() as db:
+            candidates = db.query(IngestionJob.id).filter(runnable).order_by(
+                IngestionJob.created_at
+            ).limit(self.concurrency * 2).all()
+            for (job_id,) in candidates:
+                if job_id in active:
+                    continue
+                # 다른 워커가 먼저 가져가면 조건이 맞지 않아 0행 갱신
+                claimed = db.query(IngestionJob).filter(IngestionJob.id == job_id, runnable).update({
+                    IngestionJob.status: STATUS_RUNNING,
+                    IngestionJob.attempts: IngestionJob.attempts + 1,
+                    IngestionJob.heartbeat_at: now,
+                    IngestionJob.started_at: now
+                }, synchronize_session=False)
+                db.commit()
+                if claimed:
+                    return job_id
+        return None
+    
+    def _heartbeat(self, job_ids: List[str]):
+        """처리 중인 작업의 확인 시각 갱신"""
+        if not job_ids:
+            return
+        with self._session() as db:
+            db.query(IngestionJob).filter(IngestionJob.id.in_(job_ids)).update(
+                {IngestionJob.heartbeat_at: datetime.utcnow()}, synchronize_session=False
+            )
+            db.commit()
+    
+    def _update(self, job_id: str, **fields):
+        """작업 상태 갱신 (취소 요청이 있으면 JobCancelled)"""
+        with self._session() as db:
+            job = db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+            if job is None or job.cancel_requested:
+                raise JobCancelled()
+            for key, value in fields.items():
+                setattr(job, key, value)
+            job.heartbeat_at = datetime.utcnow()
+            db.commit()
+    
+    def _load(self, job_id: str) -> Optional[Tuple[str, str, int, int, Optional[str]]]:
+        """작업 정보 조회 (종류, 문서 ID, 시도 횟수, 최대 시도 횟수, 파일 경로)"""
+        with self._session() as db:
+            job = db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+            if job is None:
+                return None
+            document = db.query(Document).filter(Document.id == job.document_id).first()
+            return (
+                job.job_type, job.document_id, job.attempts, job.max_attempts,
+                document.file_path if document else None
+            )
+    
+    async def _process(self, job_id: str):
+        """작업 실행 (파싱 -> 인덱싱)"""
+        try:
+            loaded = await self._in_queue_thread(self._load, job_id)
+        except asyncio.CancelledError:
+            await self._in_queue_thread(self._release, job_id)
+            raise
+        if loaded is None:
+            return
+        job_type, document_id, attempts, max_attempts, file_path = loaded
+        
+        try:
+            if file_path is None:
+                raise ValueError("문서를 찾을 수 없습니다.")
+            if attempts > max_attempts:
+                raise ValueError("최대 재시도 횟수를 넘었습니다.")
+            
+            if job_type == JOB_DELETE:
+                # 문서와 함께 작업도 삭제되므로 완료 상태는 기록하지 않음
+                await self._in_index_thread(self._delete, document_id)
+                self.completed += 1
+                return
+            
+            if job_type in (JOB_PARSE, JOB_PIPELINE):
+                await self._in_queue_thread(self._update, job_id, stage="parse", progress=0)
+                parsed = await self._parse(file_path)
+                try:
+                    await self._in_queue_thread(
+                        self._update, job_id, progress=40 if job_type == JOB_PIPELINE else 90
+                    )
+                    await self._in_index_thread(self._store_parsed, document_id, parsed)
+                finally:
+                    parsed.remove()
+                await self._in_queue_thread(
+                    self._update, job_id, progress=50 if job_type == JOB_PIPELINE else 100
+                )
+            
+            if job_type in (JOB_INDEX, JOB_PIPELINE):
+                await self._in_queue_thread(self._update, job_id, stage="index")
+                await self._in_index_thread(self._index, document_id)
+            
+            await self._in_queue_thread(self._finish, job_id, STATUS_COMPLETED, progress=100)
+            self.completed += 1
+            if job_type in (JOB_INDEX, JOB_PIPELINE):
+                self._pregenerate_summaries(document_id)
+        except JobCancelled:
+            await self._in_queue_thread(self._finish, job_id, STATUS_CANCELLED)
+        except asyncio.CancelledError:
+            # 워커 종료: 다른 워커나 재시작 후 다시 실행하도록 대기 상태로 되돌림
+            await self._in_queue_thread(self._release, job_id)
+            raise
+        except Exception as e:
+            await self._in_queue_thread(self._fail, job_id, e, attempts, max_attempts)
+    
+    async def _parse(self, file_path: str) -> SpilledDocument:
+        """파싱 프로세스에서 문서 파싱 (프로세스 수가 0이면 기본 스레드 풀)
+        
+        전체 청크와 본문을 부모 프로세스로 넘기지 않도록 청크는 임시 파일에 기록하고
+        메타데이터와 파일 경로만 돌려받는다.
+        """
+        spill_dir = settings.INGESTION_SPILL_DIR
+        if self.parse_processes <= 0:
+            return await self._loop.run_in_executor(None, parse_file_to_spill, file_path, spill_dir)
+        if self._parse_pool is None:
+            # 포크된 자식이 부모의 모델/스레드 상태를 물려받지 않도록 spawn 사용
+            self._parse_pool = ProcessPoolExecutor(
+                max_workers=self.parse_processes,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        try:
+            return await self._loop.run_in_executor(
+                self._parse_pool, parse_file_to_spill, file_path, spill_dir
+            )
+        except BrokenProcessPool:
+            # 파싱 프로세스가 비정상 종료되면 풀을 새로 만들고 재시도에 맡김
+            self._parse_pool.shutdown(wait=False)
+            self._parse_pool = None
+            raise
+    
+    async def _in_index_thread(self, func, *args):
+        """임베딩/DB 기록 작업 스레드에서 실행"""
+        return await self._loop.run_in_executor(self._index_pool, func, *args)
+    
+    async def _in_queue_thread(self, func, *args, **kwargs):
+        """작업 상태 조회/갱신을 큐 스레드에서 실행"""
+        return await self._loop.run_in_executor(self._queue_pool, partial(func, *args, **kwargs))
+    
+    def _store_parsed(self, document_id: str, parsed: SpilledDocument):
+        """파싱 결과 저장 (청크 파일을 읽는 대로 묶음 단위로 저장)"""
+        with self._session() as db:
+            DocumentService(db, self.rag_engine).parse_document(document_id, parsed_doc=parsed)
+    
+    def _index(self, document_id: str):
+        """문서 인덱싱"""
+        with self._session() as db:
+            DocumentService(db, self.rag_engine).index_document(document_id)
+    
+    def _delete(self, document_id: str):
+        """문서와 벡터 삭제"""
+        with self._session() as db:
+            DocumentService(db, self.rag_engine).delete_document(document_id)
+    
+    def _pregenerate_summaries(self, document_id: str):
+        """인덱싱이 끝난 문서의 요약을 백그라운드에서 미리 생성"""
+        from app.services.summary_service import pregenerate_summaries
+        
+        task = self._loop.create_task(pregenerate_summaries(document_id))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+    
+    def _finish(self, job_id: str, status: str, **fields):
+        """작업 종료 상태 기록"""
+        with self._session() as db:
+            job = db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+            if job is None:
+                return
+            job.status = status
+            job.completed_at = datetime.utcnow()
+            for key, value in fields.items():
+                setattr(job, key, value)
+            db.commit()
+    
+    def _fail(self, job_id: str, error: Exception, attempts: int, max_attempts: int):
+        """실패 기록 (입력 오류가 아니면 대기 시간을 늘려 가며 재시도)"""
+        message = str(error) or type(error).__name__
+        retry = not isinstance(error, ValueError) and attempts < max_attempts
+        with self._session() as db:
+            job = db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+            if job is None:
+                return
+            job.error_message = message
+            if retry and not job.cancel_requested:
+                delay = settings.INGESTION_RETRY_BACKOFF * 2 ** (attempts - 1)
+                job.status = STATUS_PENDING
+                job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+                self.retried += 1
+            else:
+                job.status = STATUS_CANCELLED if job.cancel_requested else STATUS_FAILED
+                job.completed_at = datetime.utcnow()
+                self.failed += 1
+            db.commit()
+        print(f"문서 처리 작업 실패 ({job_id}, {attempts}/{max_attempts}회): {message}")
+    
+    def _release(self, job_id: str):
+        """실행 중 작업을 대기 상태로 되돌림 (시도 횟수는 되돌림)"""
+        with self._session() as db:
+            db.query(IngestionJob).filter(
+                IngestionJob.id == job_id, IngestionJob.status == STATUS_RUNNING
+            ).update({
+                IngestionJob.status: STATUS_PENDING,
+                IngestionJob.attempts: IngestionJob.attempts - 1,
+                IngestionJob.run_after: datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """워커 통계"""
+        return {
+            "active": len(self._active),
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried
+        }
+    
+    async def stop(self):
+        """처리 루프와 실행 중 작업 중단, 풀 정리"""
+        tasks = list(self._active.values())
+        if self._task is not None:
+            self._task.cancel()
+            tasks.append(self._task)
+        for task in self._active.values():
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._index_pool.shutdown(wait=False, cancel_futures=True)
+        self._queue_pool.shutdown(wait=False, cancel_futures=True)
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
+
+
+# 프로세스 공유 워커
+_worker: Optional[IngestionWorker] = None
+
+
+def start_ingestion_worker() -> IngestionWorker:
+    """공유 작업 워커 시작 (애플리케이션 시작 시 호출)"""
+    global _worker
+    if _worker is None:
+        _worker = IngestionWorker()
+        _worker.start()
+    return _worker
+
+
+def wake_ingestion_worker():
+    """공유 작업 워커에 새 작업 알림 (워커가 없으면 다음 확인 주기에 처리)"""
+    if _worker is not None:
+        _worker.notify()
+
+
+def get_ingestion_worker() -> Optional[IngestionWorker]:
+    """공유 작업 워커 (시작하지 않았으면 None)"""
+    return _worker
+
+
+async def stop_ingestion_worker():
+    """공유 작업 워커 종료 (애플리케이션 종료 시 호출)"""
+    global _worker
+    worker, _worker = _worker, None
+    if worker is not None:
+        await worker.stop()
@@ -5,7 +5,8 @@ from typing import Optional, Dict, Any
 from sqlalchemy.orm import Session
 
 from app.models.database import LLMProvider as LLMProviderModel
-from app.ai.llm_providers import LLMProviderFactory, LLMProvider, APIKeyManager
+from app.ai.llm_providers import LLMProvider, APIKeyManager
+from app.ai.provider_registry import get_provider_registry
 from app.core.config import settings
 
 
@@ -32,11 +33,7 @@ class LLMService:
             
             if not provider_model:
                 # 기본값으로 Ollama 사용
-                return LLMProviderFactory.create_provider(
-                    "ollama",
-                    base_url=settings.OLLAMA_BASE_URL,
-                    model=settings.OLLAMA_MODEL
-                )
+                return get_provider_registry().default_provider()
             
             provider_name = provider_model.provider_name
         else:
@@ -48,22 +45,31 @@ class LLMService:
         if not provider_model:
             return None
         
-        # API 키 복호화
-        api_key = None
-        if provider_model.api_key:
-            try:
-                api_key = self.key_manager.decrypt(provider_model.api_key)
-            except:
-                pass
-        
-        # 프로바이더 생성
-        return LLMProviderFactory.create_provider(
-            provider_name=provider_model.provider_name,
-            api_key=api_key,
+        # 설정 값이 바뀌지 않았으면 캐시된 프로바이더(공유 커넥션 풀) 재사용
+        model_name = provider_model.model_name or settings.OLLAMA_MODEL
+        return get_provider_registry().get(
+            provider_model.id,
+            (
+                provider_model.provider_name,
+                provider_model.base_url,
+                model_name,
+                provider_model.api_key
+            ),
+            provider_model.provider_name,
             base_url=provider_model.base_url,
-            model=provider_model.model_name or settings.OLLAMA_MODEL
+            model=model_name,
+            api_key_loader=lambda: self._decrypt_api_key(provider_model.api_key)
         )
     
+    def _decrypt_api_key(self, encrypted: Optional[str]) -> Optional[str]:
+        """API 키 복호화 (실패 시 None)"""
+        if not encrypted:
+            return None
+        try:
+            return self.key_manager.decrypt(encrypted)
+        except:
+            return None
+    
     async def generate_text(
         self,
         prompt: str,
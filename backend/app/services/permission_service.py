@@ -1,10 +1,28 @@
 """
 권한 관리 서비스
 """
-from typing import List, Optional
+from typing import List, Optional, FrozenSet, Dict, Tuple
+from sqlalchemy import or_, and_
 from sqlalchemy.orm import Session
+import threading
+import time
 
 from app.models.database import Permission, Document, User
+from app.core.config import settings
+
+
+# 사용자별 읽기 가능 문서 ID 캐시 {user_id: (만료 시각, 문서 ID 집합 또는 None(전체))}
+_readable_cache: Dict[str, Tuple[float, Optional[FrozenSet[str]]]] = {}
+_readable_cache_lock = threading.Lock()
+
+
+def invalidate_permission_cache(user_id: Optional[str] = None):
+    """읽기 권한 캐시 무효화 (user_id가 없으면 전체)"""
+    with _readable_cache_lock:
+        if user_id is None:
+            _readable_cache.clear()
+        else:
+            _readable_cache.pop(user_id, None)
 
 
 class PermissionService:
@@ -36,6 +54,7 @@ class PermissionService:
             existing.permission_type = permission_type
             self.db.commit()
             self.db.refresh(existing)
+            invalidate_permission_cache()
             return existing
         
         # 새 권한 생성
@@ -49,6 +68,7 @@ class PermissionService:
         self.db.add(permission)
         self.db.commit()
         self.db.refresh(permission)
+        invalidate_permission_cache()
         
         return permission
     
@@ -91,6 +111,39 @@ class PermissionService:
         
         return role_permission is not None
     
+    def get_readable_document_ids(self, user_id: str) -> Optional[FrozenSet[str]]:
+        """사용자가 읽을 수 있는 문서 ID 집합 (관리자는 None = 전체)
+        
+        check_permission(..., "read")와 같은 규칙(소유자, 사용자별 권한, 역할별 권한)을
+        문서 단위가 아닌 일괄 쿼리로 계산하고 PERMISSION_CACHE_TTL 동안 캐시한다.
+        """
+        now = time.monotonic()
+        with _readable_cache_lock:
+            cached = _readable_cache.get(user_id)
+            if cached and cached[0] > now:
+                return cached[1]
+        
+        user = self.db.query(User).filter(User.id == user_id).first()
+        if not user:
+            readable: Optional[FrozenSet[str]] = frozenset()
+        elif user.role == "admin":
+            readable = None
+        else:
+            owned = self.db.query(Document.id).filter(Document.created_by == user_id)
+            granted = self.db.query(Permission.document_id).filter(
+                Permission.permission_type == "read",
+                or_(
+                    Permission.user_id == user_id,
+                    and_(Permission.role == user.role, Permission.role.isnot(None))
+                )
+            )
+            readable = frozenset(row[0] for row in owned.union(granted).all())
+        
+        if settings.PERMISSION_CACHE_TTL > 0:
+            with _readable_cache_lock:
+                _readable_cache[user_id] = (now + settings.PERMISSION_CACHE_TTL, readable)
+        return readable
+    
     def get_document_permissions(self, document_id: str) -> List[Permission]:
         """문서의 모든 권한 조회"""
         return self.db.query(Permission).filter(
@@ -105,6 +158,7 @@ class PermissionService:
         
         self.db.delete(permission)
         self.db.commit()
+        invalidate_permission_cache()
         
         return True
 
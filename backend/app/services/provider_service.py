@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from app.models.database import LLMProvider as LLMProviderModel
 from app.services.llm_service import LLMService, APIKeyManager
+from app.ai.provider_registry import get_provider_registry
 
 
 class ProviderService:
@@ -57,6 +58,7 @@ class ProviderService:
         
         self.db.commit()
         self.db.refresh(provider)
+        get_provider_registry().invalidate(provider.id)
         return provider
     
     def get_providers(
@@ -100,6 +102,7 @@ class ProviderService:
         
         self.db.delete(provider)
         self.db.commit()
+        get_provider_registry().invalidate(provider_id)
         return True
     
     def toggle_provider_status(self, provider_id: str) -> bool:
@@ -114,5 +117,6 @@ class ProviderService:
         from datetime import datetime
         provider.updated_at = datetime.utcnow()
         self.db.commit()
+        get_provider_registry().invalidate(provider_id)
         return True
 
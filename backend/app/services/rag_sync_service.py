@@ -5,12 +5,37 @@ from typing import Dict, Any, Optional, List
 from sqlalchemy.orm import Session
 import os
 import shutil
+import glob
 import json
 import pickle
 from pathlib import Path
 
 from app.models.database import RAGSync, Document, DocumentChunk
 from app.core.config import settings
+from app.ai.rag_engine import reload_rag_engine, get_rag_engine
+from app.ai.chunk_text_store import FILE_PATTERN as CHUNK_TEXT_FILE_PATTERN, INDEX_FILE as CHUNK_TEXT_INDEX_FILE
+
+
+def _copy_replace(src_path: str, dst_path: str):
+    """같은 디렉토리의 임시 파일로 복사한 뒤 원자적으로 교체
+    
+    인덱스/메타데이터/청크 본문 파일은 실행 중인 엔진이 메모리 매핑해 읽으므로 그 자리에 덮어쓰지 않는다.
+    교체 전 파일을 연 쪽은 다시 로드할 때까지 이전 내용을 그대로 읽는다.
+    """
+    tmp_path = os.path.join(os.path.dirname(dst_path), f".{os.path.basename(dst_path)}.import")
+    try:
+        shutil.copy2(src_path, tmp_path)
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class RAGSyncConflict(Exception):
+    """현재 프로세스에서 실행할 수 없는 동기화 요청 (벡터 저장소 읽기 전용)"""
 
 
 class RAGSyncService:
@@ -21,12 +46,21 @@ class RAGSyncService:
         self.db = db
         self.vector_db_path = settings.VECTOR_DB_PATH
     
+    @staticmethod
+    def ensure_writer():
+        """벡터 저장소 기록 잠금이 없으면 (읽기 전용 프로세스) 파일을 건드리기 전에 거부"""
+        if get_rag_engine().read_only:
+            raise RAGSyncConflict(
+                "다른 프로세스가 벡터 저장소에 기록 중입니다. 기록 잠금을 가진 프로세스에서 다시 시도하세요."
+            )
+    
     def export_rag(
         self,
         target_system: str,
         sync_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """RAG 데이터 내보내기 (메인 시스템 -> 선박 시스템)"""
+        self.ensure_writer()
         if not sync_id:
             sync_record = RAGSync(
                 sync_type="export",
@@ -43,15 +77,25 @@ class RAGSyncService:
                 raise ValueError("동기화 기록을 찾을 수 없습니다.")
         
         try:
+            # 변경 로그까지 반영된 인덱스 파일을 내보내도록 체크포인트
+            get_rag_engine().checkpoint()
+            
             # 벡터 DB 파일 복사
             vector_db_files = [
                 "faiss.index",
-                "metadata.pkl"
+                "metadata.cols",
+                "metadata.pkl"  # 이전 버전 메타데이터
             ]
             
             export_dir = os.path.join(settings.VECTOR_DB_PATH, "exports", sync_id)
             os.makedirs(export_dir, exist_ok=True)
             
+            # 청크 본문 저장소 (세대별 데이터 파일 포함)
+            vector_db_files += [
+                os.path.basename(path)
+                for path in glob.glob(os.path.join(self.vector_db_path, CHUNK_TEXT_FILE_PATTERN))
+            ]
+            
             for filename in vector_db_files:
                 src_path = os.path.join(self.vector_db_path, filename)
                 if os.path.exists(src_path):
@@ -122,6 +166,8 @@ class RAGSyncService:
         import_path = source_path or sync_record.vector_db_path
         if not import_path or not os.path.exists(import_path):
             raise ValueError("가져올 경로가 유효하지 않습니다.")
+        # 기록 프로세스가 모르는 사이에 파일을 바꾸면 이전 로그가 가져온 인덱스 위에 재생됨
+        self.ensure_writer()
         
         try:
             sync_record.status = "in_progress"
@@ -131,14 +177,33 @@ class RAGSyncService:
             # 벡터 DB 파일 복사
             vector_db_files = [
                 "faiss.index",
-                "metadata.pkl"
+                "metadata.cols",
+                "metadata.pkl"  # 이전 버전 메타데이터
             ]
             
             for filename in vector_db_files:
                 src_path = os.path.join(import_path, filename)
+                dst_path = os.path.join(self.vector_db_path, filename)
                 if os.path.exists(src_path):
-                    dst_path = os.path.join(self.vector_db_path, filename)
-                    shutil.copy2(src_path, dst_path)
+                    _copy_replace(src_path, dst_path)
+                elif os.path.exists(dst_path) and filename.startswith("metadata."):
+                    # 가져온 인덱스와 맞지 않는 로컬 메타데이터가 우선 로드되지 않도록 제거
+                    os.remove(dst_path)
+            
+            # 청크 본문 저장소는 한 벌로 교체: 데이터 파일을 먼저 옮기고 세대를 가리키는 색인을
+            # 마지막에 교체한 뒤, 가져온 세트에 없는 로컬 파일을 삭제
+            imported = {
+                os.path.basename(path)
+                for path in glob.glob(os.path.join(import_path, CHUNK_TEXT_FILE_PATTERN))
+            }
+            for filename in sorted(imported, key=lambda name: name == CHUNK_TEXT_INDEX_FILE):
+                _copy_replace(
+                    os.path.join(import_path, filename),
+                    os.path.join(self.vector_db_path, filename)
+                )
+            for path in glob.glob(os.path.join(self.vector_db_path, CHUNK_TEXT_FILE_PATTERN)):
+                if os.path.basename(path) not in imported:
+                    os.remove(path)
             
             # 메타데이터 가져오기 (선택적)
             metadata_path = os.path.join(import_path, "metadata.json")
@@ -147,6 +212,9 @@ class RAGSyncService:
                     metadata = json.load(f)
                     # 메타데이터는 참고용으로만 사용 (실제 문서는 별도로 동기화 필요)
             
+            # 공유 RAG 엔진에 새 인덱스 반영 (로컬 변경 로그는 버림)
+            reload_rag_engine(discard_log=True)
+            
             sync_record.status = "completed"
             sync_record.progress = 100
             from datetime import datetime
@@ -1,22 +1,33 @@
 """
 검색 서비스
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, FrozenSet, AsyncIterator, Tuple
 from sqlalchemy.orm import Session
 
 from app.models.database import SearchHistory, User
-from app.ai.rag_engine import RAGSearchEngine, SearchResult, AnswerWithSources
+from app.ai.rag_engine import (
+    RAGSearchEngine, SearchResult, AnswerWithSources, get_rag_engine, ANSWER_ERROR_MESSAGE
+)
 from app.services.llm_service import LLMService
+from app.services.permission_service import PermissionService
 
 
 class SearchService:
     """검색 서비스"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, rag_engine: Optional[RAGSearchEngine] = None):
         """검색 서비스 초기화"""
         self.db = db
-        self.rag_engine = RAGSearchEngine()
+        self._rag_engine = rag_engine
         self.llm_service = LLMService(db)
+        self.permission_service = PermissionService(db)
+    
+    @property
+    def rag_engine(self) -> RAGSearchEngine:
+        """RAG 엔진 (미주입 시 프로세스 공유 엔진 사용)"""
+        if self._rag_engine is None:
+            self._rag_engine = get_rag_engine()
+        return self._rag_engine
     
     async def search(
         self,
@@ -26,14 +37,13 @@ class SearchService:
         generate_answer: bool = False,
         filter_dict: Dict[str, Any] = None,
         use_main_system: bool = True,
-        provider_name: Optional[str] = None
+        provider_name: Optional[str] = None,
+        min_score: Optional[float] = None,
+        search_mode: Optional[str] = None
     ) -> Dict[str, Any]:
-        """검색 수행"""
-        # 검색 수행
-        search_results = self.rag_engine.semantic_search(
-            query=query,
-            top_k=top_k,
-            filter_dict=filter_dict
+        """검색 수행 (읽기 권한이 있는 문서만 검색)"""
+        search_results = await self._retrieve(
+            query, user_id, top_k, filter_dict, min_score, search_mode
         )
         
         # 답변 생성 (요청 시)
@@ -50,42 +60,148 @@ class SearchService:
                 llm_provider=llm_provider
             )
         
-        # 검색 기록 저장
-        search_history = SearchHistory(
-            user_id=user_id,
-            query=query,
-            results_count=len(search_results)
-        )
-        self.db.add(search_history)
-        self.db.commit()
+        self._record_history(user_id, query, len(search_results))
         
         return {
             "query": query,
-            "results": [
-                {
-                    "content": result.content,
-                    "score": result.score,
-                    "document_id": result.document_id,
-                    "chunk_index": result.chunk_index,
-                    "metadata": result.metadata
-                }
-                for result in search_results
-            ],
+            "results": self._format_results(search_results),
             "answer": {
                 "answer": answer.answer,
-                "sources": [
-                    {
-                        "content": src.content,
-                        "document_id": src.document_id,
-                        "score": src.score
-                    }
-                    for src in answer.sources
-                ],
+                "sources": self._format_sources(answer.sources),
                 "confidence": answer.confidence
             } if answer else None,
             "total_results": len(search_results)
         }
     
+    async def search_stream(
+        self,
+        query: str,
+        user_id: str,
+        top_k: int = 5,
+        filter_dict: Dict[str, Any] = None,
+        use_main_system: bool = True,
+        provider_name: Optional[str] = None,
+        min_score: Optional[float] = None,
+        search_mode: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """검색 결과를 먼저 보내고 답변을 생성되는 대로 보내는 (이벤트명, 데이터) 스트림
+        
+        이벤트: results(검색 결과) -> token(답변 조각, 여러 번) -> done(전체 답변) 또는 error
+        """
+        search_results = await self._retrieve(
+            query, user_id, top_k, filter_dict, min_score, search_mode
+        )
+        self._record_history(user_id, query, len(search_results))
+        yield "results", {
+            "query": query,
+            "results": self._format_results(search_results),
+            "total_results": len(search_results)
+        }
+        
+        llm_provider = self.llm_service.get_provider(
+            provider_name=provider_name,
+            use_main_system=use_main_system
+        )
+        parts = []
+        try:
+            async for text in self.rag_engine.stream_answer(query, search_results, llm_provider=llm_provider):
+                parts.append(text)
+                yield "token", {"text": text}
+        except Exception as e:
+            print(f"LLM 답변 스트리밍 오류: {e}")
+            yield "error", {"detail": ANSWER_ERROR_MESSAGE}
+            return
+        
+        yield "done", {
+            "answer": "".join(parts),
+            "sources": self._format_sources(search_results),
+            "confidence": self.rag_engine.answer_confidence(search_results)
+        }
+    
+    async def _retrieve(
+        self,
+        query: str,
+        user_id: str,
+        top_k: int,
+        filter_dict: Optional[Dict[str, Any]],
+        min_score: Optional[float],
+        search_mode: Optional[str]
+    ) -> List[SearchResult]:
+        """읽기 가능한 문서 범위에서 검색"""
+        # 읽기 가능한 문서로 검색 범위 제한 (벡터 검색 내부에서 사전 필터로 적용)
+        readable_ids = self.permission_service.get_readable_document_ids(user_id)
+        filter_dict = self._restrict_to_documents(filter_dict, readable_ids)
+        if filter_dict is None and readable_ids is not None:
+            return []
+        
+        # 의미 검색과 BM25 검색 결합 (search_mode로 한쪽만 사용 가능)
+        return await self.rag_engine.hybrid_search_async(
+            query=query,
+            top_k=top_k,
+            filter_dict=filter_dict,
+            min_score=min_score,
+            mode=search_mode
+        )
+    
+    def _record_history(self, user_id: str, query: str, results_count: int):
+        """검색 기록 저장"""
+        search_history = SearchHistory(
+            user_id=user_id,
+            query=query,
+            results_count=results_count
+        )
+        self.db.add(search_history)
+        self.db.commit()
+    
+    @staticmethod
+    def _format_results(search_results: List[SearchResult]) -> List[Dict[str, Any]]:
+        """검색 결과 응답 형식"""
+        return [
+            {
+                "content": result.content,
+                "score": result.score,
+                "document_id": result.document_id,
+                "chunk_index": result.chunk_index,
+                "metadata": result.metadata
+            }
+            for result in search_results
+        ]
+    
+    @staticmethod
+    def _format_sources(sources: List[SearchResult]) -> List[Dict[str, Any]]:
+        """답변 출처 응답 형식"""
+        return [
+            {
+                "content": src.content,
+                "document_id": src.document_id,
+                "score": src.score
+            }
+            for src in sources
+        ]
+    
+    @staticmethod
+    def _restrict_to_documents(
+        filter_dict: Optional[Dict[str, Any]],
+        readable_ids: Optional[FrozenSet[str]]
+    ) -> Optional[Dict[str, Any]]:
+        """필터에 문서 ID 제한 추가 (검색 가능한 문서가 없으면 None)"""
+        if readable_ids is None:  # 전체 문서 접근 가능
+            return filter_dict
+        
+        filter_dict = dict(filter_dict or {})
+        requested = filter_dict.get("document_id")
+        if requested is None:
+            allowed = readable_ids
+        elif isinstance(requested, (list, tuple, set)):
+            allowed = readable_ids.intersection(requested)
+        else:
+            allowed = readable_ids.intersection([requested])
+        
+        if not allowed:
+            return None
+        filter_dict["document_id"] = list(allowed)
+        return filter_dict
+    
     def get_search_history(
         self,
         user_id: str,
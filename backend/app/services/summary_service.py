@@ -1,12 +1,18 @@
 """
 요약 서비스
 """
-from typing import Optional
+from typing import Optional, Sequence
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.models.database import Document
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database import Document, DocumentChunk, DocumentSummary
+from app.parsers.base import DocumentMetadata, ParsedDocument, join_chunks
 from app.parsers.parser_factory import ParserFactory
-from app.ai.summarizer import DocumentSummarizer
+from app.ai.summarizer import DocumentSummarizer, SUMMARY_ERROR_MESSAGE
+from app.ai.provider_registry import get_provider_registry
+from app.ai.response_cache import fingerprint, provider_identity
 from app.services.llm_service import LLMService
 
 
@@ -26,7 +32,7 @@ class SummaryService:
         use_main_system: bool = True,
         provider_name: Optional[str] = None
     ) -> dict:
-        """문서 요약 생성"""
+        """문서 요약 생성 (같은 본문/요약 타입/프로바이더의 저장된 요약이 있으면 재사용)"""
         document = self.db.query(Document).filter(Document.id == document_id).first()
         if not document:
             raise ValueError("문서를 찾을 수 없습니다.")
@@ -34,30 +40,113 @@ class SummaryService:
         if not document.is_parsed:
             raise ValueError("문서가 파싱되지 않았습니다. 먼저 파싱을 수행하세요.")
         
-        # 파서로 문서 재파싱 (또는 캐시된 파싱 결과 사용)
-        parser = ParserFactory.get_parser(document.file_path)
-        parsed_doc = parser.parse(document.file_path)
+        # 파싱 시 저장한 본문 사용 (원본 파일을 다시 파싱하지 않음)
+        parsed_doc = self._parsed_document(document)
         
-        # LLM 프로바이더 가져오기
+        # LLM 프로바이더 가져오기 (없으면 기본 Ollama)
         llm_provider = self.llm_service.get_provider(
             provider_name=provider_name,
             use_main_system=use_main_system
-        )
+        ) or get_provider_registry().default_provider()
         
-        # 요약 생성
-        summary = await self.summarizer.summarize_document(
-            parsed_doc, 
-            summary_type,
-            llm_provider=llm_provider
-        )
+        provider = provider_identity(llm_provider)
+        content_hash = fingerprint(parsed_doc.full_text)
+        stored = self.db.query(DocumentSummary).filter(
+            DocumentSummary.document_id == document_id,
+            DocumentSummary.summary_type == summary_type,
+            DocumentSummary.provider == provider,
+            DocumentSummary.content_hash == content_hash
+        ).first()
+        
+        if stored is None:
+            # 요약 생성
+            summary = await self.summarizer.summarize_document(
+                parsed_doc,
+                summary_type,
+                llm_provider=llm_provider,
+                document_id=document_id
+            )
+            stored = DocumentSummary(
+                document_id=document_id,
+                summary_type=summary.summary_type,
+                provider=provider,
+                content_hash=content_hash,
+                content=summary.content,
+                keywords=summary.keywords,
+                quality_score=summary.quality_score,
+                original_length=summary.original_length,
+                summary_length=summary.summary_length
+            )
+            if summary.content != SUMMARY_ERROR_MESSAGE:
+                self._save(stored)
         
         return {
             "document_id": document_id,
-            "summary_type": summary.summary_type,
-            "content": summary.content,
-            "keywords": summary.keywords,
-            "quality_score": summary.quality_score,
-            "original_length": summary.original_length,
-            "summary_length": summary.summary_length
+            "summary_type": stored.summary_type,
+            "content": stored.content,
+            "keywords": stored.keywords or [],
+            "quality_score": stored.quality_score,
+            "original_length": stored.original_length,
+            "summary_length": stored.summary_length
         }
+    
+    def _parsed_document(self, document: Document) -> ParsedDocument:
+        """저장된 파싱 결과로 ParsedDocument 구성
+        
+        본문은 저장된 청크를 겹침을 빼고 이어 복원한다. 본문을 parsed_content에 저장하던 이전
+        문서는 그 본문을, 청크도 없는 문서는 원본 파일을 다시 파싱하여 사용한다.
+        """
+        parsed_content = document.parsed_content or {}
+        full_text = parsed_content.get("full_text")
+        if full_text is None:
+            chunks = self.db.query(DocumentChunk.content, DocumentChunk.chunk_metadata).filter(
+                DocumentChunk.document_id == document.id
+            ).order_by(DocumentChunk.chunk_index).all()
+            if not chunks:
+                parser = ParserFactory.get_parser(document.file_path)
+                return parser.parse(document.file_path)
+            full_text = join_chunks(chunks)
+        
+        metadata = parsed_content.get("metadata") or {}
+        return ParsedDocument(
+            filename=document.filename,
+            file_type=document.file_type,
+            metadata=DocumentMetadata(
+                title=metadata.get("title") or "",
+                author=metadata.get("author") or "",
+                page_count=metadata.get("page_count") or 0,
+                word_count=metadata.get("word_count") or 0
+            ),
+            chunks=[],
+            full_text=full_text,
+            structure=parsed_content.get("structure")
+        )
+    
+    def _save(self, summary: DocumentSummary):
+        """요약 저장 (동시 요청이 먼저 저장했으면 무시)"""
+        self.db.add(summary)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
 
+
+async def pregenerate_summaries(
+    document_id: str,
+    summary_types: Optional[Sequence[str]] = None
+):
+    """인덱싱 후 백그라운드에서 요약을 미리 생성 (오류는 기록만 함)"""
+    summary_types = settings.SUMMARY_PREGENERATE_TYPES if summary_types is None else summary_types
+    if not summary_types:
+        return
+    
+    db = SessionLocal()
+    try:
+        service = SummaryService(db)
+        for summary_type in summary_types:
+            try:
+                await service.summarize_document(document_id, summary_type)
+            except Exception as e:
+                print(f"요약 미리 생성 오류 ({document_id}, {summary_type}): {e}")
+    finally:
+        db.close()
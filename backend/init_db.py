@@ -4,6 +4,7 @@
 from app.core.database import engine, Base
 from app.models.database import User, Document, DocumentChunk, Permission, SearchHistory
 from app.services.auth_service import AuthService
+from sqlalchemy import Integer, inspect, text
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
 
@@ -15,6 +16,44 @@ def init_database():
     print("데이터베이스 테이블 생성 완료")
 
 
+def upgrade_database(bind=engine):
+    """기존 데이터베이스를 현재 모델에 맞게 변경 (여러 번 실행해도 안전)
+    
+    create_all은 없는 테이블(ingestion_jobs, document_summaries)만 만들고 기존 컬럼은
+    바꾸지 않으므로, 문자열이던 document_chunks.embedding_id를 BIGINT로 변환한다.
+    숫자 문자열(이전 위치 기반 벡터 ID)은 같은 값의 정수로, 그 밖의 값은 NULL로 바꾼다.
+    """
+    Base.metadata.create_all(bind=bind)
+    
+    columns = {column["name"]: column for column in inspect(bind).get_columns("document_chunks")}
+    if isinstance(columns["embedding_id"]["type"], Integer):
+        return
+    
+    print("document_chunks.embedding_id를 BIGINT로 변환 중...")
+    with bind.begin() as conn:
+        if bind.dialect.name == "postgresql":
+            conn.execute(text(
+                "ALTER TABLE document_chunks ALTER COLUMN embedding_id TYPE BIGINT "
+                "USING CASE WHEN embedding_id ~ '^[0-9]+$' THEN embedding_id::bigint END"
+            ))
+        elif bind.dialect.name == "sqlite":
+            # SQLite는 컬럼 타입을 바꿀 수 없으므로 새 테이블로 옮김
+            names = ", ".join(name for name in columns if name != "embedding_id")
+            conn.execute(text("ALTER TABLE document_chunks RENAME TO document_chunks_old"))
+            DocumentChunk.__table__.create(conn)
+            conn.execute(text(
+                f"INSERT INTO document_chunks ({names}, embedding_id) "
+                f"SELECT {names}, CASE WHEN embedding_id != '' AND embedding_id NOT GLOB '*[^0-9]*' "
+                f"THEN CAST(embedding_id AS INTEGER) END FROM document_chunks_old"
+            ))
+            conn.execute(text("DROP TABLE document_chunks_old"))
+        else:
+            raise RuntimeError(
+                f"{bind.dialect.name}: document_chunks.embedding_id를 BIGINT로 직접 변환해야 합니다."
+            )
+    print("document_chunks.embedding_id 변환 완료")
+
+
 def create_default_admin():
     """기본 관리자 계정 생성"""
     db = SessionLocal()
@@ -44,5 +83,6 @@ def create_default_admin():
 
 if __name__ == "__main__":
     init_database()
+    upgrade_database()
     create_default_admin()
 
@@ -0,0 +1,48 @@
+"""
+공통 테스트 설정
+"""
+import hashlib
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.ai.rag_engine import RAGSearchEngine
+
+
+class FakeEmbeddingGenerator:
+    """테스트용 임베딩 생성기 (모델 로딩 없이 결정적 벡터 생성)"""
+    
+    model_name = "fake-embedding"
+    dimension = 16
+    query_cache = None
+    
+    def __init__(self):
+        self.encoded = 0
+    
+    def _vector(self, text: str) -> np.ndarray:
+        seed = int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+        return np.random.default_rng(seed).standard_normal(self.dimension).astype("float32")
+    
+    def generate_embedding(self, text: str) -> np.ndarray:
+        self.encoded += 1
+        return self._vector(text)
+    
+    def generate_embeddings(self, texts, batch_size=None, **kwargs) -> np.ndarray:
+        self.encoded += len(texts)
+        return np.stack([self._vector(t) for t in texts])
+    
+    def get_embedding_dimension(self) -> int:
+        return self.dimension
+
+
+@pytest.fixture(autouse=True)
+def isolated_embedding_cache(tmp_path, monkeypatch):
+    """임베딩 캐시 파일을 테스트별 임시 디렉토리에 생성"""
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_DIR", str(tmp_path / "embedding_cache"))
+
+
+@pytest.fixture
+def rag_engine(tmp_path):
+    """임시 경로에 테스트용 임베딩 생성기를 쓰는 RAG 엔진 (설정 변경이 필요하면 직접 생성)"""
+    return RAGSearchEngine(str(tmp_path), embedding_generator=FakeEmbeddingGenerator())
@@ -0,0 +1,53 @@
+"""
+스트리밍 청크 분할 테스트
+"""
+from app.parsers.base import StreamingChunker, TextSegment, join_chunks, stream_chunks
+from app.parsers.pdf_parser import PDFParser
+
+
+def _text():
+    sentences = [f"{i}번 절차는 주기관의 연료 계통을 점검하는 단계이다." for i in range(200)]
+    return "\n".join(" ".join(sentences[i:i + 3]) for i in range(0, 200, 3))
+
+
+def _segments(text, size):
+    return [TextSegment(text=text[i:i + size], page_number=i // size + 1) for i in range(0, len(text), size)]
+
+
+def test_stream_matches_chunk_document():
+    """조각 크기와 관계없이 전체 본문 분할과 같은 청크를 만드는지 테스트"""
+    text = _text()
+    expected = [chunk.content for chunk in PDFParser().chunk_document(text)]
+    for size in (7, 300, 5000):
+        chunks = list(stream_chunks(_segments(text, size)))
+        contents = [chunk.content for chunk in chunks]
+        # 전체 분할은 마지막 청크에 이미 포함된 꼬리 청크를 더 만들 수 있음
+        assert contents == expected[:len(contents)]
+        assert expected[len(contents):] == [] or expected[-1] in contents[-1]
+        assert [chunk.chunk_index for chunk in chunks] == list(range(len(chunks)))
+
+
+def test_join_chunks_restores_text():
+    """겹침을 빼고 이은 청크가 원문과 같은지 테스트"""
+    text = _text()
+    chunks = list(stream_chunks(_segments(text, 300)))
+    assert join_chunks((chunk.content, chunk.metadata) for chunk in chunks) == text.strip()
+
+
+def test_page_number_from_chunk_start():
+    """청크 본문이 시작하는 조각의 페이지가 기록되는지 테스트"""
+    text = _text()
+    for chunk in stream_chunks(_segments(text, 300)):
+        content_start = text.index(chunk.content, chunk.metadata["start"])
+        assert chunk.page_number == content_start // 300 + 1
+
+
+def test_buffer_bounded():
+    """내보낸 앞부분을 버려 버퍼가 청크 크기 수준으로 유지되는지 테스트"""
+    chunker = StreamingChunker(chunk_size=1000, chunk_overlap=200)
+    largest = 0
+    for segment in _segments(_text() * 20, 100):
+        list(chunker.feed(segment))
+        largest = max(largest, len(chunker._buffer))
+    list(chunker.finish())
+    assert largest < 2500
@@ -0,0 +1,38 @@
+"""
+데이터베이스 업그레이드 테스트
+"""
+from sqlalchemy import BigInteger, create_engine, inspect, text
+
+from init_db import upgrade_database
+
+
+def test_upgrade_converts_embedding_id_and_creates_tables(tmp_path):
+    """문자열 embedding_id를 BIGINT로 바꾸고 새 테이블을 만드는지 테스트"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE documents (id VARCHAR PRIMARY KEY)"))
+        conn.execute(text(
+            "CREATE TABLE document_chunks (id VARCHAR PRIMARY KEY, document_id VARCHAR NOT NULL "
+            "REFERENCES documents(id), chunk_index INTEGER NOT NULL, content TEXT NOT NULL, "
+            "chunk_metadata JSON, embedding_id VARCHAR, created_at DATETIME)"
+        ))
+        conn.execute(text("INSERT INTO documents (id) VALUES ('doc-1')"))
+        conn.execute(text(
+            "INSERT INTO document_chunks (id, document_id, chunk_index, content, embedding_id) VALUES "
+            "('c1', 'doc-1', 0, '엔진', '7'), ('c2', 'doc-1', 1, '펌프', 'abc'), ('c3', 'doc-1', 2, '밸브', NULL)"
+        ))
+    
+    upgrade_database(engine)
+    upgrade_database(engine)  # 다시 실행해도 변경 없음
+    
+    inspector = inspect(engine)
+    assert {"ingestion_jobs", "document_summaries"} <= set(inspector.get_table_names())
+    column = next(c for c in inspector.get_columns("document_chunks") if c["name"] == "embedding_id")
+    assert isinstance(column["type"], BigInteger)
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT id, embedding_id, typeof(embedding_id), content FROM document_chunks ORDER BY id"
+        )).all()
+    assert [tuple(row) for row in rows] == [
+        ("c1", 7, "integer", "엔진"), ("c2", None, "null", "펌프"), ("c3", None, "null", "밸브")
+    ]
@@ -0,0 +1,60 @@
+"""
+쿼리 임베딩 배치 처리 테스트
+"""
+import asyncio
+
+import numpy as np
+
+from app.ai.embedding_batcher import EmbeddingBatcher
+from tests.conftest import FakeEmbeddingGenerator
+
+
+def test_concurrent_requests_are_batched():
+    """동시 요청이 하나의 배치로 인코딩되는지 테스트"""
+    generator = FakeEmbeddingGenerator()
+    batcher = EmbeddingBatcher(generator, max_batch_size=16, max_wait_ms=50)
+    queries = [f"질문 {i}" for i in range(8)]
+    
+    async def run():
+        return await asyncio.gather(*(batcher.embed(q) for q in queries))
+    
+    try:
+        embeddings = asyncio.run(run())
+    finally:
+        batcher.close()
+    
+    for query, embedding in zip(queries, embeddings):
+        np.testing.assert_allclose(embedding, generator._vector(query))
+    assert batcher.get_stats()["batches"] == 1
+
+
+def test_duplicate_queries_are_encoded_once():
+    """같은 배치의 중복 쿼리는 한 번만 인코딩되는지 테스트"""
+    generator = FakeEmbeddingGenerator()
+    batcher = EmbeddingBatcher(generator, max_batch_size=16, max_wait_ms=50)
+    
+    async def run():
+        return await asyncio.gather(*(batcher.embed("엔진 정비 절차") for _ in range(5)))
+    
+    try:
+        asyncio.run(run())
+    finally:
+        batcher.close()
+    
+    assert generator.encoded == 1
+
+
+def test_batch_size_limit():
+    """최대 배치 크기를 넘지 않는지 테스트"""
+    generator = FakeEmbeddingGenerator()
+    batcher = EmbeddingBatcher(generator, max_batch_size=4, max_wait_ms=50)
+    
+    async def run():
+        return await asyncio.gather(*(batcher.embed(f"질문 {i}") for i in range(10)))
+    
+    try:
+        asyncio.run(run())
+    finally:
+        batcher.close()
+    
+    assert batcher.get_stats()["batches"] == 3
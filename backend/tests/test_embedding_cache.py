@@ -0,0 +1,104 @@
+"""
+임베딩 캐시 테스트
+"""
+import time
+
+import numpy as np
+
+from app.ai.embedding_cache import QueryEmbeddingCache, EmbeddingDiskStore
+
+
+def _vector(seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal(8).astype("float32")
+
+
+def test_query_normalization_hits_cache():
+    """공백만 다른 쿼리는 같은 캐시 항목을 쓰고 대소문자가 다르면 구분하는지 테스트"""
+    cache = QueryEmbeddingCache("model-a", max_size=10)
+    cache.put("PUMP 정비  절차", _vector(1))
+    
+    assert cache.get(" PUMP 정비 절차 ") is not None
+    assert cache.get("pump 정비 절차") is None
+    assert cache.get("안전 점검") is None
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_lru_and_ttl_eviction():
+    """크기 초과 및 TTL 만료 시 제거되는지 테스트"""
+    cache = QueryEmbeddingCache("model-a", max_size=2)
+    cache.put("a", _vector(1))
+    cache.put("b", _vector(2))
+    cache.get("a")
+    cache.put("c", _vector(3))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    
+    expiring = QueryEmbeddingCache("model-a", max_size=10, ttl_seconds=0.01)
+    expiring.put("a", _vector(1))
+    time.sleep(0.02)
+    assert expiring.get("a") is None
+
+
+def test_model_name_is_part_of_key():
+    """모델이 다르면 캐시를 공유하지 않는지 테스트"""
+    cache_a = QueryEmbeddingCache("model-a")
+    cache_b = QueryEmbeddingCache("model-b")
+    assert cache_a._key("안전 점검") != cache_b._key("안전 점검")
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    """디스크 계층이 재시작 후에도 유지되는지 테스트"""
+    store = EmbeddingDiskStore(str(tmp_path), "query", 8)
+    cache = QueryEmbeddingCache("model-a", disk_store=store)
+    cache.put("안전 점검", _vector(1))
+    
+    restarted = QueryEmbeddingCache(
+        "model-a", disk_store=EmbeddingDiskStore(str(tmp_path), "query", 8)
+    )
+    np.testing.assert_allclose(restarted.get("안전 점검"), _vector(1))
+    assert restarted.get_stats()["disk_hits"] == 1
+
+
+def test_disk_store_ignores_truncated_rows(tmp_path):
+    """데이터 파일보다 앞선 인덱스 항목은 무시하는지 테스트"""
+    store = EmbeddingDiskStore(str(tmp_path), "chunks", 8)
+    store.put_many(["k1", "k2"], np.stack([_vector(1), _vector(2)]))
+    with open(store.data_path, "r+b") as f:
+        f.truncate(store.row_bytes)
+    
+    reopened = EmbeddingDiskStore(str(tmp_path), "chunks", 8)
+    assert "k1" in reopened
+    assert "k2" not in reopened
+
+
+def test_disk_store_applies_ttl_on_load(tmp_path):
+    """저장 시각이 TTL을 지난 항목은 다시 열 때 제외하는지 테스트"""
+    store = EmbeddingDiskStore(str(tmp_path), "query", 8, ttl_seconds=60)
+    store.put_many(["old", "new"], np.stack([_vector(1), _vector(2)]))
+    with open(store.index_path, "w", encoding="utf-8") as f:
+        f.write(f"old\t0\t{time.time() - 120:.0f}\nnew\t1\t{time.time():.0f}\n")
+    
+    reopened = EmbeddingDiskStore(str(tmp_path), "query", 8, ttl_seconds=60)
+    assert "old" not in reopened
+    np.testing.assert_allclose(reopened.get("new"), _vector(2))
+
+
+def test_disk_store_compacts_to_size_cap(tmp_path):
+    """항목 수가 제한을 넘으면 최근 항목만 남기고 파일을 압축하는지 테스트"""
+    store = EmbeddingDiskStore(str(tmp_path), "chunks", 8, max_entries=10)
+    for i in range(10):
+        store.put(f"k{i}", _vector(i))
+    other = EmbeddingDiskStore(str(tmp_path), "chunks", 8, max_entries=10)  # 다른 워커 프로세스
+    store.put("k10", _vector(10))
+    
+    assert len(store) == 9
+    assert "k0" not in store and "k1" not in store
+    assert store._data_rows() == 9
+    np.testing.assert_allclose(store.get("k10"), _vector(10))
+    
+    # 압축 전에 연 저장소는 교체된 파일을 감지해 다시 읽음
+    np.testing.assert_allclose(other.get("k5"), _vector(5))
+    assert other.get("k0") is None
+    assert len(EmbeddingDiskStore(str(tmp_path), "chunks", 8, max_entries=10)) == 9
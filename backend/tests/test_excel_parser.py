@@ -0,0 +1,89 @@
+"""
+Excel 파서 테스트
+"""
+from openpyxl import Workbook
+
+from app.parsers import excel_parser
+from app.parsers.excel_parser import ExcelParser
+
+
+def _write_workbook(path):
+    wb = Workbook()
+    wb.properties.title = "정비 일지"
+    wb.properties.creator = "기관부"
+    sheet = wb.active
+    sheet.title = "점검"
+    sheet.append(["항목", "주기"])
+    sheet.append(["주기관", "500시간"])
+    wb.save(path)
+
+
+def test_parse_opens_workbook_once(tmp_path, monkeypatch):
+    """메타데이터와 시트 내용을 한 번 연 통합 문서에서 읽는지 테스트"""
+    path = tmp_path / "log.xlsx"
+    _write_workbook(path)
+    calls = []
+    original_load = excel_parser.load_workbook
+    
+    def counting_load(*args, **kwargs):
+        calls.append(kwargs)
+        return original_load(*args, **kwargs)
+    
+    monkeypatch.setattr(excel_parser, "load_workbook", counting_load)
+    parsed = ExcelParser().parse(str(path))
+    
+    assert len(calls) == 1
+    assert calls[0]["read_only"]
+    assert (parsed.metadata.title, parsed.metadata.author) == ("정비 일지", "기관부")
+    assert "주기관 | 500시간" in parsed.full_text
+
+
+def test_row_group_chunks(tmp_path):
+    """행 묶음 청크가 시트/행 범위를 담고 머리글을 다시 붙이는지 테스트"""
+    path = tmp_path / "engine.xlsx"
+    wb = Workbook()
+    log = wb.active
+    log.title = "기관 일지"
+    log.append(["시각", "회전수"])
+    for hour in range(1, 6):
+        log.append([f"{hour:02d}:00", 90 + hour])
+    log.cell(row=9, column=1, value="비고")  # 빈 행 2개 뒤의 행
+    parts = wb.create_sheet("부품")
+    parts.append(["품명", "수량"])
+    parts.append(["필터", 3])
+    wb.save(path)
+    
+    parsed = ExcelParser(max_rows=3).parse(str(path))
+    
+    ranges = [
+        (chunk.metadata["sheet"], chunk.metadata["row_start"], chunk.metadata["row_end"])
+        for chunk in parsed.chunks
+    ]
+    assert ranges == [("기관 일지", 1, 3), ("기관 일지", 4, 6), ("기관 일지", 9, 9), ("부품", 1, 2)]
+    assert parsed.chunks[1].content == "시트: 기관 일지\n시각 | 회전수\n03:00 | 93\n04:00 | 94\n05:00 | 95"
+    assert parsed.chunks[3].content == "시트: 부품\n품명 | 수량\n필터 | 3"
+    assert [chunk.chunk_index for chunk in parsed.chunks] == [0, 1, 2, 3]
+    for chunk in parsed.chunks:
+        assert parsed.full_text[chunk.metadata["start"]:chunk.metadata["end"]] == chunk.content
+    assert parsed.structure["sheets"][0] == {
+        "name": "기관 일지", "max_row": 9, "max_column": 2, "row_count": 7
+    }
+
+
+def test_row_group_segments(tmp_path):
+    """행 묶음 조각이 시트/행 범위를 담고 청크와 한 개씩 대응하는지 테스트"""
+    path = tmp_path / "log.xlsx"
+    _write_workbook(path)
+    parser = ExcelParser(max_rows=1)
+    
+    with parser.open_context(str(path)) as context:
+        segments = list(parser.iter_segments(context))
+    with parser.open_context(str(path)) as context:
+        chunks = list(parser.iter_chunks(context))
+    
+    assert [segment.metadata for segment in segments] == [
+        {"sheet": "점검", "row_start": 1, "row_end": 1},
+        {"sheet": "점검", "row_start": 2, "row_end": 2}
+    ]
+    assert [segment.text for segment in segments] == [chunk.content for chunk in chunks]
+    assert segments[1].text == "시트: 점검\n항목 | 주기\n주기관 | 500시간"
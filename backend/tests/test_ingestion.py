@@ -0,0 +1,236 @@
+"""
+문서 처리 작업 큐 테스트
+"""
+import asyncio
+import os
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.models.database import Base, Document, DocumentChunk, IngestionJob
+from app.parsers.base import ContentChunk, DocumentMetadata, DocumentParser, SpilledDocument, spill_chunks
+from app.services import ingestion_worker
+from app.services.ingestion_service import IngestionService
+from app.services.ingestion_worker import IngestionWorker
+from tests.test_pdf_parser import _write_pdf
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    """작업 스레드에서도 같은 인메모리 DB를 쓰는 세션 팩토리"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(settings, "SUMMARY_PREGENERATE_TYPES", [])
+    monkeypatch.setattr(settings, "INGESTION_RETRY_BACKOFF", 0.0)
+    monkeypatch.setattr(settings, "INGESTION_SPILL_DIR", str(tmp_path / "spill"))
+    return sessionmaker(bind=engine)
+
+
+def _parsed(file_path, spill_dir=None):
+    chunk_path, chunk_count = spill_chunks([
+        ContentChunk(content="주기관 점검 주기는 500시간이다.", chunk_index=0, page_number=1),
+        ContentChunk(content="연료 필터는 매월 교체한다.", chunk_index=1, page_number=2)
+    ], spill_dir)
+    return SpilledDocument(
+        filename="manual.pdf",
+        file_type="pdf",
+        metadata=DocumentMetadata(title="매뉴얼"),
+        structure={},
+        chunk_path=chunk_path,
+        chunk_count=chunk_count
+    )
+
+
+def _document(session_factory, file_path="/tmp/manual.pdf"):
+    db = session_factory()
+    document = Document(filename="manual.pdf", file_type="pdf", file_path=file_path, file_size=1)
+    db.add(document)
+    db.commit()
+    document_id = document.id
+    db.close()
+    return document_id
+
+
+def _run(worker):
+    async def run():
+        await worker.run_pending()
+        await worker.stop()
+    asyncio.run(run())
+
+
+def test_pipeline_job_parses_and_indexes(session_factory, rag_engine, monkeypatch):
+    """파이프라인 작업이 파싱과 인덱싱을 끝내고 완료되는지 테스트"""
+    monkeypatch.setattr(ingestion_worker, "parse_file_to_spill", _parsed)
+    document_id = _document(session_factory)
+    
+    db = session_factory()
+    job = IngestionService(db).enqueue(document_id)
+    assert IngestionService(db).enqueue(document_id).id == job.id  # 중복 등록 방지
+    
+    _run(IngestionWorker(session_factory, rag_engine, concurrency=1, parse_processes=0))
+    
+    db.expire_all()
+    job = db.query(IngestionJob).one()
+    document = db.query(Document).one()
+    assert (job.status, job.progress, job.attempts) == ("completed", 100, 1)
+    assert document.is_parsed and document.is_indexed
+    assert db.query(DocumentChunk).count() == 2
+    assert rag_engine.semantic_search("점검 주기", top_k=1)
+    db.close()
+    rag_engine.close()
+
+
+def test_failed_job_retried_then_failed(session_factory, tmp_path, monkeypatch):
+    """일시적 오류는 최대 시도 횟수까지 재시도한 뒤 실패로 기록되는지 테스트"""
+    calls = []
+    
+    def broken(file_path, spill_dir=None):
+        calls.append(file_path)
+        raise RuntimeError("파서 오류")
+    
+    monkeypatch.setattr(ingestion_worker, "parse_file_to_spill", broken)
+    document_id = _document(session_factory)
+    db = session_factory()
+    job = IngestionService(db).enqueue(document_id, "parse")
+    
+    worker = IngestionWorker(session_factory, rag_engine=object(), concurrency=1, parse_processes=0)
+    _run(worker)
+    
+    db.expire_all()
+    job = db.query(IngestionJob).one()
+    assert len(calls) == job.max_attempts == settings.INGESTION_MAX_ATTEMPTS
+    assert (job.status, job.error_message) == ("failed", "파서 오류")
+    assert worker.get_stats()["retried"] == job.max_attempts - 1
+    
+    # 다시 실행하면 처음부터 시도
+    monkeypatch.setattr(ingestion_worker, "parse_file_to_spill", _parsed)
+    IngestionService(db).retry(job.id)
+    _run(IngestionWorker(session_factory, rag_engine=object(), concurrency=1, parse_processes=0))
+    db.expire_all()
+    assert db.query(IngestionJob).one().status == "completed"
+    db.close()
+
+
+def test_cancel_pending_and_running(session_factory, monkeypatch):
+    """대기 작업은 바로 취소되고 실행 중 작업은 다음 단계 전에 중단되는지 테스트"""
+    document_id = _document(session_factory)
+    db = session_factory()
+    service = IngestionService(db)
+    
+    pending = service.enqueue(document_id, "index")
+    assert service.cancel(pending.id).status == "cancelled"
+    with pytest.raises(ValueError):
+        service.cancel(pending.id)
+    
+    running = service.enqueue(document_id, "pipeline")
+    
+    def parse_then_cancel(file_path, spill_dir=None):
+        other = session_factory()
+        IngestionService(other).cancel(running.id)
+        other.close()
+        return _parsed(file_path, spill_dir)
+    
+    monkeypatch.setattr(ingestion_worker, "parse_file_to_spill", parse_then_cancel)
+    _run(IngestionWorker(session_factory, rag_engine=object(), concurrency=1, parse_processes=0))
+    
+    db.expire_all()
+    job = db.query(IngestionJob).filter(IngestionJob.id == running.id).one()
+    assert (job.status, job.stage) == ("cancelled", "parse")
+    assert not db.query(Document).one().is_parsed
+    assert not os.listdir(settings.INGESTION_SPILL_DIR)  # 저장하지 않은 청크 파일도 삭제
+    db.close()
+
+
+def test_worker_streams_chunks_from_parse(session_factory, tmp_path, monkeypatch):
+    """워커가 전체 파싱 결과를 만들지 않고 청크 파일을 통해 저장하는지 테스트"""
+    def no_full_parse(self, context):
+        raise AssertionError("전체 파싱 결과를 만들면 안 됨")
+    
+    monkeypatch.setattr(DocumentParser, "parse_context", no_full_parse)
+    path = tmp_path / "manual.pdf"
+    _write_pdf(path, [f"Page {i} maintenance step {'x' * 300}" for i in range(1, 6)])
+    document_id = _document(session_factory, str(path))
+    db = session_factory()
+    IngestionService(db).enqueue(document_id, "parse")
+    
+    _run(IngestionWorker(session_factory, rag_engine=object(), concurrency=1, parse_processes=0))
+    
+    db.expire_all()
+    document = db.query(Document).one()
+    chunks = db.query(DocumentChunk).order_by(DocumentChunk.chunk_index).all()
+    assert db.query(IngestionJob).one().status == "completed"
+    assert document.is_parsed
+    assert "full_text" not in document.parsed_content
+    assert document.parsed_content["metadata"]["page_count"] == 5
+    assert [chunk.chunk_index for chunk in chunks] == list(range(len(chunks)))
+    assert "Page 5 maintenance step" in chunks[-1].content
+    assert not os.listdir(settings.INGESTION_SPILL_DIR)
+    db.close()
+
+
+def test_queue_updates_run_off_event_loop(session_factory, monkeypatch):
+    """작업 상태 조회/갱신이 이벤트 루프 스레드에서 DB에 접근하지 않는지 테스트"""
+    monkeypatch.setattr(ingestion_worker, "parse_file_to_spill", _parsed)
+    document_id = _document(session_factory)
+    db = session_factory()
+    IngestionService(db).enqueue(document_id, "parse")
+    threads = []
+    
+    def recording_factory():
+        threads.append(threading.current_thread().name)
+        return session_factory()
+    
+    _run(IngestionWorker(recording_factory, rag_engine=object(), concurrency=1, parse_processes=0))
+    
+    db.expire_all()
+    assert db.query(IngestionJob).one().status == "completed"
+    assert threads and threading.main_thread().name not in threads
+    assert any(name.startswith("ingest-queue") for name in threads)
+    db.close()
+
+
+def test_read_only_process_does_not_claim_jobs(session_factory, monkeypatch):
+    """벡터 저장소가 읽기 전용인 프로세스의 워커는 작업을 가져가지 않는지 테스트"""
+    class ReadOnlyEngine:
+        read_only = True
+    
+    monkeypatch.setattr(ingestion_worker, "parse_file_to_spill", _parsed)
+    document_id = _document(session_factory)
+    db = session_factory()
+    IngestionService(db).enqueue(document_id, "parse")
+    
+    _run(IngestionWorker(session_factory, rag_engine=ReadOnlyEngine(), concurrency=1, parse_processes=0))
+    db.expire_all()
+    assert db.query(IngestionJob).one().status == "pending"
+    
+    _run(IngestionWorker(session_factory, rag_engine=object(), concurrency=1, parse_processes=0))
+    db.expire_all()
+    assert db.query(IngestionJob).one().status == "completed"
+    db.close()
+
+
+def test_delete_job_removes_document(session_factory, rag_engine, monkeypatch):
+    """기록 프로세스에 넘긴 삭제 작업이 문서와 벡터를 지우는지 테스트"""
+    monkeypatch.setattr(ingestion_worker, "parse_file_to_spill", _parsed)
+    document_id = _document(session_factory)
+    db = session_factory()
+    IngestionService(db).enqueue(document_id)
+    _run(IngestionWorker(session_factory, rag_engine, concurrency=1, parse_processes=0))
+    assert rag_engine.get_stats()["total_vectors"] == 2
+    
+    IngestionService(db).enqueue(document_id, "delete")
+    _run(IngestionWorker(session_factory, rag_engine, concurrency=1, parse_processes=0))
+    db.expire_all()
+    assert db.query(Document).count() == 0
+    assert db.query(IngestionJob).count() == 0
+    assert rag_engine.get_stats()["total_vectors"] == 0
+    db.close()
+    rag_engine.close()
@@ -0,0 +1,95 @@
+"""
+BM25 어휘 색인 및 결합 검색 테스트
+"""
+import asyncio
+
+from app.ai.lexical_index import BM25Index, tokenize
+from app.ai.rag_engine import reciprocal_rank_fusion
+
+
+def test_tokenize_korean_and_codes():
+    """한글 2-gram과 부품 번호/알람 코드 토큰화 테스트"""
+    tokens = tokenize("연료펌프를 ME-1234로 교체")
+    
+    assert {"연료", "료펌", "펌프", "프를"} <= set(tokens)
+    assert {"me-1234", "me", "1234", "교체"} <= set(tokens)
+    # 조사가 붙어도 어간 토큰이 일치
+    assert set(tokenize("펌프")) <= set(tokens)
+
+
+def test_bm25_ranks_exact_code_and_supports_removal():
+    """정확한 코드가 있는 청크가 먼저 나오고 삭제가 반영되는지 테스트"""
+    index = BM25Index()
+    index.add([1, 2, 3], [
+        "알람 ALM-0021 발생 시 냉각수 펌프 점검",
+        "냉각수 펌프 정기 점검 절차",
+        "연료 필터 교체"
+    ])
+    
+    scores = index.scores("ALM-0021 알람")
+    assert max(scores, key=scores.get) == 1
+    assert 3 not in scores
+    
+    index.remove([1])
+    assert 1 not in index.scores("ALM-0021")
+    assert index.get_stats()["chunks"] == 2
+
+
+def test_reciprocal_rank_fusion_weights():
+    """두 목록에 모두 나온 항목이 먼저 오고 가중치가 반영되는지 테스트"""
+    vector = [(1, 0.9, {}), (2, 0.8, {})]
+    lexical = [(3, 12.0, {}), (2, 7.0, {})]
+    
+    fused = reciprocal_rank_fusion({"vector": vector, "lexical": lexical}, {"vector": 1.0, "lexical": 1.0})
+    assert [vector_id for vector_id, _, _ in fused][0] == 2
+    assert fused[0][2] == {"vector_score": 0.8, "lexical_score": 7.0}
+    assert 0 < fused[-1][1] < fused[0][1] <= 1
+    
+    lexical_only = reciprocal_rank_fusion({"vector": vector, "lexical": lexical}, {"vector": 0.0, "lexical": 1.0})
+    assert lexical_only[0][0] == 3
+
+
+def test_hybrid_search_finds_exact_code(rag_engine):
+    """임베딩으로 찾기 어려운 알람 코드를 결합 검색이 찾고 필터를 지키는지 테스트"""
+    rag_engine.index_document("doc-1", [
+        {"content": f"주기관 정비 일반 사항 {i}", "chunk_index": i} for i in range(8)
+    ])
+    rag_engine.index_document("doc-2", [{"content": "알람 ALM-0021 발생 시 냉각수 펌프 점검", "chunk_index": 0}])
+    
+    results = asyncio.run(rag_engine.hybrid_search_async("ALM-0021", top_k=3, mode="lexical"))
+    assert results[0].document_id == "doc-2"
+    assert "ALM-0021" in results[0].content
+    
+    results = asyncio.run(rag_engine.hybrid_search_async("ALM-0021 조치", top_k=3, min_score=-1.0))
+    assert results[0].document_id == "doc-2"
+    assert "lexical_score" in results[0].metadata
+    
+    # 색인 구성 이후 추가/삭제도 반영
+    rag_engine.index_document("doc-3", [{"content": "ALM-0021 센서 교정", "chunk_index": 0}])
+    rag_engine.delete_document("doc-2")
+    filtered = asyncio.run(rag_engine.hybrid_search_async(
+        "ALM-0021", top_k=3, filter_dict={"document_id": ["doc-1", "doc-3"]}, mode="lexical"
+    ))
+    assert [r.document_id for r in filtered] == ["doc-3"]
+
+
+def test_lexical_index_builds_in_background(rag_engine):
+    """BM25 색인 구성 전에는 하이브리드 검색이 의미 검색 결과만 쓰고, 구성 중 변경도 반영하는지 테스트"""
+    rag_engine.index_document("doc-1", [{"content": "알람 ALM-0021 냉각수 펌프 점검", "chunk_index": 0}])
+    store = rag_engine.vector_store
+    
+    # 구성 중(색인 스레드가 본문을 읽는 사이) 문서 추가/삭제
+    get_many = store.text_store.get_many
+    def get_many_during_change(ids):
+        store.text_store.get_many = get_many
+        rag_engine.index_document("doc-2", [{"content": "ALM-0021 센서 교정", "chunk_index": 0}])
+        rag_engine.delete_document("doc-1")
+        return get_many(ids)
+    store.text_store.get_many = get_many_during_change
+    
+    assert store.lexical_search("ALM-0021", top_k=3, wait=False) == []
+    store._lexical_build.join()
+    
+    results = store.lexical_search("ALM-0021", top_k=3, wait=False)
+    assert [m["document_id"] for _, _, m in results] == ["doc-2"]
+    assert store.get_stats()["lexical_index"]["chunks"] == 1
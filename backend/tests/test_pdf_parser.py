@@ -0,0 +1,107 @@
+"""
+PDF 파서 테스트
+"""
+import pdfplumber
+import pytest
+
+from app.parsers import pdf_parser
+from app.parsers.pdf_parser import PDFParser, page_ranges
+
+
+def _write_pdf(path, page_texts):
+    """페이지마다 한 줄의 텍스트가 있는 최소 PDF 생성"""
+    page_count = len(page_texts)
+    font_id = 3 + page_count * 2
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{3 + i * 2} 0 R" for i in range(page_count)), page_count
+        )
+    ]
+    for i, text in enumerate(page_texts):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + i * 2} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        data += f"{offset:010d} 00000 n \n".encode("latin-1")
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    path.write_bytes(data)
+
+
+def test_page_ranges():
+    """페이지를 빠짐없이 연속된 범위로 나누는지 테스트"""
+    assert page_ranges(10, 3) == [(1, 4), (5, 7), (8, 10)]
+    assert page_ranges(2, 8) == [(1, 1), (2, 2)]
+    assert page_ranges(0, 4) == [(1, 0)]
+
+
+def test_parallel_extraction_matches_sequential(tmp_path):
+    """여러 프로세스로 추출한 결과가 순차 추출과 같고 페이지 위치가 정확한지 테스트"""
+    path = tmp_path / "manual.pdf"
+    texts = [f"Page {i} maintenance step {'x' * (i * 40)}" for i in range(1, 13)]
+    _write_pdf(path, texts)
+    
+    sequential = PDFParser(max_workers=1).parse(str(path))
+    parallel = PDFParser(max_workers=3, parallel_min_pages=2).parse(str(path))
+    
+    assert parallel.full_text == sequential.full_text
+    assert parallel.structure == sequential.structure
+    assert [chunk.page_number for chunk in parallel.chunks] == [
+        chunk.page_number for chunk in sequential.chunks
+    ]
+    
+    pages = parallel.structure["pages"]
+    assert [page["page_number"] for page in pages] == list(range(1, 13))
+    for page, text in zip(pages, texts):
+        assert parallel.full_text[page["start"]:page["end"]] == text
+    for chunk in parallel.chunks:
+        page = pages[chunk.page_number - 1]
+        assert page["start"] <= chunk.metadata["start"] <= page["end"]
+
+
+def test_page_pool_is_shared_and_skipped_in_worker_process(tmp_path, monkeypatch):
+    """추출 프로세스 풀을 파싱마다 만들지 않고, 작업 프로세스 안에서는 순차 추출하는지 테스트"""
+    path = tmp_path / "manual.pdf"
+    _write_pdf(path, [f"Page {i}" for i in range(1, 7)])
+    
+    parser = PDFParser(max_workers=2, parallel_min_pages=2)
+    first = parser.parse(str(path))
+    pool = pdf_parser._page_pools[2]
+    assert parser.parse(str(path)).full_text == first.full_text
+    assert pdf_parser._page_pools[2] is pool
+    
+    # 문서 처리 워커의 파싱 프로세스 안에서는 프로세스를 더 만들지 않음
+    monkeypatch.setattr(pdf_parser.multiprocessing, "parent_process", lambda: object())
+    monkeypatch.setattr(pdf_parser, "_page_pool", lambda max_workers: pytest.fail("중첩 프로세스 풀 생성"))
+    assert parser.parse(str(path)).full_text == first.full_text
+
+
+def test_parse_opens_file_once(tmp_path, monkeypatch):
+    """메타데이터와 본문을 한 번 연 문서에서 추출하는지 테스트"""
+    path = tmp_path / "manual.pdf"
+    _write_pdf(path, ["Page 1 intro", "Page 2 steps"])
+    opened = []
+    original_open = pdfplumber.open
+    
+    def counting_open(*args, **kwargs):
+        opened.append(args[0])
+        return original_open(*args, **kwargs)
+    
+    monkeypatch.setattr(pdf_parser.pdfplumber, "open", counting_open)
+    parsed = PDFParser(max_workers=1).parse(str(path))
+    
+    assert len(opened) == 1
+    assert parsed.metadata.page_count == 2
+    assert "Page 2 steps" in parsed.full_text
@@ -0,0 +1,87 @@
+"""
+권한 기반 검색 범위 테스트
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.database import User, Document
+from app.services.permission_service import PermissionService, invalidate_permission_cache
+from app.services.search_service import SearchService
+
+
+@pytest.fixture
+def db():
+    """인메모리 테스트 데이터베이스"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    invalidate_permission_cache()
+    yield session
+    session.close()
+    invalidate_permission_cache()
+
+
+def _user(db, username, role="user"):
+    user = User(username=username, email=f"{username}@example.com", password_hash="x", role=role)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _document(db, owner):
+    document = Document(filename="manual.pdf", file_type="pdf", file_path="/tmp/manual.pdf",
+                        file_size=1, created_by=owner.id)
+    db.add(document)
+    db.commit()
+    return document
+
+
+def test_readable_document_ids(db):
+    """소유, 사용자별, 역할별 읽기 권한이 일괄 계산되는지 테스트"""
+    owner = _user(db, "owner")
+    reader = _user(db, "reader", role="crew")
+    admin = _user(db, "admin", role="admin")
+    own_doc = _document(db, owner)
+    shared_doc = _document(db, owner)
+    role_doc = _document(db, owner)
+    _document(db, owner)
+    
+    service = PermissionService(db)
+    service.set_permission(shared_doc.id, user_id=reader.id, permission_type="read")
+    service.set_permission(role_doc.id, role="crew", permission_type="read")
+    service.set_permission(own_doc.id, user_id=reader.id, permission_type="write")
+    
+    assert service.get_readable_document_ids(reader.id) == {shared_doc.id, role_doc.id}
+    assert len(service.get_readable_document_ids(owner.id)) == 4
+    assert service.get_readable_document_ids(admin.id) is None
+    for doc_id in (own_doc.id, shared_doc.id, role_doc.id):
+        expected = doc_id in service.get_readable_document_ids(reader.id)
+        assert service.check_permission(reader.id, doc_id, "read") == expected
+
+
+def test_readable_cache_invalidated_on_change(db):
+    """권한 변경 시 캐시가 무효화되는지 테스트"""
+    owner = _user(db, "owner")
+    reader = _user(db, "reader")
+    document = _document(db, owner)
+    service = PermissionService(db)
+    
+    assert service.get_readable_document_ids(reader.id) == frozenset()
+    permission = service.set_permission(document.id, user_id=reader.id, permission_type="read")
+    assert service.get_readable_document_ids(reader.id) == {document.id}
+    service.delete_permission(permission.id)
+    assert service.get_readable_document_ids(reader.id) == frozenset()
+
+
+def test_restrict_filter_to_readable_documents():
+    """검색 필터가 읽기 가능한 문서로 제한되는지 테스트"""
+    readable = frozenset({"doc-1", "doc-2"})
+    
+    assert SearchService._restrict_to_documents({"page_number": 1}, None) == {"page_number": 1}
+    restricted = SearchService._restrict_to_documents({"page_number": 1}, readable)
+    assert sorted(restricted["document_id"]) == ["doc-1", "doc-2"]
+    assert SearchService._restrict_to_documents({"document_id": "doc-2"}, readable)["document_id"] == ["doc-2"]
+    assert SearchService._restrict_to_documents({"document_id": "doc-3"}, readable) is None
+    assert SearchService._restrict_to_documents(None, frozenset()) is None
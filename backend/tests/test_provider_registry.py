@@ -0,0 +1,154 @@
+"""
+LLM 프로바이더 레지스트리 테스트
+"""
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.ai import provider_registry
+from app.ai.llm_providers import OllamaProvider, OpenAIProvider
+from app.ai.provider_registry import LLMProviderRegistry
+from app.models.database import Base
+from app.services.llm_service import LLMService
+from app.services.provider_service import ProviderService
+
+
+def _registry(connections):
+    """요청 호스트를 기록하는 모의 전송 계층을 쓰는 레지스트리"""
+    def handler(request):
+        connections.append(request.url.host)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "답변"}}]})
+    
+    return LLMProviderRegistry(
+        client_factory=lambda **kwargs: httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), **kwargs
+        )
+    )
+
+
+def test_registry_reuses_provider_until_version_changes():
+    """설정이 같으면 인스턴스를 재사용하고 바뀌면 다시 만드는지 테스트"""
+    registry = _registry([])
+    loads = []
+    
+    def loader():
+        loads.append(1)
+        return "key"
+    
+    first = registry.get("p1", ("openai", None, "gpt", "enc1"), "openai", model="gpt", api_key_loader=loader)
+    second = registry.get("p1", ("openai", None, "gpt", "enc1"), "openai", model="gpt", api_key_loader=loader)
+    assert isinstance(first, OpenAIProvider)
+    assert first is second
+    assert len(loads) == 1
+    
+    third = registry.get("p1", ("openai", None, "gpt", "enc2"), "openai", model="gpt", api_key_loader=loader)
+    assert third is not first
+    assert len(loads) == 2
+    # 접속 주소가 같으면 커넥션 풀은 그대로 사용
+    assert third.client is first.client
+    assert registry.get_stats()["clients"] == 1
+    asyncio.run(registry.close())
+
+
+def test_registry_shares_client_across_requests():
+    """여러 요청이 하나의 공유 클라이언트를 사용하는지 테스트"""
+    hosts = []
+    registry = _registry(hosts)
+    provider = registry.get("p1", "v1", "openai", model="gpt", api_key_loader=lambda: "key")
+    
+    async def run():
+        return await asyncio.gather(*(provider.generate("질문") for _ in range(3)))
+    
+    assert asyncio.run(run()) == ["답변"] * 3
+    assert hosts == ["api.openai.com"] * 3
+    assert not provider.client.is_closed
+    
+    asyncio.run(registry.close())
+    assert provider.client.is_closed
+
+
+def test_registry_client_options(monkeypatch):
+    """커넥션 풀/타임아웃 설정이 적용되는지 테스트"""
+    options = []
+    registry = LLMProviderRegistry(
+        client_factory=lambda **kwargs: options.append(kwargs) or httpx.AsyncClient(**kwargs)
+    )
+    monkeypatch.setattr(provider_registry.settings, "LLM_HTTP_TIMEOUT", 30.0)
+    monkeypatch.setattr(provider_registry.settings, "OLLAMA_HTTP_TIMEOUT", 90.0)
+    
+    registry.get("cloud", "v", "claude", api_key_loader=lambda: "key")
+    local = registry.get("local", "v", "ollama", base_url="http://ollama:11434")
+    
+    assert isinstance(local, OllamaProvider)
+    assert options[0]["timeout"].read == 30.0
+    assert options[1]["timeout"].read == 90.0
+    assert options[1]["http2"] is False
+    assert isinstance(options[0]["limits"], httpx.Limits)
+    asyncio.run(registry.close())
+
+
+def test_registry_without_api_key_returns_none():
+    """API 키가 없는 클라우드 프로바이더는 캐시하지 않는지 테스트"""
+    registry = _registry([])
+    assert registry.get("p1", "v", "openai") is None
+    assert registry.get_stats()["providers"] == 0
+    asyncio.run(registry.close())
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    monkeypatch.setenv("ENCRYPTION_KEY", "dGVzdC1rZXktMDEyMzQ1Njc4OWFiY2RlZmdoaWprbG0=")
+    monkeypatch.setattr(provider_registry, "_registry", _registry([]))
+    yield session
+    session.close()
+
+
+def test_llm_service_reuses_provider_until_updated(db):
+    """LLMService가 프로바이더를 재사용하고 설정 변경 시 다시 만드는지 테스트"""
+    providers = ProviderService(db)
+    providers.create_or_update_provider("openai", api_key="key-1", model_name="gpt-4")
+    service = LLMService(db)
+    
+    first = service.get_provider()
+    assert first.api_key == "key-1"
+    assert service.get_provider() is first
+    
+    providers.create_or_update_provider("openai", api_key="key-2", model_name="gpt-4")
+    second = service.get_provider()
+    assert second is not first
+    assert second.api_key == "key-2"
+    assert second.client is first.client
+    
+    record = providers.get_providers()[0]
+    providers.toggle_provider_status(record["id"])
+    # 비활성화되면 기본 Ollama 프로바이더 사용
+    assert isinstance(service.get_provider(), OllamaProvider)
+    asyncio.run(provider_registry.get_provider_registry().close())
+
+
+def test_retired_client_closed_after_in_flight_requests():
+    """접속 주소가 바뀌어 교체된 클라이언트를 진행 중인 요청이 끝난 뒤 닫는지 테스트"""
+    registry = _registry([])
+    
+    async def run():
+        old = registry.get("p1", "v1", "ollama", base_url="http://a:11434", model="m")
+        async with old._session():
+            registry.get("p1", "v2", "ollama", base_url="http://b:11434", model="m")
+            registry.get("p1", "v2", "ollama", base_url="http://b:11434", model="m")
+            await asyncio.sleep(0)
+            assert not old.client.is_closed  # 요청 진행 중
+            assert registry.get_stats()["retired_clients"] == 1
+        
+        registry.get("p1", "v2", "ollama", base_url="http://b:11434", model="m")
+        await asyncio.sleep(0)
+        assert old.client.is_closed
+        assert registry.get_stats()["retired_clients"] == 0
+        await registry.close()
+    
+    asyncio.run(run())
@@ -0,0 +1,77 @@
+"""
+RAG 동기화 서비스 테스트
+"""
+import os
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import Base, RAGSync
+from app.services import rag_sync_service
+from app.services.rag_sync_service import RAGSyncConflict, RAGSyncService
+
+
+def _sync_record():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    sync = RAGSync(sync_type="import", source_system="main", target_system="ship", status="pending")
+    db.add(sync)
+    db.commit()
+    return db, sync
+
+
+def test_import_replaces_files_without_overwriting(tmp_path, monkeypatch):
+    """가져오기가 열린 파일을 덮어쓰지 않고 교체하며 청크 본문 세대를 한 벌로 바꾸는지 테스트"""
+    local = tmp_path / "local"
+    source = tmp_path / "source"
+    local.mkdir()
+    source.mkdir()
+    for name, data in [("faiss.index", b"old"), ("chunk_text.idx", b"old"), ("chunk_text.0.dat", b"old")]:
+        (local / name).write_bytes(data)
+    for name in ["faiss.index", "metadata.cols", "chunk_text.idx", "chunk_text.1.dat"]:
+        (source / name).write_bytes(b"new")
+    
+    db, sync = _sync_record()
+    
+    reloaded = []
+    monkeypatch.setattr(rag_sync_service, "get_rag_engine", lambda: SimpleNamespace(read_only=False))
+    monkeypatch.setattr(rag_sync_service, "reload_rag_engine", lambda **kwargs: reloaded.append(kwargs))
+    service = RAGSyncService(db)
+    service.vector_db_path = str(local)
+    
+    with open(local / "faiss.index", "rb") as opened:
+        result = service.import_rag(sync.id, str(source))
+        assert opened.read() == b"old"  # 교체 전 파일을 연 쪽은 이전 내용 유지
+    
+    assert result["status"] == "completed"
+    assert reloaded == [{"discard_log": True}]
+    assert sorted(os.listdir(local)) == ["chunk_text.1.dat", "chunk_text.idx", "faiss.index", "metadata.cols"]
+    assert all((local / name).read_bytes() == b"new" for name in os.listdir(local))
+    db.close()
+
+
+def test_import_rejected_in_read_only_process(tmp_path, monkeypatch):
+    """벡터 저장소가 읽기 전용인 프로세스에서는 파일을 바꾸기 전에 가져오기를 거부하는지 테스트"""
+    local = tmp_path / "local"
+    source = tmp_path / "source"
+    local.mkdir()
+    source.mkdir()
+    (local / "faiss.index").write_bytes(b"old")
+    (source / "faiss.index").write_bytes(b"new")
+    db, sync = _sync_record()
+    
+    monkeypatch.setattr(rag_sync_service, "get_rag_engine", lambda: SimpleNamespace(read_only=True))
+    service = RAGSyncService(db)
+    service.vector_db_path = str(local)
+    
+    with pytest.raises(RAGSyncConflict):
+        service.import_rag(sync.id, str(source))
+    with pytest.raises(RAGSyncConflict):
+        service.export_rag("ship")
+    assert (local / "faiss.index").read_bytes() == b"old"
+    db.refresh(sync)
+    assert sync.status == "pending"
+    db.close()
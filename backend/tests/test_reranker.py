@@ -0,0 +1,97 @@
+"""
+크로스 인코더 재순위화 테스트
+"""
+import asyncio
+import time
+
+from app.ai.rag_engine import RAGSearchEngine, SearchResult
+from app.ai.reranker import CrossEncoderReranker
+from tests.conftest import FakeEmbeddingGenerator
+
+
+class KeywordScorer:
+    """본문에 키워드가 있으면 높은 점수를 주는 테스트용 점수 함수"""
+    
+    def __init__(self, keyword: str, delay: float = 0.0):
+        self.keyword = keyword
+        self.delay = delay
+        self.scored = 0
+    
+    def __call__(self, pairs):
+        time.sleep(self.delay)
+        self.scored += len(pairs)
+        return [5.0 if self.keyword in content else -5.0 for _, content in pairs]
+
+
+def _results(contents):
+    return [
+        SearchResult(content=c, score=1.0 - i * 0.1, document_id="doc-1", chunk_index=i, metadata={})
+        for i, c in enumerate(contents)
+    ]
+
+
+def test_rerank_orders_by_cross_encoder_and_caches():
+    """크로스 인코더 점수순 정렬과 (쿼리, 청크) 점수 캐시 테스트"""
+    scorer = KeywordScorer("밸브")
+    reranker = CrossEncoderReranker(scorer=scorer, batch_size=2, budget_ms=0)
+    results = _results(["엔진 개요", "연료 펌프", "밸브 간극 조정", "냉각수"])
+    
+    reranked = reranker.rerank("밸브 조정", results, top_k=2)
+    assert reranked[0].content == "밸브 간극 조정"
+    assert reranked[0].score > 0.99 and reranked[0].metadata["retrieval_score"] == results[2].score
+    assert len(reranked) == 2
+    
+    reranker.rerank("밸브  조정", results, top_k=2)
+    assert scorer.scored == 4
+    assert reranker.get_stats()["cache_hits"] == 4
+
+
+def test_rerank_falls_back_to_retrieval_order_over_budget():
+    """시간 예산을 넘기면 검색 순서를 그대로 쓰는지 테스트"""
+    reranker = CrossEncoderReranker(scorer=KeywordScorer("밸브", delay=0.05), batch_size=1, budget_ms=10)
+    results = _results(["엔진 개요", "연료 펌프", "밸브 간극 조정"])
+    
+    reranked = reranker.rerank("밸브", results, top_k=2)
+    assert [r.content for r in reranked] == ["엔진 개요", "연료 펌프"]
+    assert reranker.get_stats()["fallbacks"] == 1
+
+
+def test_rerank_stops_before_exceeding_budget():
+    """측정한 쌍당 계산 시간으로 남은 후보가 예산을 넘길지 미리 판단하는지 테스트"""
+    scorer = KeywordScorer("밸브", delay=0.03)
+    reranker = CrossEncoderReranker(scorer=scorer, batch_size=10, budget_ms=100)
+    results = _results([f"청크 {i}" for i in range(20)])
+    
+    started = time.monotonic()
+    reranked = reranker.rerank("밸브", results, top_k=3)
+    assert time.monotonic() - started < 0.1
+    assert [r.content for r in reranked] == ["청크 0", "청크 1", "청크 2"]
+    # 첫 배치는 측정용 작은 배치만 계산
+    assert scorer.scored == CrossEncoderReranker.PROBE_PAIRS
+    assert reranker.get_stats()["fallbacks"] == 1
+    
+    # 계산 시간이 예산 안이면 재순위화
+    fast = CrossEncoderReranker(scorer=KeywordScorer("밸브"), batch_size=10, budget_ms=100)
+    reranked = fast.rerank("밸브", _results(["엔진 개요", "밸브 간극 조정"]), top_k=1)
+    assert reranked[0].content == "밸브 간극 조정"
+    assert fast.get_stats()["fallbacks"] == 0
+
+
+def test_engine_overfetches_candidates_for_rerank(tmp_path, monkeypatch):
+    """재순위화 시 후보를 더 가져와 top_k개만 반환하는지 테스트"""
+    monkeypatch.setattr("app.core.config.settings.RERANK_CANDIDATES", 10)
+    scorer = KeywordScorer("정답")
+    engine = RAGSearchEngine(
+        str(tmp_path),
+        embedding_generator=FakeEmbeddingGenerator(),
+        reranker=CrossEncoderReranker(scorer=scorer, budget_ms=0)
+    )
+    chunks = [{"content": f"일반 내용 {i}", "chunk_index": i} for i in range(9)]
+    chunks.append({"content": "정답이 있는 청크", "chunk_index": 9})
+    engine.index_document("doc-1", chunks)
+    
+    results = asyncio.run(engine.semantic_search_async("질문", top_k=2, min_score=-1.0))
+    assert len(results) == 2
+    assert results[0].content == "정답이 있는 청크"
+    assert scorer.scored == 10
+    assert engine.get_stats()["reranker"]["reranked"] == 1
@@ -0,0 +1,146 @@
+"""
+LLM 응답 캐시 테스트
+"""
+import asyncio
+
+import numpy as np
+
+from app.ai.llm_providers import LLMProvider
+from app.ai.rag_engine import RAGSearchEngine, SearchResult
+from app.ai.response_cache import LLMResponseCache
+from app.ai.summarizer import DocumentSummarizer
+from app.parsers.base import DocumentMetadata, ParsedDocument
+from tests.conftest import FakeEmbeddingGenerator
+
+
+class CountingProvider(LLMProvider):
+    """호출 횟수를 세는 테스트용 프로바이더"""
+    
+    model = "counting"
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def generate(self, prompt, **kwargs):
+        self.calls += 1
+        return f"답변 {self.calls}"
+    
+    def is_available(self):
+        return True
+
+
+def _results(content="주기관 점검 주기는 500시간"):
+    return [SearchResult(content=content, score=0.9, document_id="doc-1", chunk_index=0, metadata={})]
+
+
+def test_exact_hit_and_scope():
+    """같은 범위의 정규화된 질문은 적중하고 컨텍스트가 바뀌면 빗나가는지 테스트"""
+    cache = LLMResponseCache(max_size=10, ttl_seconds=0)
+    provider = CountingProvider()
+    scope = LLMResponseCache.make_scope(provider, "t", ["doc-1:0"], ["본문"])
+    cache.put(scope, "점검 주기는?", "500시간", ["doc-1"])
+    
+    assert cache.get(scope, "  점검   주기는? ") == "500시간"
+    changed = LLMResponseCache.make_scope(provider, "t", ["doc-1:0"], ["바뀐 본문"])
+    assert cache.get(changed, "점검 주기는?") is None
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_ttl_and_size_eviction(monkeypatch):
+    """TTL 만료와 크기 초과 시 오래된 항목이 제거되는지 테스트"""
+    now = [100.0]
+    monkeypatch.setattr("app.ai.response_cache.time.monotonic", lambda: now[0])
+    cache = LLMResponseCache(max_size=2, ttl_seconds=10)
+    for query in ["a", "b", "c"]:
+        cache.put("scope", query, query.upper(), ["doc-1"])
+    
+    assert cache.get("scope", "a") is None
+    assert cache.get("scope", "c") == "C"
+    now[0] += 11
+    assert cache.get("scope", "c") is None
+    assert cache.get_stats()["size"] == 1  # 만료되었지만 조회되지 않은 "b"
+
+
+def test_invalidate_documents():
+    """문서 무효화 시 그 문서를 근거로 한 응답만 제거되는지 테스트"""
+    cache = LLMResponseCache(max_size=10, ttl_seconds=0)
+    cache.put("s1", "q", "A", ["doc-1", "doc-2"])
+    cache.put("s2", "q", "B", ["doc-3"])
+    
+    assert cache.invalidate_documents(["doc-2"]) == 1
+    assert cache.get("s1", "q") is None
+    assert cache.get("s2", "q") == "B"
+
+
+def test_semantic_match():
+    """의미 일치 모드에서 유사한 쿼리 임베딩의 응답을 재사용하는지 테스트"""
+    cache = LLMResponseCache(max_size=10, ttl_seconds=0, semantic=True, similarity_threshold=0.9)
+    base = np.array([1.0, 0.0, 0.0], dtype="float32")
+    cache.put("scope", "점검 주기는?", "500시간", ["doc-1"], base)
+    
+    similar = np.array([0.99, 0.05, 0.0], dtype="float32")
+    different = np.array([0.0, 1.0, 0.0], dtype="float32")
+    assert cache.get("scope", "점검 주기가 어떻게 되나요?", similar) == "500시간"
+    assert cache.get("scope", "연료 소모량은?", different) is None
+    assert cache.get("other-scope", "점검 주기가 어떻게 되나요?", similar) is None
+    assert cache.get_stats()["semantic_hits"] == 1
+
+
+def test_engine_answer_cached_until_reindex(tmp_path):
+    """답변이 캐시되고 문서를 재인덱싱하면 무효화되는지 테스트"""
+    cache = LLMResponseCache(max_size=10, ttl_seconds=0)
+    engine = RAGSearchEngine(
+        str(tmp_path), embedding_generator=FakeEmbeddingGenerator(), response_cache=cache
+    )
+    provider = CountingProvider()
+    
+    first = asyncio.run(engine.generate_answer("점검 주기", _results(), provider))
+    second = asyncio.run(engine.generate_answer("점검 주기", _results(), provider))
+    assert first.answer == second.answer == "답변 1"
+    assert provider.calls == 1
+    
+    engine.index_document("doc-1", [{"content": "주기관 점검 주기는 600시간", "chunk_index": 0}])
+    assert cache.get_stats()["size"] == 0
+    asyncio.run(engine.generate_answer("점검 주기", _results(), provider))
+    assert provider.calls == 2
+    engine.close()
+
+
+def test_engine_stream_uses_cache(tmp_path):
+    """스트리밍 답변도 완료 후 캐시되어 다음 요청에 재사용되는지 테스트"""
+    cache = LLMResponseCache(max_size=10, ttl_seconds=0)
+    engine = RAGSearchEngine(
+        str(tmp_path), embedding_generator=FakeEmbeddingGenerator(), response_cache=cache
+    )
+    provider = CountingProvider()
+    
+    async def collect():
+        return [text async for text in engine.stream_answer("점검 주기", _results(), provider)]
+    
+    assert asyncio.run(collect()) == ["답변 1"]
+    assert asyncio.run(collect()) == ["답변 1"]
+    assert provider.calls == 1
+    engine.close()
+
+
+def test_summary_cached_per_document():
+    """같은 문서/요약 타입의 요약이 캐시되는지 테스트"""
+    cache = LLMResponseCache(max_size=10, ttl_seconds=0)
+    summarizer = DocumentSummarizer(response_cache=cache)
+    provider = CountingProvider()
+    document = ParsedDocument(
+        filename="manual.pdf",
+        file_type="pdf",
+        metadata=DocumentMetadata(),
+        chunks=[],
+        full_text="주기관 점검 주기는 500시간이다."
+    )
+    
+    first = asyncio.run(summarizer.summarize_document(document, "core", provider, document_id="doc-1"))
+    second = asyncio.run(summarizer.summarize_document(document, "core", provider, document_id="doc-1"))
+    assert first.content == second.content
+    assert provider.calls == 1
+    
+    cache.invalidate_documents(["doc-1"])
+    asyncio.run(summarizer.summarize_document(document, "core", provider, document_id="doc-1"))
+    assert provider.calls == 2
@@ -0,0 +1,140 @@
+"""
+LLM 스트리밍 응답 테스트
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.ai import llm_providers
+from app.ai.llm_providers import ClaudeProvider, LLMProvider, OllamaProvider, OpenAIProvider
+from app.api.streaming import sse_event
+from app.core.database import Base
+from app.models.database import User
+from app.services.permission_service import invalidate_permission_cache
+from app.services.search_service import SearchService
+
+
+def _mock_client(monkeypatch, body: str):
+    """프로바이더의 httpx 클라이언트가 고정 응답을 받도록 교체"""
+    requests = []
+    
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, text=body)
+    
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        llm_providers.httpx, "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs)
+    )
+    return requests
+
+
+async def _collect(stream):
+    return [text async for text in stream]
+
+
+def test_openai_stream_parses_sse(monkeypatch):
+    """OpenAI 호환 SSE 응답을 조각 단위로 반환하는지 테스트"""
+    body = "".join(
+        f"data: {json.dumps({'choices': [{'delta': {'content': t}}]})}\n\n" for t in ["엔진", " 정비"]
+    ) + "data: [DONE]\n\n"
+    requests = _mock_client(monkeypatch, body)
+    
+    parts = asyncio.run(_collect(OpenAIProvider("key").stream("질문")))
+    assert parts == ["엔진", " 정비"]
+    assert requests[0]["stream"] is True
+
+
+def test_claude_stream_parses_content_deltas(monkeypatch):
+    """Claude 스트리밍 이벤트에서 텍스트 조각만 반환하는지 테스트"""
+    events = [
+        {"type": "message_start"},
+        {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "안전"}},
+        {"type": "content_block_delta", "delta": {"type": "text_delta", "text": " 점검"}},
+        {"type": "message_stop"}
+    ]
+    _mock_client(monkeypatch, "".join(f"event: x\ndata: {json.dumps(e)}\n\n" for e in events))
+    
+    assert asyncio.run(_collect(ClaudeProvider("key").stream("질문"))) == ["안전", " 점검"]
+
+
+def test_ollama_stream_parses_json_lines(monkeypatch):
+    """Ollama 줄 단위 JSON 응답을 조각 단위로 반환하는지 테스트"""
+    lines = [{"response": "연료", "done": False}, {"response": " 펌프", "done": False}, {"done": True}]
+    _mock_client(monkeypatch, "\n".join(json.dumps(line) for line in lines))
+    
+    assert asyncio.run(_collect(OllamaProvider().stream("질문"))) == ["연료", " 펌프"]
+
+
+def test_default_stream_falls_back_to_generate():
+    """스트리밍을 구현하지 않은 프로바이더는 전체 답변을 한 번에 반환하는지 테스트"""
+    class StaticProvider(LLMProvider):
+        async def generate(self, prompt, **kwargs):
+            return "전체 답변"
+        
+        def is_available(self):
+            return True
+    
+    assert asyncio.run(_collect(StaticProvider().stream("질문"))) == ["전체 답변"]
+
+
+def test_sse_event_format():
+    """SSE 이벤트 형식 테스트"""
+    assert sse_event("token", {"text": "답"}) == 'event: token\ndata: {"text": "답"}\n\n'
+
+
+class StreamingProvider(LLMProvider):
+    """고정된 조각을 스트리밍하는 테스트용 프로바이더"""
+    
+    def __init__(self):
+        self.prompts = []
+    
+    async def generate(self, prompt, **kwargs):
+        return "".join(await _collect(self.stream(prompt)))
+    
+    async def stream(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        for text in ["점검 ", "주기는 ", "500시간"]:
+            yield text
+    
+    def is_available(self):
+        return True
+
+
+@pytest.fixture
+def db():
+    """인메모리 테스트 데이터베이스"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    invalidate_permission_cache()
+    yield session
+    session.close()
+    invalidate_permission_cache()
+
+
+def test_search_stream_sends_results_then_tokens(db, rag_engine):
+    """검색 결과 이벤트 후 답변 조각과 완료 이벤트를 보내는지 테스트"""
+    admin = User(username="admin", email="admin@example.com", password_hash="x", role="admin")
+    db.add(admin)
+    db.commit()
+    rag_engine.index_document("doc-1", [{"content": "주기관 점검 주기는 500시간", "chunk_index": 0}])
+    
+    service = SearchService(db, rag_engine)
+    provider = StreamingProvider()
+    service.llm_service.get_provider = lambda **kwargs: provider
+    
+    async def run():
+        return [event async for event in service.search_stream("점검 주기", admin.id, min_score=-1.0)]
+    
+    events = asyncio.run(run())
+    names = [name for name, _ in events]
+    assert names == ["results", "token", "token", "token", "done"]
+    assert events[0][1]["results"][0]["content"] == "주기관 점검 주기는 500시간"
+    assert events[-1][1]["answer"] == "점검 주기는 500시간"
+    assert "주기관 점검 주기는 500시간" in provider.prompts[0]
@@ -0,0 +1,193 @@
+"""
+요약 저장/재사용 테스트
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.ai.llm_providers import LLMProvider
+from app.ai.response_cache import LLMResponseCache
+from app.ai.summarizer import DocumentSummarizer, split_sections
+from app.core.config import settings
+from app.models.database import Base, Document, DocumentChunk, DocumentSummary
+from app.parsers.base import DocumentMetadata, ParsedDocument
+from app.parsers.pdf_parser import PDFParser
+from app.services import document_service
+from app.services.document_service import DocumentService
+from app.services.summary_service import SummaryService
+from tests.test_pdf_parser import _write_pdf
+
+
+class CountingProvider(LLMProvider):
+    """호출 횟수를 세는 테스트용 프로바이더"""
+    
+    model = "counting"
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def generate(self, prompt, **kwargs):
+        self.calls += 1
+        return f"요약 {self.calls}"
+    
+    def is_available(self):
+        return True
+
+
+@pytest.fixture
+def db():
+    """인메모리 테스트 데이터베이스"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _document(db, text="주기관 점검 주기는 500시간이다."):
+    document = Document(
+        filename="manual.pdf",
+        file_type="pdf",
+        file_path="/nonexistent/manual.pdf",  # 원본 파일을 다시 파싱하면 실패
+        file_size=1,
+        is_parsed=True,
+        parsed_content={"full_text": text, "structure": {}, "metadata": {"title": "매뉴얼"}}
+    )
+    db.add(document)
+    db.commit()
+    return document
+
+
+def _service(db, provider):
+    """메모리 응답 캐시 없이 DB에 저장된 요약만 재사용하는 요약 서비스"""
+    service = SummaryService(db)
+    service.summarizer = DocumentSummarizer(response_cache=LLMResponseCache(max_size=0))
+    service.llm_service.get_provider = lambda **kwargs: provider
+    return service
+
+
+def test_summary_persisted_and_reused(db):
+    """저장된 요약을 원본 파일 재파싱이나 LLM 호출 없이 반환하는지 테스트"""
+    document = _document(db)
+    provider = CountingProvider()
+    
+    first = asyncio.run(_service(db, provider).summarize_document(document.id, "core"))
+    second = asyncio.run(_service(db, provider).summarize_document(document.id, "core"))
+    
+    assert first["content"] == second["content"] == "요약 1"
+    assert provider.calls == 1
+    stored = db.query(DocumentSummary).one()
+    assert stored.summary_type == "core"
+    assert stored.provider.startswith("CountingProvider|counting")
+    
+    asyncio.run(_service(db, provider).summarize_document(document.id, "detailed"))
+    assert provider.calls == 2
+
+
+def test_summary_regenerated_when_content_changes(db):
+    """본문이 바뀌면 새 요약을 생성하는지 테스트"""
+    document = _document(db)
+    provider = CountingProvider()
+    asyncio.run(_service(db, provider).summarize_document(document.id, "core"))
+    
+    document.parsed_content = {"full_text": "주기관 점검 주기는 600시간이다."}
+    db.commit()
+    result = asyncio.run(_service(db, provider).summarize_document(document.id, "core"))
+    assert result["content"] == "요약 2"
+
+
+def test_reparse_deletes_summaries(db, monkeypatch):
+    """문서를 다시 파싱하면 저장된 요약이 삭제되는지 테스트"""
+    document = _document(db)
+    asyncio.run(_service(db, CountingProvider()).summarize_document(document.id, "core"))
+    
+    parsed = ParsedDocument(
+        filename="manual.pdf", file_type="pdf", metadata=DocumentMetadata(),
+        chunks=[], full_text="새 본문"
+    )
+    monkeypatch.setattr(document_service.ParserFactory, "is_supported", lambda path: True)
+    DocumentService(db, rag_engine=object()).parse_document(document.id, parsed_doc=parsed)
+    
+    assert db.query(DocumentSummary).count() == 0
+
+
+class SlowProvider(LLMProvider):
+    """동시 실행 수와 프롬프트를 기록하는 테스트용 프로바이더"""
+    
+    model = "slow"
+    
+    def __init__(self):
+        self.prompts = []
+        self.running = 0
+        self.max_running = 0
+    
+    async def generate(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return f"요약{len(self.prompts)}"
+    
+    def is_available(self):
+        return True
+
+
+def test_split_sections():
+    """문단 경계에서 최대 길이 이하로 나누는지 테스트"""
+    text = "\n\n".join(["가" * 40, "나" * 40, "다" * 150])
+    sections = split_sections(text, 100)
+    assert all(len(section) <= 100 for section in sections)
+    assert sections[0] == "가" * 40 + "\n\n" + "나" * 40
+    assert "".join(sections[1:]) == "다" * 150
+
+
+def test_long_document_map_reduce(monkeypatch):
+    """긴 문서를 제한된 동시 실행으로 부분 요약하고 타입 간에 재사용하는지 테스트"""
+    monkeypatch.setattr(settings, "SUMMARY_SINGLE_PASS_CHARS", 500)
+    monkeypatch.setattr(settings, "SUMMARY_SECTION_CHARS", 100)
+    monkeypatch.setattr(settings, "SUMMARY_REDUCE_MAX_CHARS", 30)
+    monkeypatch.setattr(settings, "SUMMARY_MAP_CONCURRENCY", 2)
+    text = "\n\n".join(f"{i}번 절차: " + "점검" * 40 for i in range(8))
+    document = ParsedDocument(
+        filename="manual.pdf", file_type="pdf", metadata=DocumentMetadata(), chunks=[], full_text=text
+    )
+    summarizer = DocumentSummarizer(response_cache=LLMResponseCache(max_size=100, ttl_seconds=0))
+    provider = SlowProvider()
+    
+    summary = asyncio.run(summarizer.summarize_document(document, "core", provider, document_id="doc-1"))
+    section_calls = sum(1 for prompt in provider.prompts if prompt.startswith("다음은 긴 문서의 일부"))
+    merge_calls = sum(1 for prompt in provider.prompts if prompt.startswith("다음은 한 문서의 연속된"))
+    assert section_calls == 8
+    assert merge_calls > 0
+    assert provider.max_running == 2
+    assert provider.prompts[-1].startswith("다음 문서의 핵심 내용")
+    assert summary.content == f"요약{len(provider.prompts)}"
+    
+    # 다른 요약 타입은 부분 요약을 다시 만들지 않음
+    before = len(provider.prompts)
+    asyncio.run(summarizer.summarize_document(document, "detailed", provider, document_id="doc-1"))
+    assert not any(prompt.startswith("다음은 긴 문서의 일부") for prompt in provider.prompts[before:])
+
+
+def test_summary_text_rebuilt_from_chunks(db, tmp_path):
+    """본문을 저장하지 않는 스트리밍 파싱 후 청크로 원문을 복원하는지 테스트"""
+    path = tmp_path / "manual.pdf"
+    texts = [f"Page {i} step. " + "check the filter. " * 30 for i in range(1, 6)]
+    _write_pdf(path, texts)
+    document = Document(filename="manual.pdf", file_type="pdf", file_path=str(path), file_size=1)
+    db.add(document)
+    db.commit()
+    
+    DocumentService(db, rag_engine=object()).parse_document(document.id)
+    
+    assert "full_text" not in document.parsed_content
+    chunks = db.query(DocumentChunk).order_by(DocumentChunk.chunk_index).all()
+    assert len(chunks) > 1
+    assert [chunk.chunk_metadata["page_number"] for chunk in chunks] == sorted(
+        chunk.chunk_metadata["page_number"] for chunk in chunks
+    )
+    expected = PDFParser(max_workers=1).parse(str(path)).full_text.strip()
+    assert SummaryService(db)._parsed_document(document).full_text == expected
@@ -0,0 +1,518 @@
+"""
+벡터 저장소 테스트
+"""
+import os
+import pickle
+import threading
+
+import faiss
+import numpy as np
+import pytest
+
+from app.ai.vector_store import VectorStore
+from app.ai.rag_engine import RAGSearchEngine
+from app.ai.vector_metadata import VectorMetadataStore, vector_id_for
+from app.ai.vector_wal import VectorWAL
+from app.core.config import settings
+from tests.conftest import FakeEmbeddingGenerator
+
+
+@pytest.fixture
+def store(tmp_path):
+    """임시 경로의 벡터 저장소"""
+    return VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+
+
+def test_add_and_search(store):
+    """추가한 문서가 자기 자신으로 검색되는지 테스트"""
+    texts = ["엔진 정비 절차", "안전 점검", "연료 펌프 교체"]
+    metadatas = [{"document_id": "doc-1", "chunk_index": i} for i in range(len(texts))]
+    vector_ids = store.add_documents(texts, metadatas)
+    
+    assert len(vector_ids) == 3
+    results = store.search("안전 점검", top_k=1)
+    assert results[0][2]["chunk_index"] == 1
+
+
+def test_reload_reads_persisted_index(tmp_path):
+    """reload 시 디스크의 인덱스를 다시 읽는지 테스트"""
+    writer = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    reader = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    
+    writer.add_documents(["엔진 정비 절차"], [{"document_id": "doc-1", "chunk_index": 0}])
+    assert reader.get_stats()["total_vectors"] == 0
+    
+    reader.reload()
+    assert reader.get_stats()["total_vectors"] == 1
+
+
+def test_concurrent_add_and_search(store):
+    """공유 저장소에 동시 추가/검색 시 일관성 테스트"""
+    def add(worker: int):
+        for i in range(5):
+            store.add_documents(
+                [f"worker {worker} chunk {i}"],
+                [{"document_id": f"doc-{worker}", "chunk_index": i}]
+            )
+            store.search("chunk", top_k=3)
+    
+    threads = [threading.Thread(target=add, args=(w,)) for w in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    
+    assert store.get_stats()["total_vectors"] == 20
+
+
+def test_rag_engine_uses_injected_generator(tmp_path):
+    """RAG 엔진이 주입된 임베딩 생성기를 공유하는지 테스트"""
+    generator = FakeEmbeddingGenerator()
+    engine = RAGSearchEngine(str(tmp_path), embedding_generator=generator)
+    engine.index_document("doc-1", [{"content": "안전 점검", "chunk_index": 0}])
+    
+    assert engine.vector_store.embedding_generator is generator
+    assert engine.get_stats()["total_vectors"] == 1
+
+
+def test_reindex_encodes_only_new_chunks(tmp_path):
+    """재인덱싱 시 변경된 청크만 인코딩하는지 테스트"""
+    generator = FakeEmbeddingGenerator()
+    store = VectorStore(str(tmp_path), generator)
+    texts = [f"매뉴얼 {i}장 내용" for i in range(10)]
+    metadatas = [{"document_id": "doc-1", "chunk_index": i} for i in range(10)]
+    
+    store.add_documents(texts, metadatas)
+    assert generator.encoded == 10
+    
+    revised = texts[:9] + ["매뉴얼 9장 개정 내용"]
+    store.add_documents(revised, metadatas)
+    assert generator.encoded == 11
+    assert store.get_stats()["chunk_cache"]["hits"] == 9
+
+
+def test_auto_switch_to_ann_index(tmp_path, monkeypatch):
+    """벡터 수가 임계값을 넘으면 ANN 인덱스로 전환되는지 테스트"""
+    monkeypatch.setattr(settings, "VECTOR_INDEX_AUTO_ANN_THRESHOLD", 50)
+    monkeypatch.setattr(settings, "VECTOR_INDEX_ANN_TYPE", "hnsw_flat")
+    store = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    
+    texts = [f"청크 {i}" for i in range(60)]
+    store.add_documents(texts[:40], [{"chunk_index": i} for i in range(40)])
+    assert store.get_stats()["index_type"] == "flat"
+    
+    store.add_documents(texts[40:], [{"chunk_index": i} for i in range(40, 60)])
+    stats = store.get_stats()
+    assert stats["index_type"] == "hnsw_flat"
+    assert stats["total_vectors"] == 60
+    assert store.search("청크 7", top_k=1, ef_search=128)[0][2]["chunk_index"] == 7
+
+
+@pytest.mark.parametrize("index_type", ["ivf_flat", "ivf_pq"])
+def test_ivf_index_trains_once_enough_vectors(tmp_path, monkeypatch, index_type):
+    """IVF 계열은 학습 데이터가 쌓인 뒤 학습되어 사용되는지 테스트"""
+    monkeypatch.setattr(settings, "VECTOR_INDEX_TYPE", index_type)
+    monkeypatch.setattr(settings, "VECTOR_INDEX_PQ_NBITS", 4)
+    store = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    assert store.get_stats()["index_type"] == "flat"
+    
+    texts = [f"청크 {i}" for i in range(120)]
+    store.add_documents(texts, [{"chunk_index": i} for i in range(120)])
+    stats = store.get_stats()
+    assert stats["index_type"] == index_type
+    assert stats["index_params"]["nlist"] >= 1
+    
+    results = store.search("청크 3", top_k=5, nprobe=stats["index_params"]["nlist"])
+    assert 3 in [metadata["chunk_index"] for _, _, metadata in results]
+
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw_flat"])
+def test_cosine_metric_scores(tmp_path, monkeypatch, index_type):
+    """cosine 척도에서 점수가 코사인 유사도인지 테스트"""
+    monkeypatch.setattr(settings, "VECTOR_METRIC", "cosine")
+    monkeypatch.setattr(settings, "VECTOR_INDEX_TYPE", index_type)
+    store = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    store.add_documents(["엔진 정비 절차", "안전 점검"], [{"chunk_index": 0}, {"chunk_index": 1}])
+    
+    results = store.search("안전 점검", top_k=2)
+    assert results[0][2]["chunk_index"] == 1
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+    assert all(-1.0 - 1e-5 <= score <= 1.0 + 1e-5 for _, score, _ in results)
+    assert store.get_stats()["index_params"]["metric"] == "cosine"
+
+
+def test_min_score_cutoff(tmp_path, monkeypatch):
+    """min_score 미만의 결과가 제외되는지 테스트"""
+    monkeypatch.setattr(settings, "VECTOR_METRIC", "cosine")
+    engine = RAGSearchEngine(str(tmp_path), embedding_generator=FakeEmbeddingGenerator())
+    engine.index_document("doc-1", [
+        {"content": "엔진 정비 절차", "chunk_index": 0},
+        {"content": "안전 점검", "chunk_index": 1}
+    ])
+    
+    assert len(engine.semantic_search("안전 점검", top_k=2, min_score=-1.0)) == 2
+    results = engine.semantic_search("안전 점검", top_k=2, min_score=0.99)
+    assert [r.chunk_index for r in results] == [1]
+
+
+def test_filtered_search_returns_full_result_set(store):
+    """필터링된 검색이 한 번에 top_k개를 채우는지 테스트"""
+    texts, metadatas = [], []
+    for i in range(100):
+        texts.append(f"청크 {i}")
+        metadatas.append({
+            "document_id": "doc-rare" if i % 20 == 0 else "doc-common",
+            "chunk_index": i,
+            "page_number": i % 3
+        })
+    store.add_documents(texts, metadatas)
+    
+    results = store.search("청크 1", top_k=5, filter_dict={"document_id": "doc-rare"})
+    assert len(results) == 5
+    assert all(m["document_id"] == "doc-rare" for _, _, m in results)
+    
+    results = store.search("청크 1", top_k=3, filter_dict={"document_id": "doc-rare", "page_number": 0})
+    assert [m["chunk_index"] for _, _, m in results] and all(
+        m["chunk_index"] % 20 == 0 and m["page_number"] == 0 for _, _, m in results
+    )
+    
+    assert store.search("청크 1", top_k=5, filter_dict={"document_id": "missing"}) == []
+
+
+def test_filter_on_unindexed_key_over_fetches(store):
+    """색인되지 않은 키 필터는 검색 범위를 넓혀 결과를 채우는지 테스트"""
+    store.add_documents(
+        [f"청크 {i}" for i in range(50)],
+        [{"chunk_index": i, "start": i if i % 10 == 0 else -1} for i in range(50)]
+    )
+    results = store.search("청크 3", top_k=5, filter_dict={"start": [0, 10, 20, 30, 40]})
+    assert sorted(m["chunk_index"] for _, _, m in results) == [0, 10, 20, 30, 40]
+
+
+def test_delete_by_document_removes_vectors(store, tmp_path):
+    """문서 삭제 시 벡터가 인덱스에서 제거되는지 테스트"""
+    store.add_documents(
+        [f"청크 {i}" for i in range(20)],
+        [{"document_id": f"doc-{i % 2}", "chunk_index": i} for i in range(20)]
+    )
+    
+    assert store.delete_by_document("doc-0") == 10
+    stats = store.get_stats()
+    assert stats["total_vectors"] == 10
+    assert stats["tombstones"] == 0
+    assert stats["reclaimed_bytes"] > 0
+    assert all(m["document_id"] == "doc-1" for _, _, m in store.search("청크 2", top_k=20))
+    
+    # 삭제 결과가 저장됨
+    reloaded = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    assert reloaded.get_stats()["total_vectors"] == 10
+
+
+def test_hnsw_delete_uses_tombstones_and_compaction(tmp_path, monkeypatch):
+    """HNSW는 삭제 표시 후 검색에서 제외하고 압축 시 정리하는지 테스트"""
+    monkeypatch.setattr(settings, "VECTOR_INDEX_TYPE", "hnsw_flat")
+    monkeypatch.setattr(settings, "VECTOR_COMPACTION_THRESHOLD", 0.5)
+    store = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    store.add_documents([f"A {i}" for i in range(10)], [{"document_id": "doc-a", "chunk_index": i} for i in range(10)])
+    store.add_documents([f"B {i}" for i in range(30)], [{"document_id": "doc-b", "chunk_index": i} for i in range(30)])
+    
+    assert store.delete_by_document("doc-a") == 10
+    assert store.get_stats()["tombstones"] == 10
+    results = store.search("A 1", top_k=40)
+    assert len(results) == 30
+    assert all(m["document_id"] == "doc-b" for _, _, m in results)
+    
+    # 삭제 표시는 다시 로드해도 유지
+    store.reload()
+    assert store.get_stats()["tombstones"] == 10
+    
+    result = store.compact()
+    assert result["removed_vectors"] == 10
+    assert result["reclaimed_bytes"] > 0
+    stats = store.get_stats()
+    assert stats["tombstones"] == 0
+    assert stats["index_type"] == "hnsw_flat"
+    assert store.index.ntotal == 30
+
+
+def test_reindex_document_replaces_vectors(rag_engine):
+    """같은 문서를 다시 인덱싱하면 이전 벡터가 교체되는지 테스트"""
+    chunks = [{"content": f"매뉴얼 {i}장", "chunk_index": i} for i in range(5)]
+    
+    rag_engine.index_document("doc-1", chunks)
+    rag_engine.index_document("doc-1", chunks)
+    assert rag_engine.get_stats()["total_vectors"] == 5
+    
+    assert rag_engine.delete_document("doc-1") == 5
+    assert rag_engine.vector_store.is_empty()
+    rag_engine.close()
+
+
+def test_legacy_positional_index_is_migrated(tmp_path):
+    """위치 기반 ID를 쓰던 기존 인덱스를 같은 ID로 읽는지 테스트"""
+    generator = FakeEmbeddingGenerator()
+    texts = [f"청크 {i}" for i in range(5)]
+    legacy = faiss.IndexFlatL2(generator.dimension)
+    legacy.add(generator.generate_embeddings(texts))
+    faiss.write_index(legacy, str(tmp_path / "faiss.index"))
+    with open(tmp_path / "metadata.pkl", "wb") as f:
+        pickle.dump({str(i): {"document_id": "doc-1", "chunk_index": i} for i in range(5)}, f)
+    
+    store = VectorStore(str(tmp_path), generator)
+    vector_id, _, metadata = store.search("청크 3", top_k=1)[0]
+    assert vector_id == 3 and metadata["chunk_index"] == 3
+    assert store.delete_documents([3]) == 1
+    assert store.get_stats()["total_vectors"] == 4
+
+
+def test_vector_ids_are_stable_across_reindex_and_rebuild(tmp_path, monkeypatch):
+    """청크 ID에서 만든 벡터 ID가 재인덱싱과 인덱스 재구성 후에도 유지되는지 테스트"""
+    monkeypatch.setattr(settings, "VECTOR_INDEX_AUTO_ANN_THRESHOLD", 30)
+    engine = RAGSearchEngine(str(tmp_path), embedding_generator=FakeEmbeddingGenerator())
+    chunks = [{"id": f"chunk-{i}", "content": f"매뉴얼 {i}장", "chunk_index": i} for i in range(20)]
+    
+    first = engine.index_document("doc-1", chunks)
+    assert first == [vector_id_for(f"chunk-{i}") for i in range(20)]
+    
+    # 청크 하나를 빼고 재인덱싱하면 해당 벡터만 삭제
+    assert engine.index_document("doc-1", chunks[1:]) == first[1:]
+    assert engine.get_stats()["total_vectors"] == 19
+    
+    # 벡터 수가 늘어 HNSW로 재구성되어도 ID 유지
+    engine.index_document("doc-2", [{"content": f"부록 {i}", "chunk_index": i} for i in range(20)])
+    assert engine.get_stats()["index_type"] == "hnsw_flat"
+    vector_id, _, metadata = engine.vector_store.search("매뉴얼 5장", top_k=1, ef_search=128)[0]
+    assert vector_id == vector_id_for("chunk-5") and metadata["chunk_index"] == 5
+    
+    # HNSW에서도 같은 청크 재인덱싱은 벡터를 교체하지 않음
+    engine.index_document("doc-1", chunks[1:], document_metadata={"file_type": "pdf"})
+    stats = engine.get_stats()
+    assert stats["total_vectors"] == 39 and stats["tombstones"] == 0
+    assert engine.vector_store.metadata_store.get(first[5])["file_type"] == "pdf"
+    engine.close()
+
+
+def test_vector_metadata_store_lookup():
+    """정렬된 ID 배열 기반 메타데이터 조회/삭제 테스트"""
+    store = VectorMetadataStore()
+    store.add([30, 10, 20], [{"n": 30}, {"n": 10}, {"n": 20}])
+    
+    assert store.get_many([20, 99, 10]) == [{"n": 20}, None, {"n": 10}]
+    assert store.remove([10, 99]) == [(10, {"n": 10})]
+    assert 10 not in store and len(store) == 2
+    with pytest.raises(ValueError):
+        store.add([20], [{"n": 0}])
+    
+    assert VectorMetadataStore.from_state({"5": {"n": 5}}).get(5) == {"n": 5}
+
+
+def test_columnar_metadata_roundtrip(tmp_path):
+    """열 파일 저장 후 매핑한 저장소에서 조회/변경/재저장 테스트"""
+    path = str(tmp_path / "metadata.cols")
+    store = VectorMetadataStore()
+    store.add([30, 10, 20], [
+        {"document_id": "doc-1", "chunk_index": 0, "tags": ["a"]},
+        {"document_id": "doc-2", "chunk_index": 1},
+        {"document_id": "doc-1", "chunk_index": 2, "page_number": None}
+    ])
+    store.save(path)
+    
+    mapped = VectorMetadataStore.load(path)
+    assert mapped.mapped_bytes > 0
+    assert mapped.get_many([10, 30, 99]) == [
+        {"document_id": "doc-2", "chunk_index": 1},
+        {"document_id": "doc-1", "chunk_index": 0, "tags": ["a"]},
+        None
+    ]
+    assert mapped.get(20) == {"document_id": "doc-1", "chunk_index": 2, "page_number": None}
+    
+    # 매핑된 행 삭제/교체 후 새 행과 함께 다시 저장
+    assert mapped.remove([10]) == [(10, {"document_id": "doc-2", "chunk_index": 1})]
+    mapped.update(30, {"document_id": "doc-3", "chunk_index": 0})
+    mapped.add([5], [{"document_id": "doc-1", "chunk_index": 7}])
+    mapped.save(path + ".tmp")
+    
+    reloaded = VectorMetadataStore.load(path + ".tmp")
+    assert reloaded.ids().tolist() == [5, 20, 30]
+    assert [m["document_id"] for _, m in reloaded.items()] == ["doc-1", "doc-1", "doc-3"]
+    columns = {key: (ids.tolist(), codes.tolist(), values) for key, ids, codes, values in reloaded.base_columns()}
+    ids, codes, values = columns["document_id"]
+    assert [values[c] for c in codes] == ["doc-1", "doc-1", "doc-3"]
+
+
+def test_index_is_memory_mapped_on_load(tmp_path, monkeypatch):
+    """체크포인트를 매핑으로 열어 검색하고, 변경 시 메모리로 복사되는지 테스트"""
+    store = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    store.add_documents(
+        [f"청크 {i}" for i in range(6)],
+        [{"document_id": f"doc-{i % 2}", "chunk_index": i} for i in range(6)]
+    )
+    store.close()
+    
+    reopened = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    stats = reopened.get_stats()
+    assert stats["index_mmapped"] and stats["metadata_mapped_bytes"] > 0
+    assert reopened.search("청크 3", top_k=1)[0][2]["chunk_index"] == 3
+    assert len(reopened.search("청크 3", top_k=6, filter_dict={"document_id": "doc-0"})) == 3
+    
+    reopened.add_documents(["청크 6"], [{"document_id": "doc-0", "chunk_index": 6}])
+    reopened.delete_by_document("doc-1")
+    assert not reopened.get_stats()["index_mmapped"]
+    reopened.close()
+    
+    final = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    assert final.get_stats()["total_vectors"] == 4
+    assert {m["document_id"] for _, _, m in final.search("청크 6", top_k=10)} == {"doc-0"}
+
+
+def test_changes_are_logged_and_replayed(tmp_path):
+    """변경이 로그에만 기록되고 다시 열 때 재생되는지 테스트"""
+    store = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    store.add_documents(
+        [f"청크 {i}" for i in range(10)],
+        [{"document_id": f"doc-{i % 2}", "chunk_index": i} for i in range(10)]
+    )
+    store.delete_by_document("doc-0")
+    
+    # 체크포인트 기준 미만이면 인덱스 파일을 다시 쓰지 않음
+    assert not (tmp_path / "faiss.index").exists()
+    assert store.get_stats()["wal_bytes"] > 0
+    
+    reopened = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    assert reopened.get_stats()["total_vectors"] == 5
+    assert {m["document_id"] for _, _, m in reopened.search("청크 1", top_k=10)} == {"doc-1"}
+
+
+def test_checkpoint_truncates_log(tmp_path, monkeypatch):
+    """로그가 기준 크기를 넘으면 체크포인트 후 로그를 비우는지 테스트"""
+    monkeypatch.setattr(settings, "VECTOR_WAL_CHECKPOINT_MIN_BYTES", 1)
+    store = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    store.add_documents(["엔진 정비"], [{"document_id": "doc-1", "chunk_index": 0}])
+    
+    assert (tmp_path / "faiss.index").exists()
+    assert store.get_stats()["wal_bytes"] == 0
+    assert not list(tmp_path.glob("*.tmp"))
+    assert VectorStore(str(tmp_path), FakeEmbeddingGenerator()).get_stats()["total_vectors"] == 1
+
+
+def test_torn_log_tail_is_discarded(tmp_path):
+    """쓰다 만 마지막 로그 레코드는 버리고 앞의 기록만 재생하는지 테스트"""
+    store = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    store.add_documents(["엔진 정비"], [{"document_id": "doc-1", "chunk_index": 0}])
+    store._wal.close()
+    with open(tmp_path / "vectors.wal", "ab") as f:
+        f.write(b"\x10\x00\x00\x00partial")
+    
+    reopened = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    assert reopened.get_stats()["total_vectors"] == 1
+    reopened.add_documents(["안전 점검"], [{"document_id": "doc-2", "chunk_index": 0}])
+    assert VectorStore(str(tmp_path), FakeEmbeddingGenerator()).get_stats()["total_vectors"] == 2
+
+
+def test_search_results_include_chunk_text(rag_engine, tmp_path):
+    """검색 결과에 저장된 청크 본문이 채워지고 재시작/삭제 후에도 맞는지 테스트"""
+    chunks = [{"content": f"연료 펌프 교체 절차 {i}단계", "chunk_index": i} for i in range(4)]
+    rag_engine.index_document("doc-1", chunks)
+    rag_engine.index_document("doc-2", [{"content": "안전 점검", "chunk_index": 0}])
+    
+    result = rag_engine.semantic_search("연료 펌프 교체 절차 2단계", top_k=1, min_score=0)[0]
+    assert result.content == "연료 펌프 교체 절차 2단계"
+    assert "content" not in result.metadata
+    
+    # 로그 재생으로 복구
+    reopened = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    assert reopened.search("안전 점검", top_k=1)[0][2]["content"] == "안전 점검"
+    
+    # 체크포인트 후 삭제로 빈 공간이 많아지면 새 데이터 파일로 압축
+    rag_engine.checkpoint()
+    rag_engine.delete_document("doc-1")
+    rag_engine.checkpoint()
+    assert rag_engine.vector_store.get_stats()["chunk_text"]["entries"] == 1
+    assert [p.name for p in tmp_path.glob("chunk_text.*.dat")] == ["chunk_text.1.dat"]
+    rag_engine.close()
+    
+    final = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    assert [m["content"] for _, _, m in final.search("안전 점검", top_k=5)] == ["안전 점검"]
+
+
+def test_second_store_opens_read_only(tmp_path):
+    """변경 로그 잠금을 가진 저장소만 기록하고 나머지는 읽기 전용으로 열리는지 테스트"""
+    writer = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    writer.add_documents(["엔진 정비"], [{"document_id": "doc-1", "chunk_index": 0}])
+    
+    reader = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    assert reader.read_only and not writer.read_only
+    assert reader.get_stats()["total_vectors"] == 1  # 기록 중인 로그도 재생
+    with pytest.raises(RuntimeError):
+        reader.add_documents(["안전 점검"], [{"document_id": "doc-2", "chunk_index": 0}])
+    with pytest.raises(RuntimeError):
+        reader.checkpoint()
+    reader.close()
+    
+    # 읽기 전용 저장소가 닫혀도 기록 중인 로그는 그대로
+    writer.add_documents(["안전 점검"], [{"document_id": "doc-2", "chunk_index": 0}])
+    assert writer.get_stats()["wal_bytes"] > 0
+    
+    # 기록하던 저장소가 닫히면 reload 때 잠금을 넘겨받음
+    reader = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    writer.close()
+    reader.reload()
+    assert not reader.read_only
+    assert reader.get_stats()["total_vectors"] == 2
+    reader.close()
+
+
+def test_reader_tails_writer_log(tmp_path, monkeypatch):
+    """읽기 전용 저장소가 새 로그 기록을 이어 재생하고 체크포인트 후에는 다시 로드하는지 테스트"""
+    monkeypatch.setattr(settings, "VECTOR_READER_REFRESH_INTERVAL", 0)
+    writer = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    writer.add_documents(["엔진 정비"], [{"document_id": "doc-1", "chunk_index": 0}])
+    reader = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    assert reader.read_only and not reader.refresh()
+    
+    data_size = os.path.getsize(tmp_path / "chunk_text.0.dat")
+    writer.add_documents(["안전 점검"], [{"document_id": "doc-2", "chunk_index": 0}])
+    written = os.path.getsize(tmp_path / "chunk_text.0.dat")
+    assert reader.refresh()
+    assert reader.search("안전 점검", top_k=1)[0][2]["content"] == "안전 점검"
+    assert os.path.getsize(tmp_path / "chunk_text.0.dat") == written > data_size  # 읽기 전용은 쓰지 않음
+    
+    writer.delete_by_document("doc-1")
+    writer.checkpoint()
+    assert reader.refresh()
+    assert reader.get_stats()["total_vectors"] == 1
+    assert reader.read_only
+    writer.close()
+    reader.close()
+
+
+def test_replay_re_adds_tombstoned_ids(tmp_path, monkeypatch):
+    """로그 재생 중 삭제 표시된 ID를 다시 추가해도 뒤따르는 기록까지 모두 재생하는지 테스트"""
+    monkeypatch.setattr(settings, "VECTOR_INDEX_TYPE", "hnsw_flat")
+    monkeypatch.setattr(settings, "VECTOR_COMPACTION_THRESHOLD", 1.0)
+    monkeypatch.setattr(settings, "VECTOR_WAL_CHECKPOINT_MIN_BYTES", 1 << 30)
+    store = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    store.add_documents([f"A {i}" for i in range(5)], [{"document_id": "doc-a", "chunk_index": i} for i in range(5)])
+    _, ids, embeddings, metadatas, texts = next(store._wal.replay())
+    
+    # 삭제 표시가 체크포인트에 남은 상태를 만든 뒤 같은 ID 추가와 새 문서 추가를 로그에 기록
+    monkeypatch.setattr(settings, "VECTOR_WAL_CHECKPOINT_MIN_BYTES", 1)
+    store.add_documents([f"B {i}" for i in range(5)], [{"document_id": "doc-b", "chunk_index": i} for i in range(5)])
+    store.delete_by_document("doc-a")
+    assert store.get_stats()["tombstones"] == 5
+    store._wal.close()
+    
+    wal = VectorWAL(str(tmp_path / "vectors.wal"))
+    wal.append(("add", ids, embeddings, metadatas, texts))
+    wal.append(("add", ids + 1000, embeddings, [{**m, "document_id": "doc-c"} for m in metadatas], texts))
+    wal.close()
+    
+    reopened = VectorStore(str(tmp_path), FakeEmbeddingGenerator())
+    stats = reopened.get_stats()
+    assert stats["total_vectors"] == 15
+    assert stats["tombstones"] == 0
+    assert stats["wal_bytes"] == 0  # 재생이 끝난 뒤 한 번 체크포인트
+    assert {m["document_id"] for _, _, m in reopened.search("A 1", top_k=15)} == {"doc-a", "doc-b", "doc-c"}
+    reopened.close()
+    
+    assert VectorStore(str(tmp_path), FakeEmbeddingGenerator()).get_stats()["total_vectors"] == 15